@@ -0,0 +1,41 @@
+# Batch recompute throughput for 1..N worker processes, on synthetic users.
+# Users per second should grow close to linearly with workers up to the
+# number of cores.
+#   python benchmarks/bench_batch.py --users 400 --years 1 --workers 1 2 4 8
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from datagen import generate
+from fitness.batch import run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch recompute benchmark")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--shard-size", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp:
+        generate(tmp, args.users, args.years, args.seed, "sqlite")
+        base = None
+        for workers in args.workers:
+            started = time.perf_counter()
+            done = run(tmp, workers, args.shard_size, restart=True)
+            rate = done / (time.perf_counter() - started)
+            base = base or rate
+            print(f"{workers:3d} workers: {rate:8.1f} users/s  x{rate / base:.2f}")
+
+
+if __name__ == "__main__":
+    main()
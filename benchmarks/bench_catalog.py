@@ -0,0 +1,63 @@
+# Type-ahead search latency over a synthetic food catalog (100k foods by default).
+#   python benchmarks/bench_catalog.py --foods 200000
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fitness.catalog import DEFAULT_FOODS, Catalog, write_catalog
+
+WORDS = ["тушеный", "жареный", "вареный", "запеченный", "домашний", "свежий", "сушеный",
+         "соус", "салат", "суп", "каша", "пирог", "сыр", "йогурт", "фарш", "с овощами", "с грибами"]
+
+
+def synthetic_foods(count, seed=1):
+    rng = random.Random(seed)
+    base = list(DEFAULT_FOODS)
+    for i in range(count):
+        name = f"{rng.choice(base)} {rng.choice(WORDS)} {rng.choice(WORDS)} №{i}"
+        yield name, rng.uniform(10, 900), rng.uniform(0, 40), rng.uniform(0, 60), rng.uniform(0, 90)
+
+
+def timed(func, queries):
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), max(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Food catalog search benchmark")
+    parser.add_argument("--foods", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "foods.bin")
+        started = time.perf_counter()
+        write_catalog(path, synthetic_foods(args.foods))
+        print(f"build: {time.perf_counter() - started:.2f} s, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        started = time.perf_counter()
+        catalog = Catalog.open(path)
+        print(f"open: {(time.perf_counter() - started) * 1000:.2f} ms")
+
+        started = time.perf_counter()
+        catalog.trigram_index()
+        print(f"trigram index: {time.perf_counter() - started:.2f} s")
+
+        queries = ["я", "ябл", "кур", "лосось с", "гречка", "Картоф", "авакадо", "салат", "грибами", "хлеп"]
+        median, worst = timed(lambda q: catalog.prefix(q, 50), queries)
+        print(f"prefix: median {median:.3f} ms, max {worst:.3f} ms")
+        median, worst = timed(lambda q: catalog.search(q, 50), queries)
+        print(f"search: median {median:.3f} ms, max {worst:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
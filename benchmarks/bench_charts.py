@@ -0,0 +1,57 @@
+# Redraw time of a history chart over ten years of daily data: full view,
+# zooming in step by step and panning across the zoomed view.
+# Needs a display; on a headless machine run it under Xvfb:
+#   xvfb-run python benchmarks/bench_charts.py --days 3650
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fitness.charts import Chart
+
+
+def timed_redraws(root, chart, action, count):
+    times = []
+    for _ in range(count):
+        started = time.perf_counter()
+        action()
+        chart.redraw()
+        root.update_idletasks()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), max(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History chart redraw benchmark")
+    parser.add_argument("--days", type=int, default=3650)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    xs = list(range(730000, 730000 + args.days))
+    ys = [75 + 5 * math.sin(i / 60) + rng.uniform(-1, 1) for i in range(args.days)]
+
+    root = tk.Tk()
+    for kind in ("line", "bar"):
+        canvas = tk.Canvas(root, width=800, height=250)
+        canvas.pack()
+        chart = Chart(canvas, kind, width=800, height=250)
+        chart.set_series(xs, ys)
+        root.update()
+        items = len(canvas.find_all())
+        full = timed_redraws(root, chart, lambda: None, 20)
+        zoom = timed_redraws(root, chart, lambda: chart.zoom(0.9, 400), 40)
+        pan = timed_redraws(root, chart, lambda: chart.pan(15), 40)
+        print(f"{kind:>4}: full {full[0]:.2f} ms (max {full[1]:.2f})  zoom {zoom[0]:.2f} ms (max {zoom[1]:.2f})  "
+              f"pan {pan[0]:.2f} ms (max {pan[1]:.2f})  items {items} -> {len(canvas.find_all())}")
+        canvas.destroy()
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Login check latency of the JSON account store for a growing number of
+# stored accounts. With the credential index the per-login cost should stay
+# flat from 10 to 100k accounts.
+#   python benchmarks/bench_credentials.py
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fitness.storage import JsonStorage
+
+
+def measure(count, lookups):
+    with tempfile.TemporaryDirectory() as tmp:
+        users = {f"user{i}": {"password": f"pw{i}"} for i in range(count)}
+        with open(os.path.join(tmp, "users.json"), "w", encoding="utf-8") as f:
+            json.dump(users, f)
+
+        storage = JsonStorage(tmp)
+        storage.verify_user("user0", "pw0")  # first call loads the index
+
+        started = time.perf_counter()
+        for i in range(lookups):
+            n = i % count
+            storage.verify_user(f"user{n}", f"pw{n}")
+        login = (time.perf_counter() - started) / lookups
+
+        started = time.perf_counter()
+        for i in range(lookups // 10):
+            storage.save_user(f"new{i}", "pw")
+        register = (time.perf_counter() - started) / (lookups // 10)
+        return login, register
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Credential lookup benchmark")
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'accounts':>9}  {'login':>10}  {'register':>10}")
+    for count in (10, 100, 1_000, 10_000, 100_000):
+        login, register = measure(count, args.lookups)
+        print(f"{count:>9}  {login * 1e6:>7.1f} us  {register * 1e6:>7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
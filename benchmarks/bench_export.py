@@ -0,0 +1,62 @@
+# Export throughput and peak traced memory for each format, on synthetic
+# users. Peak memory should stay flat as --users and --years grow.
+#   python benchmarks/bench_export.py --users 200 --years 3
+#   python benchmarks/bench_export.py --data-dir /tmp/fitness-bench   # existing data
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from datagen import generate
+from fitness.export import export
+from fitness.storage import open_storage
+from fitness.timeseries import METRICS_FILE, MetricStore
+
+OUTPUTS = ("history.csv", "history.jsonl.gz", "report.txt")
+
+
+def run(data_dir, out_dir, backend):
+    storage = open_storage(data_dir, backend)
+    metrics = MetricStore(os.path.join(data_dir, METRICS_FILE))
+    try:
+        for name in OUTPUTS:
+            path = os.path.join(out_dir, name)
+            tracemalloc.start()
+            started = time.perf_counter()
+            accounts = export(storage, metrics, path)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:>17}: {accounts} accounts in {elapsed:6.2f} s "
+                  f"({accounts / elapsed:7.1f}/s), {os.path.getsize(path) / 1e6:7.2f} MB, "
+                  f"peak {peak / 1024:7.1f} KiB")
+    finally:
+        storage.close()
+        metrics.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export benchmark")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--years", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--backend", choices=["sqlite", "json"], default=None)
+    parser.add_argument("--data-dir", help="export this data directory instead of generating one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir
+        if data_dir is None:
+            data_dir = os.path.join(tmp, "data")
+            generate(data_dir, args.users, args.years, args.seed, args.backend)
+        run(data_dir, tmp, args.backend)
+
+
+if __name__ == "__main__":
+    main()
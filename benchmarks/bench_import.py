@@ -0,0 +1,48 @@
+# Import time of the headless core versus the GUI, each in a fresh interpreter.
+#   python benchmarks/bench_import.py
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+gui = sorted(m for m in ("tkinter", "customtkinter") if m in sys.modules)
+print(elapsed, ",".join(gui))
+"""
+
+
+def measure(module, runs):
+    times = []
+    gui_modules = ""
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], cwd=ROOT,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        elapsed, _, gui_modules = result.stdout.strip().partition(" ")
+        times.append(float(elapsed) * 1000)
+    return statistics.median(times), gui_modules or "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in ("fitness.core", "FitnessApp", "fitness.gui"):
+        median, detail = measure(module, args.runs)
+        if median is None:
+            print(f"{module:>13}: failed ({detail})")
+        else:
+            print(f"{module:>13}: {median:7.1f} ms  gui modules loaded: {detail}")
+
+
+if __name__ == "__main__":
+    main()
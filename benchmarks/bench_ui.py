@@ -0,0 +1,73 @@
+# Login-to-interactive time of the main window, with lazy tabs and with every
+# tab built up front (the old behaviour) for comparison. The lazy first login
+# and the median of the logins after it are checked against ui.first_login_ms
+# and ui.relogin_ms in thresholds.json. Being over is a warning; with --strict
+# the exit status is 1 (see suite.py).
+# Needs a display; on a headless machine run it under Xvfb:
+#   xvfb-run python benchmarks/bench_ui.py
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from suite import THRESHOLDS_FILE, check
+
+
+def measure(app, runs, eager):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        app._complete_login("bench")
+        if eager:
+            for name in app._tab_builders():
+                app._ensure_tab_built(name)
+            app.update_idletasks()
+            times.append(time.perf_counter() - started)
+        else:
+            times.append(app.last_login_to_interactive)
+        app.logout()
+        app.update()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login-to-interactive benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE)
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 when a result is over its threshold")
+    args = parser.parse_args()
+    with open(args.thresholds, "r", encoding="utf-8") as f:
+        thresholds = json.load(f)
+    thresholds = {key: thresholds[key] for key in ("ui.first_login_ms", "ui.relogin_ms") if key in thresholds}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        from FitnessApp import FitnessApp
+
+        app = FitnessApp()
+        app.prebuild_tabs = False
+        app.save_user("bench", "bench")
+        app.update()
+        measured = {}
+        for label, eager in (("lazy tabs", False), ("all tabs", True)):
+            times = measured[eager] = measure(app, args.runs, eager)
+            print(f"{label:>10}: median {statistics.median(times) * 1000:7.1f} ms, "
+                  f"min {min(times) * 1000:7.1f} ms, max {max(times) * 1000:7.1f} ms")
+        app._on_close()
+
+    lazy = measured[False]
+    results = {"ui": {"first_login_ms": round(lazy[0] * 1000, 2),
+                      "relogin_ms": round(statistics.median(lazy[1:] or lazy) * 1000, 3)}}
+    failures = check(results, thresholds)
+    for failure in failures:
+        print(f"{'REGRESSION' if args.strict else 'WARNING'} {failure}")
+    sys.exit(1 if failures and args.strict else 0)
+
+
+if __name__ == "__main__":
+    main()
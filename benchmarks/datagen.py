@@ -0,0 +1,106 @@
+# Seeded synthetic users with multi-year tracker histories, for benchmarks.
+# User i's history depends only on (seed, i), so any subset can be rebuilt.
+#   python benchmarks/datagen.py --users 1000 --years 3 --data-dir /tmp/fitness-bench
+#   python benchmarks/datagen.py --users 100000 --years 0.1 --backend json
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fitness.catalog import DEFAULT_FOODS
+from fitness.core import WATER_GOAL, food_calories, goal_advice
+from fitness.meals import meal_at
+from fitness.storage import open_storage
+from fitness.timeseries import METRICS_FILE, MetricStore, samples_from_events
+
+FOODS = list(DEFAULT_FOODS.items())
+GOALS = [("Сбросить вес", 5, "3 месяца"), ("Набрать вес", 3, "1 месяц"), ("10 000 шагов", 10000, "1 неделя")]
+
+
+def username(i):
+    return f"user{i:06d}"
+
+
+def user_history(i, days, seed=1, end=None):
+    # Yields one list of events per day, oldest first
+    rng = random.Random(seed * 1_000_003 + i)
+    end = end or date.today()
+    weight = rng.uniform(55, 110)
+    step_base = rng.uniform(3000, 12000)
+    height = round(rng.uniform(150, 195))
+    for offset in range(days, 0, -1):
+        day = end - timedelta(days=offset - 1)
+        level = 0.0
+        at = lambda hour: datetime(day.year, day.month, day.day, hour, rng.randrange(60)).isoformat(timespec="seconds")
+        events = []
+        for hour in sorted(rng.sample(range(7, 22), rng.randint(2, 4))):
+            name, (kcal, protein, fat, carbs) = rng.choice(FOODS)
+            grams = rng.randint(50, 350)
+            ts = at(hour)
+            events.append({"type": "food", "ts": ts, "id": f"{i}-{ts}",
+                           "meal": meal_at(datetime.fromisoformat(ts)), "food": name, "grams": grams,
+                           "kcal": food_calories(kcal, grams), "protein": protein * grams / 100,
+                           "fat": fat * grams / 100, "carbs": carbs * grams / 100})
+        for hour in sorted(rng.sample(range(7, 23), rng.randint(1, 5))):
+            value = round(min(level + rng.choice([0.1, 0.25, 0.5]), WATER_GOAL), 2)
+            events.append({"type": "water", "ts": at(hour), "value": value, "delta": round(value - level, 2)})
+            level = value
+        weekend = day.weekday() >= 5
+        steps = max(0, int(rng.gauss(step_base * (0.7 if weekend else 1.0), 2500)))
+        events.append({"type": "steps", "ts": at(21), "delta": steps})
+        events.append({"type": "sleep", "ts": at(8), "hours": round(min(max(rng.gauss(7, 1.1), 3), 11), 1)})
+        if rng.random() < 0.3:
+            events.append({"type": "pulse", "ts": at(12), "bpm": round(rng.gauss(70, 8))})
+        if offset == days:
+            events.append({"type": "height", "ts": at(7), "cm": height})
+        if day.weekday() == 0:
+            weight += rng.gauss(-0.05, 0.4)
+            events.append({"type": "weight", "ts": at(7), "kg": round(weight, 1)})
+        if rng.random() < 0.002:
+            desc, value, period = rng.choice(GOALS)
+            events.append({"type": "goal", "ts": at(20), "goal": {"desc": desc, "value": value, "period": period,
+                                                                   "advice": goal_advice(desc)}})
+        events.sort(key=lambda e: e["ts"])
+        yield events
+
+
+def generate(data_dir, users, years=1.0, seed=1, backend=None, first=0):
+    # Writes users first..first+users-1 with `years` of history each
+    storage = open_storage(data_dir, backend)
+    metrics = MetricStore(os.path.join(data_dir, METRICS_FILE))
+    days = max(1, int(years * 365))
+    events_written = 0
+    try:
+        for i in range(first, first + users):
+            name = username(i)
+            storage.save_user(name, f"pw{i}")
+            batch = [event for day in user_history(i, days, seed) for event in day]
+            storage.append_events(name, batch)
+            metrics.add_samples(name, samples_from_events(batch))
+            events_written += len(batch)
+    finally:
+        storage.close()
+        metrics.close()
+    return events_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic users with tracker histories")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--backend", choices=["sqlite", "json"], default=None)
+    parser.add_argument("--data-dir", required=True)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    events = generate(args.data_dir, args.users, args.years, args.seed, args.backend)
+    print(f"{args.users} users, {events} events in {time.perf_counter() - started:.1f} s -> {args.data_dir}")
+
+
+if __name__ == "__main__":
+    main()
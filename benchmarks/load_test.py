@@ -0,0 +1,150 @@
+# Sustained requests per second against the HTTP API with many simulated
+# users, each on its own keep-alive connection. Starts a server on a scratch
+# data directory unless told to use a running one:
+#   python benchmarks/load_test.py --users 200 --seconds 20
+#   python benchmarks/load_test.py --port 8080 --no-server
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fitness.catalog import DEFAULT_FOODS
+
+FOODS = list(DEFAULT_FOODS)
+
+
+class Client:
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.token = ""
+        self._reader = self._writer = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def call(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Authorization: Bearer {self.token}\r\nContent-Length: {len(data)}\r\n\r\n")
+        self._writer.write(head.encode() + data)
+        await self._writer.drain()
+        status_line = await self._reader.readuntil(b"\r\n")
+        headers = await self._reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in headers.decode().split("\r\n"):
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        payload = json.loads(await self._reader.readexactly(length))
+        return int(status_line.split()[1]), payload
+
+    def close(self):
+        if self._writer:
+            self._writer.close()
+
+
+def random_request(rng):
+    kind = rng.random()
+    if kind < 0.3:
+        return "POST", "/food", {"food": rng.choice(FOODS), "grams": rng.randint(50, 300)}
+    if kind < 0.55:
+        return "POST", "/water", {"liters": rng.choice([0.1, 0.25, 0.5])}
+    if kind < 0.8:
+        return "POST", "/steps", {"steps": rng.choice([100, 500, 1000])}
+    if kind < 0.9:
+        return "POST", "/bmi", {"weight": rng.uniform(50, 110), "height": rng.uniform(150, 200)}
+    if kind < 0.95:
+        return "GET", "/state", None
+    return "POST", "/goals", {"desc": "Сбросить вес", "value": rng.randint(1, 10), "period": "1 месяц"}
+
+
+async def logged_in_client(index, args):
+    client = Client(args.host, args.port)
+    await client.connect()
+    user = {"username": f"load{index}", "password": "secret"}
+    await client.call("POST", "/register", user)
+    status, payload = await client.call("POST", "/login", user)
+    client.token = payload.get("token", "")
+    return client
+
+
+async def simulated_user(index, client, deadline, latencies, errors):
+    rng = random.Random(index)
+    while time.perf_counter() < deadline:
+        method, path, body = random_request(rng)
+        started = time.perf_counter()
+        status, _ = await client.call(method, path, body)
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            errors.append(status)
+    client.close()
+
+
+async def run(args):
+    # Registration and login hash passwords, so they happen before the
+    # timed phase
+    started = time.perf_counter()
+    clients = await asyncio.gather(*(logged_in_client(i, args) for i in range(args.users)))
+    print(f"{args.users} users registered and logged in in {time.perf_counter() - started:.1f} s")
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.seconds
+    started = time.perf_counter()
+    await asyncio.gather(*(simulated_user(i, client, deadline, latencies, errors) for i, client in enumerate(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000
+    print(f"{args.users} users, {len(latencies)} requests in {elapsed:.1f} s: "
+          f"{len(latencies) / elapsed:.0f} req/s, errors {len(errors)}")
+    print(f"latency p50 {p(0.5):.1f} ms  p95 {p(0.95):.1f} ms  p99 {p(0.99):.1f} ms  "
+          f"mean {statistics.mean(latencies) * 1000:.1f} ms")
+
+
+def wait_for_port(host, port, timeout=15):
+    import socket
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP API load test")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=8, help="storage workers of the started server")
+    parser.add_argument("--no-server", action="store_true", help="use a server that is already running")
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as data_dir:
+        if not args.no_server:
+            server = subprocess.Popen([sys.executable, "-m", "fitness.api", "--host", args.host, "--port", str(args.port),
+                                       "--data-dir", data_dir, "--workers", str(args.workers)],
+                                      cwd=ROOT, stdout=subprocess.DEVNULL)
+        try:
+            wait_for_port(args.host, args.port)
+            asyncio.run(run(args))
+        finally:
+            if server is not None:
+                server.send_signal(signal.SIGINT)
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# Benchmark suite: accounts, tracker load/save, calculations, metric rollups,
+# the meal log and recipes, and (with a display) UI build and tab switching,
+# on seeded synthetic data.
+# Results go to a JSON file and are checked against thresholds.json. The
+# thresholds are three times the slowest of several runs on the machine they
+# were recorded on, so they say little about another machine: a result over
+# its threshold is reported as a warning, and only fails the run (exit
+# status 1) with --strict, e.g. in CI on the machine that recorded them.
+#   python benchmarks/suite.py
+#   xvfb-run python benchmarks/suite.py --users 10000 --years 5 --output results.json
+#   python benchmarks/suite.py --save-thresholds 3   # current results x3, on this machine
+#   python benchmarks/suite.py --strict              # fail on a regression
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from datagen import generate, username
+from fitness.auth import Authenticator, hash_password
+from fitness.catalog import DEFAULT_FOODS, Catalog
+from fitness.core import Tracker, bmi, food_calories
+from fitness.meals import MEALS, MealLog, RecipeBook, meal_totals, of_food, portion
+from fitness.storage import open_storage
+from fitness.timeseries import METRICS_FILE, MetricStore
+
+THRESHOLDS_FILE = os.path.join(HERE, "thresholds.json")
+BACKENDS = ("json", "sqlite")
+
+
+def median_ms(func, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return round(statistics.median(times) * 1000, 3)
+
+
+# ---------------------------- Cases ----------------------------
+def bench_accounts(tmp, args):
+    # Stored records are real hashes; one is shared by every account, as
+    # hashing `--users` passwords would take minutes. Register and login go
+    # through the Authenticator the window uses, key derivation included;
+    # a login again within the session TTL skips it.
+    stored = hash_password("pw")
+    results = {}
+    for backend in BACKENDS:
+        storage = open_storage(os.path.join(tmp, f"accounts-{backend}"), backend)
+        started = time.perf_counter()
+        for i in range(args.users):
+            storage.save_user(username(i), stored)
+        results[f"{backend}.save_user_us"] = round((time.perf_counter() - started) / args.users * 1e6, 2)
+        auth = Authenticator(storage)
+        new = iter(range(args.users, args.users + args.runs))
+        results[f"{backend}.register_ms"] = median_ms(lambda: auth.register(username(next(new)), "pw").result(),
+                                                      args.runs)
+        users = iter(range(args.runs))
+        results[f"{backend}.login_ms"] = median_ms(lambda: auth.login(username(next(users)), "pw").result(),
+                                                   args.runs)
+        lookups = 1000
+        started = time.perf_counter()
+        for i in range(lookups):
+            auth.login(username(i % args.runs), "pw").result()
+        results[f"{backend}.relogin_us"] = round((time.perf_counter() - started) / lookups * 1e6, 2)
+        auth.close()
+        storage.close()
+    return results
+
+
+def bench_tracker(tmp, args):
+    results = {}
+    for backend in BACKENDS:
+        data_dir = os.path.join(tmp, f"history-{backend}")
+        generate(data_dir, args.history_users, args.years, args.seed, backend)
+
+        def cold_load():
+            storage = open_storage(data_dir, backend)
+            try:
+                Tracker(storage, username(0)).load()
+            finally:
+                storage.close()
+
+        storage = open_storage(data_dir, backend)
+        tracker = Tracker(storage, username(0))
+        results[f"{backend}.load_cold_ms"] = median_ms(cold_load, args.runs)
+        results[f"{backend}.load_warm_ms"] = median_ms(tracker.load, args.runs)
+        tracker.load()
+        writes = 200
+        started = time.perf_counter()
+        for _ in range(writes):
+            tracker.add_steps(100)
+        results[f"{backend}.save_event_us"] = round((time.perf_counter() - started) / writes * 1e6, 2)
+        storage.close()
+    return results
+
+
+def bench_calculations(tmp, args):
+    kcal = DEFAULT_FOODS["Яблоко"][0]
+    number = 200_000
+    return {
+        "food_calories_ns": round(timeit.timeit(lambda: food_calories(kcal, 150), number=number) / number * 1e9, 1),
+        "bmi_ns": round(timeit.timeit(lambda: bmi(72.5, 178), number=number) / number * 1e9, 1),
+    }
+
+
+def bench_metrics(tmp, args):
+    metrics = MetricStore(os.path.join(tmp, "history-sqlite", METRICS_FILE))
+    name = username(0)
+    results = {
+        "last_90_days_ms": median_ms(lambda: metrics.last_days(name, "steps", 90), args.runs),
+        "streak_ms": median_ms(lambda: metrics.streak(name, "steps", 8000), args.runs),
+        "all_months_ms": median_ms(lambda: metrics.rollups(name, "weight", "month"), args.runs),
+    }
+    metrics.close()
+    return results
+
+
+def bench_meals(tmp, args):
+    # A day with 500 logged entries, and a recipe nested three deep
+    catalog = Catalog.from_foods((name, *values) for name, values in DEFAULT_FOODS.items())
+    entries = []
+    for i in range(500):
+        food = catalog.get(i % len(catalog))
+        entries.append({"id": str(i), "meal": MEALS[i % len(MEALS)], "food": food.name, "grams": 150,
+                        **portion(of_food(food), 150)._asdict()})
+    log = MealLog(list(entries))
+    book = RecipeBook(catalog)
+    book.define("base", [("Рис", 200, False), ("Морковь", 80, False), ("Лосось", 150, False)])
+    book.define("middle", [("base", 300, True), ("Авокадо", 50, False)])
+    book.define("top", [("middle", 250, True), ("base", 100, True), ("Хлеб", 40, False)], 350)
+    number = 20_000
+    grams = iter(range(10**9))
+
+    def edit():
+        amount = 100 + next(grams) % 100
+        log.update("250", grams=amount, **portion(of_food(catalog.get(0)), amount)._asdict())
+
+    def invalidated():
+        book.invalidate("Рис", recipe=False)
+        book.per_100g("top")
+
+    return {
+        "totals_500_ms": median_ms(lambda: meal_totals(entries), args.runs),
+        "edit_us": round(timeit.timeit(edit, number=number) / number * 1e6, 2),
+        "recipe_cached_ns": round(timeit.timeit(lambda: book.per_100g("top"), number=number) / number * 1e9, 1),
+        "recipe_invalidated_us": round(timeit.timeit(invalidated, number=number) / number * 1e6, 2),
+    }
+
+
+def bench_ui(tmp, args):
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        return {"skipped": "no display (run under xvfb-run)"}
+    try:
+        import customtkinter  # noqa: F401
+    except ImportError:
+        return {"skipped": "customtkinter is not installed"}
+    from fitness.gui import FitnessApp
+
+    cwd = os.getcwd()
+    os.chdir(tmp)
+    try:
+        app = FitnessApp()
+        app.prebuild_tabs = False
+        app.save_user("bench", "bench")
+        app.update()
+
+        def login():
+            app._complete_login("bench")
+            app.update_idletasks()
+
+        def relogin():
+            app.logout()
+            app.update()
+            login()
+
+        login()
+        first_login = app.last_login_to_interactive * 1000
+        names = list(app._tab_builders())
+        build = []
+        for name in names[1:]:
+            started = time.perf_counter()
+            app.tabview.set(name)
+            app._on_tab_change()
+            app.update_idletasks()
+            build.append(time.perf_counter() - started)
+
+        def switch_all():
+            for name in names:
+                app.tabview.set(name)
+                app._on_tab_change()
+                app.update_idletasks()
+
+        results = {
+            "first_login_ms": round(first_login, 2),
+            "relogin_ms": median_ms(relogin, args.runs),
+            "tab_first_build_ms": round(statistics.median(build) * 1000, 3),
+            "tab_switch_ms": round(median_ms(switch_all, args.runs) / len(names), 3),
+        }
+        app._on_close()
+        return results
+    finally:
+        os.chdir(cwd)
+
+
+CASES = {
+    "accounts": bench_accounts,
+    "tracker": bench_tracker,
+    "calculations": bench_calculations,
+    "metrics": bench_metrics,
+    "meals": bench_meals,
+    "ui": bench_ui,
+}
+
+
+# ---------------------------- Thresholds ----------------------------
+def check(results, thresholds):
+    # thresholds map "case.metric" to the highest acceptable value
+    failures = []
+    for key, limit in thresholds.items():
+        case, metric = key.split(".", 1)
+        value = results.get(case, {}).get(metric)
+        if isinstance(value, (int, float)) and value > limit:
+            failures.append(f"{key}: {value} > {limit}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite with regression thresholds")
+    parser.add_argument("--users", type=int, default=2000, help="accounts for the account benchmarks")
+    parser.add_argument("--history-users", type=int, default=3)
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--only", nargs="*", choices=list(CASES), help="run only these cases")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE)
+    parser.add_argument("--save-thresholds", type=float, metavar="FACTOR",
+                        help="write current results times FACTOR as the new thresholds")
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 when a result is over its threshold")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, case in CASES.items():
+            if args.only and name not in args.only:
+                continue
+            if name == "metrics" and "tracker" not in results:
+                generate(os.path.join(tmp, "history-sqlite"), args.history_users, args.years, args.seed, "sqlite")
+            started = time.perf_counter()
+            results[name] = case(tmp, args)
+            print(f"{name:>12} ({time.perf_counter() - started:5.1f} s): {results[name]}", flush=True)
+
+    report = {
+        "meta": {"time": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "platform": platform.platform(), "seed": args.seed, "users": args.users,
+                 "history_users": args.history_users, "years": args.years},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    thresholds = {}
+    if os.path.exists(args.thresholds):
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            thresholds = json.load(f)
+
+    if args.save_thresholds:
+        # Cases that did not run (or were skipped) keep their thresholds
+        thresholds.update({f"{case}.{metric}": round(value * args.save_thresholds, 3)
+                           for case, values in results.items() for metric, value in values.items()
+                           if isinstance(value, (int, float))})
+        with open(args.thresholds, "w", encoding="utf-8") as f:
+            json.dump(thresholds, f, indent=2, sort_keys=True)
+        print(f"Thresholds written to {args.thresholds}")
+        return
+    failures = check(results, thresholds)
+    for failure in failures:
+        print(f"{'REGRESSION' if args.strict else 'WARNING'} {failure}")
+    print(f"Results written to {args.output}; {len(failures)} over threshold")
+    sys.exit(1 if failures and args.strict else 0)
+
+
+if __name__ == "__main__":
+    main()
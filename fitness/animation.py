@@ -0,0 +1,93 @@
+import random
+import time
+
+
+class StarField:
+    # Twinkling stars on a canvas. Each frame recolours a random subset of
+    # `per_frame` stars instead of all of them, and stops at the deadline.
+    def __init__(self, canvas, stars, colors, per_frame=50):
+        self.canvas = canvas
+        self.stars = stars
+        self.colors = colors
+        self.per_frame = per_frame
+
+    def alive(self):
+        return bool(self.canvas.winfo_exists())
+
+    def visible(self):
+        # False while the tab is hidden or the window is minimized
+        return bool(self.canvas.winfo_viewable())
+
+    def step(self, deadline):
+        for star in random.sample(self.stars, min(self.per_frame, len(self.stars))):
+            if time.perf_counter() >= deadline:
+                break
+            self.canvas.itemconfig(star, fill=random.choice(self.colors))
+
+
+class AnimationEngine:
+    # Drives every canvas effect from one `after` loop. Only visible effects
+    # are stepped, each frame shares `budget_ms` between them, and when none
+    # is visible the loop stops until `wake()` is called (tab change, window
+    # restore), so a hidden animation costs nothing.
+    def __init__(self, root, interval=250, budget_ms=4.0):
+        self.root = root
+        self.interval = interval
+        self.budget_ms = budget_ms
+        self._effects = []
+        self._job = None
+        self._offset = 0
+        self.frames = 0
+        self.last_cost_ms = 0.0
+        self.max_cost_ms = 0.0
+        self._total_cost_ms = 0.0
+
+    def add(self, effect):
+        self._effects.append(effect)
+        self.wake()
+
+    def clear(self):
+        self._effects.clear()
+        self.stop()
+
+    def wake(self):
+        if self._job is None:
+            self._job = self.root.after_idle(self._frame)
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "effects": len(self._effects),
+            "running": self._job is not None,
+            "last_cost_ms": self.last_cost_ms,
+            "avg_cost_ms": self._total_cost_ms / self.frames if self.frames else 0.0,
+            "max_cost_ms": self.max_cost_ms,
+        }
+
+    def _frame(self):
+        self._job = None
+        self._effects = [e for e in self._effects if e.alive()]
+        visible = [e for e in self._effects if e.visible()]
+        if not visible:
+            return
+
+        started = time.perf_counter()
+        deadline = started + self.budget_ms / 1000
+        # Rotate the starting effect so a tight budget doesn't starve the last one
+        self._offset = (self._offset + 1) % len(visible)
+        for effect in visible[self._offset:] + visible[:self._offset]:
+            if time.perf_counter() >= deadline:
+                break
+            effect.step(deadline)
+
+        cost_ms = (time.perf_counter() - started) * 1000
+        self.frames += 1
+        self.last_cost_ms = cost_ms
+        self.max_cost_ms = max(self.max_cost_ms, cost_ms)
+        self._total_cost_ms += cost_ms
+        self._job = self.root.after(self.interval, self._frame)
@@ -0,0 +1,394 @@
+# Local HTTP/JSON service over the tracker, for thin clients:
+#   python -m fitness.api --port 8080
+# One asyncio event loop parses requests; blocking storage calls run on a
+# bounded thread pool (with SQLite that also bounds the open connections, one
+# per worker thread), and every user's requests are serialized by a per-user
+# lock. Tracker changes are written behind, as in the window.
+import asyncio
+import contextlib
+import json
+import os
+import signal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from fitness.auth import Authenticator
+from fitness.catalog import Catalog
+from fitness.columnar import COLUMNS_DIR, ColumnStore
+from fitness.core import Tracker, bmi, bmi_advice, event_writer
+from fitness.meals import MEALS, meal_at
+from fitness.storage import open_storage
+from fitness.timeseries import METRICS_FILE, MetricStore
+
+MAX_HEADER = 16 * 1024
+MAX_BODY = 1024 * 1024
+TRACKER_CACHE = 512  # loaded trackers kept, least recently used dropped first
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(body, key, positive=True):
+    try:
+        value = float(body[key])
+    except (KeyError, TypeError, ValueError):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{key}' must be a number")
+    if positive and value <= 0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{key}' must be positive")
+    return value
+
+
+def _progress(tracker):
+    return [p._asdict() for p in tracker.goal_progress]
+
+
+def _meal(body):
+    meal = str(body.get("meal") or meal_at())
+    if meal not in MEALS:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'meal' must be one of {', '.join(MEALS)}")
+    return meal
+
+
+def _meals(tracker):
+    log = tracker.meals
+    return {"entries": list(log.entries), "total_calories": tracker.total_calories,
+            "meals": {meal: log.totals(meal)._asdict() for meal in MEALS}, "total": log.totals()._asdict()}
+
+
+class TrackerService:
+    # The operations of the window's tabs, keyed by session token. Loaded
+    # trackers are cached per user up to TRACKER_CACHE and dropped on logout;
+    # a per-user lock only exists while requests of that user are running.
+    def __init__(self, data_dir="data", workers=8, write_delay=0.5):
+        self.storage = open_storage(data_dir)
+        self.metrics = MetricStore(os.path.join(data_dir, METRICS_FILE))
+        self.catalog = Catalog.default(data_dir)
+        self.columns = ColumnStore(os.path.join(data_dir, COLUMNS_DIR), self.metrics)
+        self.writer = event_writer(self.storage, delay=write_delay, metrics=self.metrics, columns=self.columns)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="storage")
+        self.auth = Authenticator(self.storage, workers=workers)
+        self._trackers = OrderedDict()
+        self._locks = {}  # username -> [lock, requests holding or waiting for it]
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    @contextlib.asynccontextmanager
+    async def _lock(self, username):
+        entry = self._locks.get(username)
+        if entry is None:
+            entry = self._locks[username] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[username]
+
+    def _user(self, token):
+        username = self.auth.session_user(token)
+        if username is None:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Not logged in")
+        return username
+
+    async def _tracker(self, username):
+        # Caller holds the user's lock
+        tracker = self._trackers.get(username)
+        if tracker is None:
+            tracker = Tracker(self.storage, username, writer=self.writer, metrics=self.metrics, catalog=self.catalog)
+            await self._run(tracker.load)
+            self._trackers[username] = tracker
+            # An evicted user's next request loads again; load() flushes the
+            # writer first, so nothing written behind is lost
+            while len(self._trackers) > TRACKER_CACHE:
+                self._trackers.popitem(last=False)
+        else:
+            self._trackers.move_to_end(username)
+        return tracker
+
+    # ---------------------------- Accounts ----------------------------
+    async def register(self, token, body):
+        username, password = str(body.get("username", "")).strip(), str(body.get("password", "")).strip()
+        if not username or not password:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "username and password are required")
+        async with self._lock(username):
+            if not await asyncio.wrap_future(self.auth.register(username, password)):
+                raise ApiError(HTTPStatus.CONFLICT, "Username is already taken")
+        return {"username": username}
+
+    async def login(self, token, body):
+        username, password = str(body.get("username", "")).strip(), str(body.get("password", "")).strip()
+        if not await asyncio.wrap_future(self.auth.login(username, password)):
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Wrong username or password")
+        return {"token": self.auth.open_session(username)}
+
+    async def logout(self, token, body):
+        username = self.auth.session_user(token)
+        self.auth.close_session(token)
+        if username is not None:
+            async with self._lock(username):
+                self._trackers.pop(username, None)
+        return {}
+
+    # ---------------------------- Tracker ----------------------------
+    async def state(self, token, body):
+        username = self._user(token)
+        async with self._lock(username):
+            tracker = await self._tracker(username)
+            tracker.rollover()
+            return {"day": tracker.state["day"], "water_intake": tracker.water_intake,
+                    "total_calories": tracker.total_calories, "steps": tracker.steps, "goals": list(tracker.goals),
+                    "progress": _progress(tracker)}
+
+    async def food(self, token, body):
+        # {"food": catalog name} or {"recipe": recipe name}, "grams", optional "meal"
+        username = self._user(token)
+        grams, meal = _number(body, "grams"), _meal(body)
+        async with self._lock(username):
+            tracker = await self._tracker(username)
+            if "recipe" in body:
+                name = str(body["recipe"])
+                if name not in tracker.recipes:
+                    raise ApiError(HTTPStatus.NOT_FOUND, "Unknown recipe")
+                kcal = tracker.add_recipe(name, grams, meal)
+            else:
+                index = self.catalog.find(str(body.get("food", "")))
+                if index is None:
+                    raise ApiError(HTTPStatus.NOT_FOUND, "Unknown food")
+                kcal = tracker.add_food(self.catalog.get(index), grams, meal)
+            return {"kcal": kcal, "total_calories": tracker.total_calories, "id": tracker.meals.entries[-1]["id"]}
+
+    async def meals(self, token, body):
+        # GET: today's entries and totals per meal. POST {"id", "grams"
+        # and/or "meal"} changes an entry, {"id", "delete": true} removes it.
+        username = self._user(token)
+        async with self._lock(username):
+            tracker = await self._tracker(username)
+            tracker.rollover()
+            if body is not None:
+                entry_id = str(body.get("id", ""))
+                if entry_id not in tracker.meals.by_id:
+                    raise ApiError(HTTPStatus.NOT_FOUND, "Unknown entry")
+                if body.get("delete"):
+                    tracker.delete_entry(entry_id)
+                else:
+                    grams = _number(body, "grams") if "grams" in body else None
+                    tracker.edit_entry(entry_id, grams, _meal(body) if "meal" in body else None)
+            return _meals(tracker)
+
+    async def recipes(self, token, body):
+        # GET: the user's recipes. POST {"name", "ingredients": [{"name",
+        # "grams", "recipe"}], optional "yield"} adds or replaces one.
+        username = self._user(token)
+        async with self._lock(username):
+            tracker = await self._tracker(username)
+            if body is None:
+                return {"recipes": {name: {**recipe, "per_100g": tracker.recipes.per_100g(name)._asdict()}
+                                    for name, recipe in tracker.recipes.recipes.items()}}
+            try:
+                ingredients = [(str(part["name"]), float(part["grams"]), bool(part.get("recipe")))
+                               for part in body.get("ingredients") or ()]
+                weight = _number(body, "yield") if body.get("yield") is not None else None
+                recipe = tracker.define_recipe(str(body.get("name", "")), ingredients, weight)
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ApiError(HTTPStatus.BAD_REQUEST, str(exc))
+            return {"recipe": recipe}
+
+    async def water(self, token, body):
+        username = self._user(token)
+        async with self._lock(username):
+            tracker = await self._tracker(username)
+            if "set" in body:
+                value = tracker.set_water(_number(body, "set", positive=False))
+            else:
+                value = tracker.add_water(_number(body, "liters", positive=False))
+            return {"water_intake": value}
+
+    async def steps(self, token, body):
+        username = self._user(token)
+        steps = _number(body, "steps")
+        async with self._lock(username):
+            tracker = await self._tracker(username)
+            return {"steps": tracker.add_steps(steps)}
+
+    async def bmi(self, token, body):
+        username = self._user(token)
+        weight, height = _number(body, "weight"), _number(body, "height")
+        value = bmi(weight, height)
+        async with self._lock(username):
+            tracker = await self._tracker(username)
+            tracker.log_weight(weight)
+        return {"bmi": round(value, 1), "advice": bmi_advice(value)}
+
+    async def goals(self, token, body):
+        username = self._user(token)
+        async with self._lock(username):
+            tracker = await self._tracker(username)
+            if body is None:
+                return {"goals": list(tracker.goals), "progress": _progress(tracker)}
+            try:
+                # Seeding the new goal's progress reads the metric store
+                goal = await self._run(tracker.add_goal, str(body.get("desc", "")), _number(body, "value"),
+                                       str(body.get("period", "1 месяц")))
+            except ValueError as exc:
+                raise ApiError(HTTPStatus.BAD_REQUEST, str(exc))
+            return {"goal": goal}
+
+    def close(self):
+        self.auth.close()
+        self.pool.shutdown(wait=True)
+        self.writer.close()
+        self.columns.close()
+        self.storage.close()
+        self.metrics.close()
+
+
+# ---------------------------- HTTP ----------------------------
+def _routes(service):
+    return {
+        ("POST", "/register"): service.register,
+        ("POST", "/login"): service.login,
+        ("POST", "/logout"): service.logout,
+        ("GET", "/state"): service.state,
+        ("POST", "/food"): service.food,
+        ("GET", "/meals"): service.meals,
+        ("POST", "/meals"): service.meals,
+        ("GET", "/recipes"): service.recipes,
+        ("POST", "/recipes"): service.recipes,
+        ("POST", "/water"): service.water,
+        ("POST", "/steps"): service.steps,
+        ("POST", "/bmi"): service.bmi,
+        ("GET", "/goals"): service.goals,
+        ("POST", "/goals"): service.goals,
+    }
+
+
+async def _read_request(reader):
+    # Returns (method, path, headers, body) or None when the client is done
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _version = lines[0].split(" ", 2)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Bad request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Bad Content-Length")
+    if length < 0 or length > MAX_BODY:
+        raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def _handle(routes, reader, writer):
+    try:
+        while True:
+            # A request that cannot be parsed leaves the stream unusable
+            keep_alive = False
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, raw = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                handler = routes.get((method, path))
+                if handler is None:
+                    raise ApiError(HTTPStatus.NOT_FOUND, "No such endpoint")
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "Body is not JSON")
+                if body is not None and not isinstance(body, dict):
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+                token = headers.get("authorization", "").removeprefix("Bearer ").strip()
+                if body is None and method == "POST":
+                    body = {}
+                status, payload = HTTPStatus.OK, await handler(token, body)
+            except ApiError as exc:
+                status, payload = exc.status, {"error": str(exc)}
+            except Exception as exc:
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(exc)}
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service, host="127.0.0.1", port=8080, ready=None):
+    # Runs until SIGINT/SIGTERM, then closes open connections so every
+    # handler finishes its current request and returns
+    routes = _routes(service)
+    handlers = set()
+
+    async def connected(reader, writer):
+        task = asyncio.current_task()
+        handlers.add((task, writer))
+        try:
+            await _handle(routes, reader, writer)
+        finally:
+            handlers.discard((task, writer))
+
+    server = await asyncio.start_server(connected, host, port, limit=MAX_HEADER, backlog=1024)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C still raises KeyboardInterrupt
+    if ready is not None:
+        ready(server, stop)
+    async with server:
+        await stop.wait()
+        for _task, writer in list(handlers):
+            writer.transport.abort()
+        await asyncio.gather(*(task for task, _writer in list(handlers)), return_exceptions=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HTTP/JSON API for the fitness tracker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--workers", type=int, default=8, help="storage worker threads")
+    args = parser.parse_args()
+    service = TrackerService(args.data_dir, workers=args.workers)
+    print(f"Serving on http://{args.host}:{args.port}", flush=True)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
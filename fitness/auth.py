@@ -0,0 +1,167 @@
+# Password hashing and login checks. Stored passwords are
+# "scrypt$n$r$p$salt$hash" (or "pbkdf2_sha256$iterations$salt$hash" where
+# hashlib has no scrypt); anything else is a plaintext entry from before
+# hashing and is replaced by a hash on the first successful login. The slow
+# key derivation runs on a worker pool so the Tk loop never waits for it.
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 15, 8, 1
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+PBKDF2_ITERATIONS = 600_000
+SESSION_TTL = 15 * 60  # seconds
+MAX_SESSIONS = 10000  # per table; the least recently used go first
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def hash_password(password, salt=None):
+    salt = salt or os.urandom(16)
+    if hasattr(hashlib, "scrypt"):
+        digest = hashlib.scrypt(password.encode("utf-8"), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+                                maxmem=SCRYPT_MAXMEM)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(digest)}"
+
+
+# Scheme -> number of "$"-separated fields after it
+HASH_FIELDS = {"scrypt": 5, "pbkdf2_sha256": 3}
+
+
+def _b64_field(text):
+    try:
+        return bool(text) and bool(base64.b64decode(text, validate=True))
+    except (ValueError, binascii.Error):
+        return False
+
+
+def is_hashed(stored):
+    # Only a complete hash in one of our formats; anything else, including a
+    # plaintext password that happens to start with "scrypt$", is plaintext
+    scheme, *params = stored.split("$")
+    if HASH_FIELDS.get(scheme) != len(params):
+        return False
+    *numbers, salt, digest = params
+    return all(number.isdigit() for number in numbers) and _b64_field(salt) and _b64_field(digest)
+
+
+def verify_password(password, stored):
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    scheme, *params = stored.split("$")
+    try:
+        if scheme == "scrypt":
+            n, r, p, salt, expected = params
+            digest = hashlib.scrypt(password.encode("utf-8"), salt=base64.b64decode(salt), n=int(n), r=int(r),
+                                    p=int(p), maxmem=SCRYPT_MAXMEM)
+        else:
+            iterations, salt, expected = params
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), base64.b64decode(salt),
+                                         int(iterations))
+        return hmac.compare_digest(digest, base64.b64decode(expected))
+    except (ValueError, binascii.Error, MemoryError):
+        # Parameters that hashlib refuses (e.g. n not a power of two)
+        return False
+
+
+class Authenticator:
+    # Registration and login against `storage` on a small worker pool; both
+    # return concurrent.futures.Future of a bool (False for a taken username
+    # or a wrong password). A successful login is remembered for
+    # `ttl` seconds as an HMAC of the password under a per-process key, so
+    # logging in again (e.g. after switching back from the login screen)
+    # skips the key derivation. Sessions are random tokens kept in memory.
+    # Both tables are ordered by expiry (every insert or use moves an entry
+    # to the end), so expired entries are swept from the front on insert,
+    # and hold at most `limit` entries each.
+    def __init__(self, storage, workers=2, ttl=SESSION_TTL, limit=MAX_SESSIONS):
+        self.storage = storage
+        self.ttl = ttl
+        self.limit = limit
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth")
+        self._key = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        self._verified = OrderedDict()  # username -> (fingerprint, expires)
+        self._sessions = OrderedDict()  # token -> (username, expires)
+
+    def _put(self, table, key, value):
+        # Call with the lock held; `value[1]` is the expiry
+        now = time.monotonic()
+        table[key] = value
+        table.move_to_end(key)
+        while table:
+            oldest = next(iter(table))
+            if table[oldest][1] > now and len(table) <= self.limit:
+                break
+            del table[oldest]
+
+    def _fingerprint(self, username, password):
+        return hmac.new(self._key, f"{username}\0{password}".encode("utf-8"), hashlib.sha256).digest()
+
+    def register(self, username, password):
+        with self._lock:
+            self._verified.pop(username, None)
+        return self.pool.submit(self._register, username, password)
+
+    def _register(self, username, password):
+        # Never replaces an existing account's password
+        return self.storage.create_user(username, hash_password(password))
+
+    def login(self, username, password):
+        with self._lock:
+            cached = self._verified.get(username)
+        if cached and cached[1] > time.monotonic() and hmac.compare_digest(
+                cached[0], self._fingerprint(username, password)):
+            future = Future()
+            future.set_result(True)
+            return future
+        return self.pool.submit(self._login, username, password)
+
+    def _login(self, username, password):
+        stored = self.storage.password_record(username)
+        if stored is None or not verify_password(password, stored):
+            return False
+        if not is_hashed(stored):
+            self.storage.save_user(username, hash_password(password))
+        fingerprint = self._fingerprint(username, password)
+        with self._lock:
+            self._put(self._verified, username, (fingerprint, time.monotonic() + self.ttl))
+        return True
+
+    # ---------------------------- Sessions ----------------------------
+    def open_session(self, username):
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._put(self._sessions, token, (username, time.monotonic() + self.ttl))
+        return token
+
+    def session_user(self, token):
+        # The username, or None once the session expired; use extends it
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            username, expires = session
+            if expires <= time.monotonic():
+                del self._sessions[token]
+                return None
+            self._put(self._sessions, token, (username, time.monotonic() + self.ttl))
+        return username
+
+    def close_session(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
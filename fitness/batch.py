@@ -0,0 +1,227 @@
+# Nightly recomputation of everything derived from users' raw records, for
+# when the calorie table, the BMI bands or the goal advice rules change:
+# - calories of every logged food from grams and the current catalog, with
+#   the metric store's calorie samples that moved changed in place and their
+#   rollups rebuilt (and today's running total shifted to match); the
+#   recomputed calories are written back into the logged events
+# - each goal's advice text from the advice rules
+# - a per-user summary row: BMI, BMI band and how many goals are done
+# Users are cut into shards in username order and spread over a process
+# pool; each worker has its own database connections and writes a whole
+# shard in one transaction per database. Shards are retired in order and
+# the last username of the finished prefix is checkpointed, so an
+# interrupted run resumes where it stopped. Recomputing is idempotent (a
+# second run finds every event already holding its recomputed calories and
+# changes nothing), so shards that finished past the checkpoint are simply
+# done again.
+#   python -m fitness.batch --data-dir data --workers 8
+import json
+import os
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import islice
+from multiprocessing.util import Finalize
+
+from fitness.catalog import Catalog
+from fitness.columnar import COLUMNS_DIR, ColumnStore
+from fitness.core import bmi, bmi_band, food_calories
+from fitness.goals import GoalEngine, goal_advice
+from fitness.persistence import atomic_write_json
+from fitness.storage import DB_FILE, SQLiteStorage, open_storage
+from fitness.timeseries import METRICS_FILE, MetricStore
+
+CHECKPOINT_FILE = "recompute.checkpoint.json"
+SHARD_SIZE = 200
+
+# One user's results; `calories` is the [(ts, logged kcal, recomputed kcal)]
+# of the calorie samples that moved, `since` the first day that changed,
+# `rewrites` the [(payload, event id)] of events whose calories moved,
+# `advice` the [(text, goal id)] updates
+Recomputed = namedtuple("Recomputed", "username calories since today_delta rewrites advice bmi bmi_band "
+                                      "goals_total goals_done")
+
+
+# ---------------------------- Per user ----------------------------
+def recompute_user(storage, metrics, kcal_of, username, today):
+    # `kcal_of(name)` is the catalog's kcal per 100 g, or None for foods no
+    # longer in it (those keep the calories they were logged with, as do
+    # recipe entries). Edits and deletions log the change in kcal, which is
+    # recomputed against the entry's recomputed calories.
+    day = storage.day(username)
+    calories = []
+    since = None
+    today_delta = 0.0
+    rewrites = []
+    current = {}  # entry id -> recomputed kcal
+    for event_id, event in storage.food_events(username):
+        kind, entry = event["type"], event.get("id")
+        if kind == "food_delete":
+            logged = event["delta"]
+            recomputed = -current.pop(entry) if entry in current else logged
+        else:
+            per_100g = None if event.get("recipe") else kcal_of(event["food"])
+            kcal = food_calories(per_100g, event["grams"]) if per_100g is not None else event["kcal"]
+            if kind == "food":
+                logged, recomputed = event["kcal"], kcal
+            else:
+                logged = event["delta"]
+                recomputed = kcal - current.get(entry, event["kcal"] - logged)
+            current[entry] = kcal
+        if abs(recomputed - logged) > 1e-9:
+            calories.append((event["ts"], logged, recomputed))
+            since = min(since or "9999", event["ts"][:10])
+            if event["ts"][:10] == day:
+                today_delta += recomputed - logged
+            if kind == "food":
+                event["kcal"] = recomputed
+            elif kind == "food_edit":
+                event.update(kcal=current[entry], delta=recomputed)
+            else:
+                event["delta"] = recomputed
+            rewrites.append((json.dumps(event, ensure_ascii=False), event_id))
+
+    rows = storage.goal_rows(username)
+    advice = []
+    for goal_id, goal in rows:
+        text = goal_advice(goal["desc"])
+        if text != goal["advice"]:
+            advice.append((text, goal_id))
+    engine = GoalEngine(metrics, username)
+    engine.reset([goal for _, goal in rows])
+    done = sum(progress.done for progress in engine.progress(today))
+
+    weight, height = metrics.latest(username, "weight"), metrics.latest(username, "height")
+    value = bmi(weight, height) if weight and height else None
+    return Recomputed(username, calories, since, today_delta, rewrites, advice,
+                      value, bmi_band(value) if value is not None else None, len(rows), done)
+
+
+# ---------------------------- Worker processes ----------------------------
+_worker = {}
+
+
+def _init_worker(data_dir):
+    metrics = MetricStore(os.path.join(data_dir, METRICS_FILE))
+    catalog = Catalog.default(data_dir)
+    kcal = {}
+
+    def kcal_of(name):
+        if name not in kcal:
+            index = catalog.find(name)
+            kcal[name] = catalog.get(index).kcal if index is not None else None
+        return kcal[name]
+
+    _worker.update(storage=SQLiteStorage(os.path.join(data_dir, DB_FILE)), metrics=metrics, kcal_of=kcal_of,
+                   columns=ColumnStore(os.path.join(data_dir, COLUMNS_DIR), metrics))
+    # Runs when the pool shuts the worker down
+    Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker():
+    _worker["columns"].close()
+    _worker["storage"].close()
+    _worker["metrics"].close()
+
+
+def recompute_shard(usernames, today):
+    storage, metrics, columns = _worker["storage"], _worker["metrics"], _worker["columns"]
+    results = [recompute_user(storage, metrics, _worker["kcal_of"], username, date.fromisoformat(today))
+               for username in usernames]
+    moved = [r for r in results if r.calories]
+    # The two databases commit separately. Samples go first: a run stopped
+    # in between finds the events unchanged on resume, and changing the
+    # samples again matches none of them (see revalue_samples()).
+    metrics.revalue_samples({(r.username, "calories"): r.calories for r in moved})
+    storage.write_recomputed(results)
+    for r in moved:
+        columns.refresh(r.username, r.since)
+    return len(results)
+
+
+# ---------------------------- Run ----------------------------
+def _shards(storage, after, size):
+    # Reads one shard of names at a time, so no cursor stays open while the
+    # workers write
+    while True:
+        shard = list(islice(storage.usernames(after), size))
+        if not shard:
+            return
+        yield shard
+        after = shard[-1]
+
+
+def load_checkpoint(data_dir):
+    path = os.path.join(data_dir, CHECKPOINT_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def run(data_dir="data", workers=None, shard_size=SHARD_SIZE, restart=False, today=None, progress=None):
+    # Recomputes every user and returns how many were done in this run.
+    # `progress(users_done)` is called as shards finish. A resumed run keeps
+    # the day that goal status is computed for.
+    workers = workers or os.cpu_count() or 1
+    checkpoint_path = os.path.join(data_dir, CHECKPOINT_FILE)
+    checkpoint = None if restart else load_checkpoint(data_dir)
+    if checkpoint:
+        after, started, today = checkpoint["after"], checkpoint["started"], checkpoint["today"]
+    else:
+        after, started = "", datetime.now().isoformat(timespec="seconds")
+        today = (today or date.today()).isoformat()
+
+    storage = open_storage(data_dir, "sqlite")  # also migrates JSON accounts
+    count = 0
+    inflight = deque()
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+            def retire(block):
+                # Collects finished shards from the front, in order; `block`
+                # waits for the oldest one
+                nonlocal after, count
+                retired = False
+                while inflight and (block or inflight[0][1].done()):
+                    last, future = inflight.popleft()
+                    count += future.result()
+                    after, block, retired = last, False, True
+                if retired:
+                    atomic_write_json(checkpoint_path, {"after": after, "started": started, "today": today})
+                    if progress:
+                        progress(count)
+
+            for shard in _shards(storage, after, shard_size):
+                inflight.append((shard[-1], pool.submit(recompute_shard, shard, today)))
+                # Two shards per worker queued keeps every worker busy
+                retire(block=len(inflight) >= 2 * workers)
+            while inflight:
+                retire(block=True)
+    finally:
+        storage.close()
+    try:
+        os.remove(checkpoint_path)
+    except FileNotFoundError:
+        pass
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recompute derived data of every user")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--restart", action="store_true", help="ignore a checkpoint from an interrupted run")
+    args = parser.parse_args()
+
+    resumed = None if args.restart else load_checkpoint(args.data_dir)
+    if resumed:
+        print(f"Resuming after {resumed['after']} (run started {resumed['started']})")
+    begun = time.perf_counter()
+    done = run(args.data_dir, args.workers, args.shard_size, args.restart,
+               progress=lambda n: print(f"\r{n} users", end="", flush=True))
+    print(f"\rRecomputed {done} users in {time.perf_counter() - begun:.1f} s")
@@ -0,0 +1,198 @@
+import argparse
+import csv
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, namedtuple
+
+# Built-in foods, per 100 g: kcal, protein, fat, carbs
+DEFAULT_FOODS = {
+    "Яблоко": (52, 0.3, 0.2, 14.0), "Банан": (89, 1.1, 0.3, 23.0),
+    "Куриная грудка": (165, 31.0, 3.6, 0.0), "Рис": (130, 2.7, 0.3, 28.0),
+    "Хлеб": (265, 9.0, 3.2, 49.0), "Молоко": (42, 3.4, 1.0, 5.0),
+    "Гречка": (123, 4.5, 1.6, 25.0), "Овсянка": (68, 2.4, 1.4, 12.0),
+    "Яйцо": (68, 5.5, 4.8, 0.6), "Картофель": (77, 2.0, 0.1, 17.0),
+    "Морковь": (41, 0.9, 0.2, 10.0), "Огурец": (16, 0.7, 0.1, 3.6),
+    "Томаты": (18, 0.9, 0.2, 3.9), "Лосось": (208, 20.0, 13.0, 0.0),
+    "Авокадо": (160, 2.0, 15.0, 9.0),
+}
+
+CATALOG_FILE = "foods.bin"
+
+# File layout: header, fixed-width records sorted by case-folded name, then
+# the UTF-8 names. A record points into the name block, so any record can be
+# read straight from the mapped file without parsing the rest.
+MAGIC = b"FCAT"
+HEADER = struct.Struct("<4sHHI")          # magic, version, record size, count
+RECORD = struct.Struct("<IHxxffff")       # name offset, name length, kcal, protein, fat, carbs
+
+Food = namedtuple("Food", "name kcal protein fat carbs")
+
+
+def encode_catalog(foods):
+    # `foods` is an iterable of (name, kcal, protein, fat, carbs)
+    foods = sorted(foods, key=lambda food: food[0].casefold())
+    names = bytearray()
+    records = bytearray()
+    for name, kcal, protein, fat, carbs in foods:
+        encoded = name.encode("utf-8")
+        records += RECORD.pack(len(names), len(encoded), kcal, protein, fat, carbs)
+        names += encoded
+    return HEADER.pack(MAGIC, 1, RECORD.size, len(foods)) + bytes(records) + bytes(names)
+
+
+def write_catalog(path, foods):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_catalog(foods))
+    os.replace(tmp_path, path)
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Keys:
+    # Case-folded names as a lazy sequence, so bisect can search the file directly
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def __len__(self):
+        return len(self._catalog)
+
+    def __getitem__(self, index):
+        return self._catalog.name(index).casefold()
+
+
+class Catalog:
+    def __init__(self, buffer, source=None):
+        self._buf = buffer
+        self.source = source
+        magic, version, record_size, self._count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError(f"Not a food catalog: {source}")
+        self._names_start = HEADER.size + self._count * RECORD.size
+        self._keys = _Keys(self)
+        self._trigram_index = None
+        self._warm_thread = None
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), source=path)
+
+    @classmethod
+    def default(cls, data_dir="data"):
+        path = os.path.join(data_dir, CATALOG_FILE)
+        if os.path.exists(path):
+            return cls.open(path)
+        return cls.from_foods((name, *values) for name, values in DEFAULT_FOODS.items())
+
+    @classmethod
+    def from_foods(cls, foods):
+        # Small in-memory catalog, same format as the file
+        return cls(encode_catalog(foods))
+
+    def __len__(self):
+        return self._count
+
+    def name(self, index):
+        offset, length = struct.unpack_from("<IH", self._buf, HEADER.size + index * RECORD.size)
+        start = self._names_start + offset
+        return bytes(self._buf[start:start + length]).decode("utf-8")
+
+    def get(self, index):
+        offset, length, kcal, protein, fat, carbs = RECORD.unpack_from(self._buf, HEADER.size + index * RECORD.size)
+        start = self._names_start + offset
+        name = bytes(self._buf[start:start + length]).decode("utf-8")
+        return Food(name, round(kcal, 2), round(protein, 2), round(fat, 2), round(carbs, 2))
+
+    def find(self, name):
+        key = name.casefold()
+        index = bisect_left(self._keys, key)
+        while index < self._count and self._keys[index] == key:
+            if self.name(index) == name:
+                return index
+            index += 1
+        return None
+
+    # ---------------------------- Search ----------------------------
+    def prefix(self, query, limit=50):
+        key = query.casefold()
+        index = bisect_left(self._keys, key)
+        found = []
+        while index < self._count and len(found) < limit and self._keys[index].startswith(key):
+            found.append(index)
+            index += 1
+        return found
+
+    def fuzzy(self, query, limit=50, max_postings=50_000):
+        # Trigram match for typos and words in the middle of a name. The
+        # index is built on first use. Foods are ranked by how many of the
+        # query's trigrams they contain; posting lists are counted rarest
+        # first and common trigrams are skipped once `max_postings` entries
+        # were counted, which bounds the cost of a query.
+        index = self.trigram_index()
+        postings = sorted((index.get(gram, ()) for gram in _trigrams(query.casefold())), key=len)
+        counts = Counter()
+        used = 0
+        for posting in postings:
+            if used and len(posting) > max_postings:
+                break
+            counts.update(posting)
+            max_postings -= len(posting)
+            used += 1
+        needed = max(1, (used + 1) // 2)
+        return [i for i, hits in counts.most_common(limit) if hits >= needed]
+
+    def search(self, query, limit=50):
+        query = query.strip()
+        if not query:
+            return range(self._count)
+        found = self.prefix(query, limit)
+        # While the trigram index is still being built in the background,
+        # answer with prefix matches only instead of waiting for it
+        warming = self._warm_thread is not None and self._warm_thread.is_alive()
+        if len(found) < limit and not warming:
+            seen = set(found)
+            found += [i for i in self.fuzzy(query, limit) if i not in seen][:limit - len(found)]
+        return found
+
+    def warm_up(self):
+        # Build the trigram index off the UI thread ahead of the first fuzzy query
+        if self._trigram_index is None and self._warm_thread is None:
+            self._warm_thread = threading.Thread(target=self.trigram_index, name="catalog-index", daemon=True)
+            self._warm_thread.start()
+
+    def trigram_index(self):
+        if self._trigram_index is None:
+            index = {}
+            for i in range(self._count):
+                for gram in _trigrams(self._keys[i]):
+                    posting = index.get(gram)
+                    if posting is None:
+                        posting = index[gram] = array("I")
+                    posting.append(i)
+            self._trigram_index = index
+        return self._trigram_index
+
+
+def load_csv(path):
+    # name,kcal,protein,fat,carbs per 100 g, with a header row
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            yield (row["name"], float(row["kcal"]), float(row.get("protein") or 0),
+                   float(row.get("fat") or 0), float(row.get("carbs") or 0))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the food catalog from a CSV file")
+    parser.add_argument("csv_file")
+    parser.add_argument("output", nargs="?", default=os.path.join("data", CATALOG_FILE))
+    args = parser.parse_args()
+    write_catalog(args.output, load_csv(args.csv_file))
+    print(f"Wrote {len(Catalog.open(args.output))} foods to {args.output}")
@@ -0,0 +1,236 @@
+# History charts on a Tk canvas. Only the visible part of a series is
+# decimated to roughly one point per pixel column (LTTB for lines, bucket
+# means for bars), and the canvas items are created once and moved with
+# coords() on every redraw, so panning and zooming over years of daily data
+# costs about the same as over a week. Works on any tkinter/customtkinter
+# canvas; nothing here imports a GUI toolkit.
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+MIN_SPAN = 7  # days
+
+
+# ---------------------------- Decimation ----------------------------
+def lttb(xs, ys, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and, per
+    # bucket, the point forming the largest triangle with its neighbours
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(xs), list(ys)
+    out_x, out_y = [xs[0]], [ys[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int((i + 1) * every) + 1
+        end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(xs[start:end]) / (end - start)
+        avg_y = sum(ys[start:end]) / (end - start)
+        ax, ay = xs[a], ys[a]
+        best, best_j = -1.0, start
+        for j in range(int(i * every) + 1, start):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best:
+                best, best_j = area, j
+        out_x.append(xs[best_j])
+        out_y.append(ys[best_j])
+        a = best_j
+    out_x.append(xs[-1])
+    out_y.append(ys[-1])
+    return out_x, out_y
+
+
+def bucket_means(xs, ys, buckets):
+    # At most `buckets` points: each the mean x and y of a run of neighbours
+    n = len(xs)
+    if buckets >= n or buckets < 1:
+        return list(xs), list(ys)
+    out_x, out_y = [], []
+    for i in range(buckets):
+        start, end = i * n // buckets, (i + 1) * n // buckets
+        out_x.append(sum(xs[start:end]) / (end - start))
+        out_y.append(sum(ys[start:end]) / (end - start))
+    return out_x, out_y
+
+
+# ---------------------------- Chart ----------------------------
+class Chart:
+    # One daily series: `xs` are date ordinals in ascending order. `kind` is
+    # "line" or "bar". The visible window is [view_start, view_end] in days.
+    def __init__(self, canvas, kind="line", color="#8A2BE2", text_color="#E0B3FF",
+                 width=600, height=200, margin=45, bar_px=4):
+        self.canvas = canvas
+        self.kind = kind
+        self.color = color
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.bar_px = bar_px
+        self.xs = []
+        self.ys = []
+        self.view_start = self.view_end = 0
+        self.redraws = 0
+        self._pending = False
+        self._drag_x = None
+
+        font = ("Segoe UI", 10)
+        self._axis = canvas.create_line(0, 0, 0, 0, fill=text_color)
+        self._line = canvas.create_line(0, 0, 0, 0, fill=color, width=2, state="hidden")
+        self._bars = []
+        self._labels = {
+            name: canvas.create_text(0, 0, text="", fill=text_color, font=font, anchor=anchor)
+            for name, anchor in (("top", "e"), ("bottom", "e"), ("start", "nw"), ("end", "ne"), ("empty", "center"))
+        }
+
+    # ---------------------------- Data and view ----------------------------
+    def set_series(self, xs, ys, keep_view=False):
+        # Any sequences work, e.g. memoryviews over a column file; they are
+        # kept as they are, not copied. NaN values are days without data.
+        had_data = bool(self.xs)
+        self.xs, self.ys = xs, ys
+        if not (keep_view and had_data) and self.xs:
+            self.view_start, self.view_end = self.xs[0], max(self.xs[-1], self.xs[0] + MIN_SPAN)
+        self.request_redraw()
+
+    def zoom(self, factor, at_px=None):
+        # factor < 1 zooms in, around the pixel column `at_px`
+        if not self.xs:
+            return
+        span = self.view_end - self.view_start
+        full = max(self.xs[-1] - self.xs[0], MIN_SPAN)
+        new_span = min(max(span * factor, MIN_SPAN), full)
+        at = self._x_to_day(at_px) if at_px is not None else self.view_start + span / 2
+        ratio = (at - self.view_start) / span if span else 0.5
+        self._set_view(at - new_span * ratio, new_span)
+
+    def pan(self, dx_px):
+        if not self.xs:
+            return
+        span = self.view_end - self.view_start
+        self._set_view(self.view_start - dx_px * span / self._plot_width(), span)
+
+    def _set_view(self, start, span):
+        lo, hi = self.xs[0], max(self.xs[-1], self.xs[0] + span)
+        start = min(max(start, lo), hi - span)
+        self.view_start, self.view_end = start, start + span
+        self.request_redraw()
+
+    # ---------------------------- Mouse ----------------------------
+    def bind_mouse(self):
+        c = self.canvas
+        c.bind("<MouseWheel>", lambda e: self.zoom(0.8 if e.delta > 0 else 1.25, e.x))
+        c.bind("<Button-4>", lambda e: self.zoom(0.8, e.x))
+        c.bind("<Button-5>", lambda e: self.zoom(1.25, e.x))
+        c.bind("<ButtonPress-1>", self._drag_start)
+        c.bind("<B1-Motion>", self._drag)
+        c.bind("<Configure>", self._resize)
+
+    def _drag_start(self, event):
+        self._drag_x = event.x
+
+    def _drag(self, event):
+        if self._drag_x is not None:
+            self.pan(event.x - self._drag_x)
+            self._drag_x = event.x
+
+    def _resize(self, event):
+        if (event.width, event.height) != (self.width, self.height):
+            self.width, self.height = event.width, event.height
+            self.request_redraw()
+
+    # ---------------------------- Drawing ----------------------------
+    def request_redraw(self):
+        # Any number of pan/zoom events in one turn cost one redraw
+        if not self._pending:
+            self._pending = True
+            self.canvas.after_idle(self.redraw)
+
+    def _plot_width(self):
+        return max(self.width - 2 * self.margin, 1)
+
+    def _x_to_day(self, px):
+        return self.view_start + (px - self.margin) * (self.view_end - self.view_start) / self._plot_width()
+
+    def redraw(self):
+        self._pending = False
+        self.redraws += 1
+        c = self.canvas
+        left, right = self.margin, self.margin + self._plot_width()
+        top, bottom = 10, self.height - 25
+        c.coords(self._axis, left, top, left, bottom, right, bottom)
+
+        i = bisect_left(self.xs, self.view_start)
+        j = bisect_right(self.xs, self.view_end)
+        xs, ys = self.xs[i:j], self.ys[i:j]
+        if any(y != y for y in ys):
+            xs = [x for x, y in zip(xs, ys) if y == y]
+            ys = [y for y in ys if y == y]
+        if not xs:
+            self._hide_series()
+            c.itemconfigure(self._labels["empty"], text="Нет данных")
+            c.coords(self._labels["empty"], (left + right) / 2, (top + bottom) / 2)
+            return
+        c.itemconfigure(self._labels["empty"], text="")
+
+        low, high = min(ys), max(ys)
+        if self.kind == "bar":
+            low = min(low, 0.0)
+        if high == low:
+            high = low + 1.0
+        scale_x = (right - left) / (self.view_end - self.view_start)
+        scale_y = (bottom - top) / (high - low)
+
+        def px(x):
+            return left + (x - self.view_start) * scale_x
+
+        def py(y):
+            return bottom - (y - low) * scale_y
+
+        if self.kind == "bar":
+            self._draw_bars(xs, ys, px, py, left, right)
+        else:
+            self._draw_line(xs, ys, px, py)
+
+        labels = self._labels
+        c.itemconfigure(labels["top"], text=f"{high:.6g}")
+        c.coords(labels["top"], left - 5, top)
+        c.itemconfigure(labels["bottom"], text=f"{low:.6g}")
+        c.coords(labels["bottom"], left - 5, bottom)
+        c.itemconfigure(labels["start"], text=_day_text(self.view_start))
+        c.coords(labels["start"], left, bottom + 5)
+        c.itemconfigure(labels["end"], text=_day_text(self.view_end))
+        c.coords(labels["end"], right, bottom + 5)
+
+    def _draw_line(self, xs, ys, px, py):
+        xs, ys = lttb(xs, ys, int(self._plot_width()))
+        if len(xs) == 1:
+            xs, ys = xs * 2, ys * 2
+        points = []
+        for x, y in zip(xs, ys):
+            points.append(px(x))
+            points.append(py(y))
+        self.canvas.coords(self._line, *points)
+        self.canvas.itemconfigure(self._line, state="normal")
+
+    def _draw_bars(self, xs, ys, px, py, left, right):
+        c = self.canvas
+        xs, ys = bucket_means(xs, ys, int(self._plot_width() // self.bar_px))
+        day_px = (right - left) / (self.view_end - self.view_start)
+        half = max(min(day_px * (xs[1] - xs[0]) if len(xs) > 1 else day_px, 40) * 0.4, 1)
+        while len(self._bars) < len(xs):
+            self._bars.append(c.create_rectangle(0, 0, 0, 0, fill=self.color, outline=""))
+        for item, x, y in zip(self._bars, xs, ys):
+            c.coords(item, max(px(x) - half, left), py(y), min(px(x) + half, right), py(0))
+            c.itemconfigure(item, state="normal")
+        for item in self._bars[len(xs):]:
+            c.itemconfigure(item, state="hidden")
+
+    def _hide_series(self):
+        self.canvas.itemconfigure(self._line, state="hidden")
+        for item in self._bars:
+            self.canvas.itemconfigure(item, state="hidden")
+        for name in ("top", "bottom", "start", "end"):
+            self.canvas.itemconfigure(self._labels[name], text="")
+
+
+def _day_text(ordinal):
+    return date.fromordinal(int(ordinal)).strftime("%d.%m.%Y")
@@ -0,0 +1,268 @@
+# Columnar per-day history, one binary file per user. Rows are a dense
+# calendar from the user's first day: a date column of int32 ordinals and one
+# float64 column per metric (NaN where a day has no value), each stored as a
+# contiguous block behind a fixed header. Files are memory-mapped, and
+# columns are handed out as memoryviews (or NumPy arrays) over the map, so
+# reading years of history creates no Python object per sample. Updating
+# recent days writes in place and new days go into spare capacity; only
+# growing past the capacity or adding days before the first one writes a
+# new generation of the file, which readers switch to on their next read.
+import math
+import mmap
+import os
+import re
+import struct
+from datetime import date
+from urllib.parse import quote
+
+from fitness.locking import FileLock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+COLUMNS_DIR = "columns"
+MAGIC = b"FITCOL01"
+VERSION = 1
+# magic, version, column count, first day (ordinal), rows, capacity, superseded
+HEADER = struct.Struct("<8sIIqqqI")
+HEADER_SIZE = 64
+NAME_SIZE = 16
+ROWS_OFFSET = 24
+SUPERSEDED_OFFSET = 40
+
+# Metric store metric -> column. Steps, water and calories keep the day's
+# total, the others the day's mean, as the history charts show them.
+DAY_COLUMNS = ("steps", "water", "calories", "weight", "pulse", "sleep")
+ADDITIVE = {"steps", "water", "calories"}
+NAN = float("nan")
+
+
+def _layout(ncols, capacity):
+    # Byte offsets of the date column and of each metric column
+    offset = HEADER_SIZE + ncols * NAME_SIZE
+    offset += -offset % 8
+    day_offset = offset
+    offset += 4 * capacity
+    offset += -offset % 8
+    return day_offset, [offset + 8 * capacity * i for i in range(ncols)]
+
+
+class DayColumns:
+    # One mapped generation of a user's file. Views stay valid after the
+    # file is superseded; `current` turns False and the store reopens.
+    # close() unmaps it, or leaves that to the last view still handed out.
+    def __init__(self, path):
+        self.path = path
+        with open(path, "r+b") as f:
+            self._map = mmap.mmap(f.fileno(), 0)
+        magic, version, ncols, self.first_day, _, self.capacity, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} column file")
+        self.names = [self._map[HEADER_SIZE + i * NAME_SIZE:HEADER_SIZE + (i + 1) * NAME_SIZE].rstrip(b"\0").decode()
+                      for i in range(ncols)]
+        self._day_offset, offsets = _layout(ncols, self.capacity)
+        self._offsets = dict(zip(self.names, offsets))
+        self._buffer = memoryview(self._map)
+        self._days = self._buffer[self._day_offset:self._day_offset + 4 * self.capacity].cast("i")
+        self._columns = {name: self._buffer[o:o + 8 * self.capacity].cast("d") for name, o in self._offsets.items()}
+
+    @property
+    def rows(self):
+        return struct.unpack_from("<q", self._map, ROWS_OFFSET)[0]
+
+    @property
+    def current(self):
+        return not struct.unpack_from("<I", self._map, SUPERSEDED_OFFSET)[0]
+
+    def days(self):
+        return self._days[:self.rows]
+
+    def column(self, name):
+        return self._columns[name][:self.rows]
+
+    def as_array(self, name):
+        # Zero-copy NumPy array of a column (needs numpy)
+        return numpy.frombuffer(self._map, dtype=numpy.float64, count=self.rows, offset=self._offsets[name])
+
+    def series(self, name, start=None, end=None):
+        # (date ordinals, values) views for start..end (ordinals, inclusive),
+        # without the NaN days at either end of the metric's data
+        rows = self.rows
+        lo = 0 if start is None else min(max(start - self.first_day, 0), rows)
+        hi = rows if end is None else min(max(end - self.first_day + 1, lo), rows)
+        values = self._columns[name]
+        while lo < hi and math.isnan(values[lo]):
+            lo += 1
+        while hi > lo and math.isnan(values[hi - 1]):
+            hi -= 1
+        return self._days[lo:hi], values[lo:hi]
+
+    def latest(self, name):
+        values = self._columns[name]
+        for i in range(self.rows - 1, -1, -1):
+            if not math.isnan(values[i]):
+                return values[i]
+        return None
+
+    def fits(self, first, last):
+        return first >= self.first_day and last - self.first_day < self.capacity
+
+    def write(self, rows):
+        # `rows` maps day ordinal -> {column: value}; every day must fit
+        count = self.rows
+        last = max(rows)
+        for i in range(count, last - self.first_day + 1):
+            self._days[i] = self.first_day + i
+            for values in self._columns.values():
+                values[i] = NAN
+        for day, values in rows.items():
+            for name, value in values.items():
+                self._columns[name][day - self.first_day] = value
+        # Row count last, so a reader never sees a row that is not filled in
+        if last - self.first_day + 1 > count:
+            struct.pack_into("<q", self._map, ROWS_OFFSET, last - self.first_day + 1)
+        self._map.flush()
+
+    def supersede(self):
+        struct.pack_into("<I", self._map, SUPERSEDED_OFFSET, 1)
+        self._map.flush()
+
+    def close(self):
+        for view in (self._days, *self._columns.values(), self._buffer):
+            try:
+                view.release()
+            except BufferError:
+                pass  # a NumPy array from as_array() still uses it
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+
+def create(path, names, first_day, capacity, source=None, rows=None):
+    # Writes a new file; with `source` (a DayColumns) its rows are copied in,
+    # then `rows` are written over them. The file is built under a temporary
+    # name and renamed into place, so other processes never map it half-written.
+    capacity += capacity % 2
+    day_offset, offsets = _layout(len(names), capacity)
+    size = offsets[-1] + 8 * capacity
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.truncate(size)
+        f.write(HEADER.pack(MAGIC, VERSION, len(names), first_day, 0, capacity, 0))
+        f.seek(HEADER_SIZE)
+        f.write(b"".join(name.encode().ljust(NAME_SIZE, b"\0") for name in names))
+    columns = DayColumns(temp)
+    try:
+        if source is not None and source.rows:
+            copied = {}
+            for i in range(source.rows):
+                copied[source.first_day + i] = {name: source._columns[name][i] for name in names
+                                                if not math.isnan(source._columns[name][i])}
+            columns.write(copied)
+        if rows:
+            columns.write(rows)
+    finally:
+        columns.close()
+    os.replace(temp, path)
+    return DayColumns(path)
+
+
+class ColumnStore:
+    # Per-user column files under `directory`, kept in step with `metrics`
+    # (a MetricStore): sync() copies the day rollups from a given day on.
+    # Writes from several threads and processes are serialized by a file
+    # lock; reads need no lock.
+    def __init__(self, directory, metrics, names=DAY_COLUMNS):
+        self.directory = directory
+        self.metrics = metrics
+        self.names = tuple(names)
+        self._open = {}
+        os.makedirs(directory, exist_ok=True)
+        self._lock = FileLock(os.path.join(directory, "columns.lock"))
+
+    def _generations(self, username):
+        prefix = quote(username, safe="")
+        pattern = re.compile(re.escape(prefix) + r"\.(\d+)\.col$")
+        found = []
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                found.append((int(match.group(1)), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    def _path(self, username, generation):
+        return os.path.join(self.directory, f"{quote(username, safe='')}.{generation}.col")
+
+    def _current(self, username):
+        # Cached DayColumns, or the newest file on disk (older generations are
+        # removed), or None
+        columns = self._open.get(username)
+        if columns is not None and columns.current:
+            return columns
+        generations = self._generations(username)
+        if not generations:
+            return None
+        columns = self._open[username] = DayColumns(generations[-1][1])
+        for _, path in generations[:-1]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # still mapped (Windows); removed next time
+        return columns
+
+    def open(self, username):
+        # The user's current DayColumns, built from the metric store the
+        # first time
+        columns = self._current(username)
+        if columns is None:
+            self.sync(username)
+            columns = self._open[username]
+        return columns
+
+    def close(self, username=None):
+        # Unmaps the user's file (every open file without `username`); the
+        # next open() maps it again
+        with self._lock:
+            for name in list(self._open) if username is None else [username]:
+                columns = self._open.pop(name, None)
+                if columns is not None:
+                    columns.close()
+
+    def refresh(self, username, start=""):
+        # sync() for users that already have a file; others get one built
+        # on their first open()
+        if self._current(username) is not None:
+            self.sync(username, start)
+
+    def sync(self, username, start=""):
+        # Re-reads the day rollups from `start` (ISO date) on into the file.
+        # The rollups are read under the lock, so a slower writer cannot put
+        # older values over newer ones.
+        with self._lock:
+            rows = {}
+            for name in self.names:
+                for rollup in self.metrics.rollups(username, name, "day", start):
+                    value = rollup.total if name in ADDITIVE else rollup.mean
+                    rows.setdefault(date.fromisoformat(rollup.bucket).toordinal(), {})[name] = value
+            columns = self._current(username)
+            if columns is not None and (not rows or columns.fits(min(rows), max(rows))):
+                if rows:
+                    columns.write(rows)
+                return
+            # New generation with room for twice the days it needs to hold
+            first = min(rows) if rows else date.today().toordinal()
+            last = max(rows) if rows else first
+            generation = 1
+            if columns is not None:
+                generation = int(columns.path.rsplit(".", 2)[1]) + 1
+                if columns.rows:
+                    first = min(first, columns.first_day)
+                    last = max(last, columns.first_day + columns.rows - 1)
+            fresh = create(self._path(username, generation), self.names, first, max(2 * (last - first + 1), 64),
+                           columns, rows)
+            self._open[username] = fresh
+            if columns is not None:
+                columns.supersede()
@@ -0,0 +1,351 @@
+# GUI-free domain logic: nutrition and BMI math, advice texts, water/step
+# accounting, goals and persistence. Importing this module must not pull in
+# tkinter or customtkinter, so it can be used from scripts and tests.
+import copy
+import os
+import secrets
+from datetime import date
+
+from fitness.catalog import Catalog
+from fitness.goals import GoalEngine, goal_advice
+from fitness.history import DailyHistory, DayRecord
+from fitness.journal import DAY_TOTALS, EMPTY_STATE, MEAL_EVENTS, apply_event, meal_entry, merge_events, new_event
+from fitness.meals import MEALS, MealLog, RecipeBook, of_entry, of_food, portion
+from fitness.persistence import WriteBehindWriter
+from fitness.storage import open_storage
+from fitness.timeseries import METRICS_FILE, MetricStore, samples_from_events
+
+WATER_GOAL = 2.0
+STEP_GOAL = 10000
+
+
+# ---------------------------- Calculations ----------------------------
+def food_calories(kcal_per_100g, grams):
+    return (kcal_per_100g * grams) / 100
+
+
+def bmi(weight_kg, height_cm):
+    height_m = height_cm / 100
+    return weight_kg / (height_m ** 2)
+
+
+# Upper BMI limit, band, advice; the last band has no upper limit
+BMI_BANDS = (
+    (18.5, "Недостаточный вес",
+     "- Увеличьте калорийность питания.\n- Добавьте питательные продукты.\n- Занимайтесь силовыми тренировками."),
+    (25, "Нормальный вес",
+     "- Поддерживайте сбалансированное питание.\n- Регулярные упражнения.\n- Мониторьте изменения."),
+    (30, "Избыточный вес",
+     "- Уменьшите калорийность.\n- Увеличьте кардио-активность.\n- Контролируйте порции."),
+    (float("inf"), "Ожирение",
+     "- Обратитесь к врачу.\n- Сбалансированная диета с дефицитом.\n- Комбинируйте кардио и силовые тренировки."),
+)
+
+
+def _bmi_band(value):
+    return next((band for band in BMI_BANDS if value < band[0]), BMI_BANDS[-1])
+
+
+def bmi_band(value):
+    return _bmi_band(value)[1]
+
+
+def bmi_advice(value):
+    _, band, advice = _bmi_band(value)
+    return f"{band}:\n{advice}"
+
+
+def pulse_advice(pulse):
+    if pulse < 60:
+        return "Пульс ниже нормы — обратитесь к врачу."
+    elif pulse <= 100:
+        return "Нормальный пульс — продолжайте поддерживать активность!"
+    return "Пульс выше нормы — отдохните и измерьте снова."
+
+
+def sleep_advice(hours):
+    if hours < 5:
+        return "😴 Очень мало сна! Попробуйте спать минимум 7 часов."
+    elif hours < 7:
+        return "🟡 Недостаточный сон. Нужно чуть больше отдыха."
+    elif hours < 9:
+        return "💜 Отлично! Это оптимальное количество сна."
+    return "💤 Вы спите больше нормы — возможно, стоит ложиться позже."
+
+
+# ---------------------------- Persistence ----------------------------
+def event_writer(storage, delay=0.5, metrics=None, columns=None):
+    # Write-behind writer for tracker events of any number of users. With a
+    # MetricStore the events are also added as time-series samples, and with
+    # a ColumnStore the touched days are copied into the column files.
+    def write(events):
+        by_user = {}
+        for event in events:
+            event = dict(event)
+            by_user.setdefault(event.pop("user"), []).append(event)
+        for username, batch in by_user.items():
+            storage.append_events(username, batch)
+            if metrics is not None:
+                samples = samples_from_events(batch)
+                metrics.add_samples(username, samples)
+                if columns is not None and samples:
+                    columns.sync(username, min(ts for _, ts, _ in samples)[:10])
+
+    return WriteBehindWriter(write, delay=delay, merge=merge_events)
+
+
+# ---------------------------- Tracker ----------------------------
+class Tracker:
+    # One user's running totals and goals. Every change is recorded as an
+    # event: through `writer` (write-behind) when given, otherwise straight
+    # into `storage` and `metrics`. Pulse, sleep, weight and height have no
+    # running total and only end up in the event log and the metric store. The
+    # totals are today's; rollover() archives them when the date changes. Goal
+    # progress is kept by a GoalEngine fed with the same events;
+    # `on_progress(progress)` is called when it changes. Today's food
+    # entries are in `meals` (a MealLog over state["meals"]) and the user's
+    # recipes, made of `catalog` foods, in `recipes`.
+    def __init__(self, storage, username, writer=None, water_goal=WATER_GOAL, metrics=None, on_progress=None,
+                 catalog=None):
+        self.storage = storage
+        self.username = username
+        self.water_goal = water_goal
+        self.metrics = metrics
+        self._writer = writer
+        self.state = copy.deepcopy(EMPTY_STATE)
+        self.goal_engine = GoalEngine(metrics, username, on_progress)
+        self.history = DailyHistory(metrics, username)
+        self.meals = MealLog(self.state["meals"])
+        self.recipes = RecipeBook(catalog or Catalog.default(), self.state["recipes"])
+
+    @classmethod
+    def open(cls, username, data_dir="data"):
+        metrics = MetricStore(os.path.join(data_dir, METRICS_FILE))
+        tracker = cls(open_storage(data_dir), username, metrics=metrics, catalog=Catalog.default(data_dir))
+        tracker.load()
+        return tracker
+
+    def load(self):
+        if self._writer:
+            self._writer.flush()
+        self.state = self.storage.load_state(self.username)
+        self._loaded()
+        return self.state
+
+    def _loaded(self):
+        self.rollover()
+        self.meals.reset(self.state["meals"])
+        self.recipes.reset(self.state["recipes"])
+        self.goal_engine.reset(self.state["goals"])
+
+    def rollover(self, today=None):
+        # Starts today's totals from zero if they belong to an earlier day
+        # and returns that day's DayRecord (None if nothing changed, or for
+        # totals from before they were kept per day). Storage does the same
+        # when the first event of the new day arrives.
+        today = (today or date.today()).isoformat()
+        day = self.state.get("day")
+        if day == today:
+            return None
+        state = self.state
+        record = DayRecord(day, state["total_calories"], state["water_intake"], state["steps"]) if day else None
+        state.update(day=today, water_intake=0.0, total_calories=0.0, steps=0.0, meals=[])
+        self.meals.reset(state["meals"])
+        if record is not None:
+            self.history.archive(record)
+        return record
+
+    def refresh_goals(self, flushed=False):
+        # After samples were added to the metric store behind the tracker's
+        # back, e.g. by an import. `flushed` tells that the writer has
+        # written what was pending already (the GUI has it done off the UI
+        # thread with flush_later()), so it is not flushed here.
+        if self._writer and not flushed:
+            self._writer.flush()
+        self.history.clear()
+        self.goal_engine.reset(self.state["goals"])
+
+    def sync(self, flushed=False):
+        # Picks up what another app instance wrote for this user since the
+        # last load or sync. Returns the state keys whose values changed, or
+        # None when storage had nothing new. Only the new events are applied;
+        # the state is loaded again when storage cannot list them. Pending
+        # events are written first (see refresh_goals() for `flushed`), so
+        # a water level set here is merged onto the other instance's.
+        if self._writer and not flushed:
+            self._writer.flush()
+        changes = self.storage.changes(self.username)
+        if changes is None:
+            old = self.state
+            self.state = self.storage.load_state(self.username)
+            self._loaded()
+            return {key: value for key, value in self.state.items() if value != old.get(key)}
+        if not changes:
+            return None
+        state = self.state
+        keys = ("day",) + DAY_TOTALS
+        before = {key: state[key] for key in keys}
+        goal_count = len(state["goals"])
+        foreign = []
+        for event, own in changes:
+            if not own:
+                apply_event(state, event)
+                foreign.append(event)
+            elif event["type"] == "water" and event["ts"][:10] == state["day"]:
+                # Merged onto the other instance's level when it was stored
+                state["water_intake"] = event["value"]
+        changed = {key: state[key] for key in keys if state[key] != before[key]}
+        kinds = {event["type"] for event in foreign}
+        if "day" in changed or kinds & set(MEAL_EVENTS):
+            self.meals.reset(state["meals"])
+            changed["meals"] = state["meals"]
+        if "recipe" in kinds:
+            self.recipes.reset(state["recipes"])
+            changed["recipes"] = state["recipes"]
+        # New goals are seeded from the metric store, so they skip observe()
+        self.goal_engine.observe(foreign)
+        for goal in state["goals"][goal_count:]:
+            self.goal_engine.add(goal)
+        if "goal" in kinds:
+            changed["goals"] = state["goals"]
+        self.rollover()
+        return changed
+
+    def _record(self, kind, **payload):
+        event = new_event(kind, **payload)
+        if self._writer:
+            self._writer.mark_dirty({"user": self.username, **event})
+        else:
+            self.storage.append_events(self.username, [event])
+            if self.metrics is not None:
+                self.metrics.add_samples(self.username, samples_from_events([event]))
+        self.goal_engine.observe([event])
+        return event
+
+    @property
+    def water_intake(self):
+        return self.state["water_intake"]
+
+    @property
+    def total_calories(self):
+        return self.state["total_calories"]
+
+    @property
+    def steps(self):
+        return self.state["steps"]
+
+    @property
+    def goals(self):
+        return self.state["goals"]
+
+    @property
+    def goal_progress(self):
+        return self.goal_engine.progress()
+
+    @property
+    def total_nutrition(self):
+        return self.meals.totals()
+
+    def add_food(self, food, grams, meal="snack"):
+        # `food` is a catalog entry; returns the kcal added
+        return self._add_entry(food.name, grams, meal, portion(of_food(food), grams))
+
+    def add_recipe(self, name, grams, meal="snack"):
+        return self._add_entry(name, grams, meal, self.recipes.portion(name, grams), recipe=True)
+
+    def _add_entry(self, name, grams, meal, nutrition, recipe=False):
+        if meal not in MEALS or grams <= 0:
+            raise ValueError("Entry needs a meal and a positive amount")
+        self.rollover()
+        self.state["total_calories"] += nutrition.kcal
+        extra = {"recipe": True} if recipe else {}
+        event = self._record("food", id=secrets.token_hex(6), meal=meal, food=name, grams=grams,
+                             **nutrition._asdict(), **extra)
+        self.meals.add(meal_entry(event))
+        return nutrition.kcal
+
+    def edit_entry(self, entry_id, grams=None, meal=None):
+        # Changes the amount and/or meal of one of today's entries; returns
+        # the change in kcal. Raises KeyError for entries not in today's log.
+        self.rollover()
+        entry = self.meals.get(entry_id)
+        grams = entry["grams"] if grams is None else grams
+        meal = entry["meal"] if meal is None else meal
+        if meal not in MEALS or grams <= 0:
+            raise ValueError("Entry needs a meal and a positive amount")
+        nutrition = of_entry(entry).scaled(grams / entry["grams"])
+        delta = nutrition.kcal - entry["kcal"]
+        self.state["total_calories"] += delta
+        self.meals.update(entry_id, meal=meal, grams=grams, **nutrition._asdict())
+        extra = {"recipe": True} if entry.get("recipe") else {}
+        self._record("food_edit", id=entry_id, meal=meal, food=entry["food"], grams=grams, **nutrition._asdict(),
+                     delta=delta, **extra)
+        return delta
+
+    def delete_entry(self, entry_id):
+        # Removes one of today's entries and returns it
+        self.rollover()
+        entry = self.meals.remove(entry_id)
+        self.state["total_calories"] -= entry["kcal"]
+        self._record("food_delete", id=entry_id, food=entry["food"], delta=-entry["kcal"])
+        return entry
+
+    def define_recipe(self, name, ingredients, yield_grams=None):
+        # See RecipeBook.define; redefining a recipe changes the nutrition of
+        # later entries of it and of the recipes containing it
+        recipe = self.recipes.define(name, ingredients, yield_grams)
+        self._record("recipe", name=name.strip(), recipe=recipe)
+        return recipe
+
+    def set_water(self, liters):
+        self.rollover()
+        value = round(min(max(liters, 0.0), self.water_goal), 2)
+        delta = round(value - self.state["water_intake"], 2)
+        self.state["water_intake"] = value
+        self._record("water", value=value, delta=delta)
+        return value
+
+    def add_water(self, liters):
+        self.rollover()
+        return self.set_water(self.state["water_intake"] + liters)
+
+    def add_steps(self, steps, imported=False):
+        # `imported` steps are already in the metric store (see importer), so
+        # their event only moves the day total
+        self.rollover()
+        self.state["steps"] += steps
+        extra = {"imported": True} if imported else {}
+        self._record("steps", delta=steps, **extra)
+        return self.state["steps"]
+
+    def log_pulse(self, bpm):
+        self._record("pulse", bpm=bpm)
+
+    def log_sleep(self, hours):
+        self._record("sleep", hours=hours)
+
+    def log_weight(self, kg):
+        self._record("weight", kg=kg)
+
+    def log_height(self, cm):
+        self._record("height", cm=cm)
+
+    def add_goal(self, desc, value, period, seed=True):
+        # With `seed` False the goal's progress is only tracked once
+        # seed_goal(goal) is called, after the writer has written it
+        if not desc or value <= 0:
+            raise ValueError("Goal needs a description and a positive value")
+        goal = {"desc": desc, "value": value, "period": period, "advice": goal_advice(desc),
+                "start": date.today().isoformat()}
+        self.state["goals"].append(goal)
+        self._record("goal", goal=goal)
+        if seed:
+            # The new goal's period may already have samples still in the writer
+            if self._writer:
+                self._writer.flush()
+            self.seed_goal(goal)
+        return goal
+
+    def seed_goal(self, goal):
+        # Starts tracking a goal added with seed=False from the metric store
+        self.goal_engine.add(goal)
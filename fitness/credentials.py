@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+
+from fitness.locking import FileLock
+from fitness.persistence import atomic_write_json, file_stamp
+
+
+class CredentialIndex:
+    # In-memory index over the account file. New accounts are appended as
+    # single lines to `<name>.log` next to `users.json`, and the log is
+    # folded into `users.json` (temp file + rename) every `compact_every`
+    # entries. Lookups only stat the two files: the index is reloaded when
+    # users.json was replaced (inode/mtime/size changed) and only the new log
+    # lines are read when another process appended to the log.
+    def __init__(self, path, compact_every=1000):
+        self.path = path
+        self.log_path = os.path.splitext(path)[0] + ".log"
+        self.compact_every = compact_every
+        self._users = {}
+        self._base_stamp = None
+        self._log_stamp = None
+        self._log_offset = 0
+        self._log_entries = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Writers in other processes: an append must not land between another
+        # process's compaction and its truncation of the log
+        self._file_lock = FileLock(os.path.splitext(path)[0] + ".lock")
+
+    def get(self, username):
+        with self._lock:
+            self._refresh()
+            return self._users.get(username)
+
+    def __contains__(self, username):
+        return self.get(username) is not None
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._users)
+
+    def snapshot(self):
+        with self._lock:
+            self._refresh()
+            return dict(self._users)
+
+    def put(self, username, record):
+        with self._lock, self._file_lock:
+            self._refresh()
+            self._append(username, record)
+
+    def add(self, username, record):
+        # Like put(), but only for a new username; False if it is taken, also
+        # by another process
+        with self._lock, self._file_lock:
+            self._refresh()
+            if username in self._users:
+                return False
+            self._append(username, record)
+            return True
+
+    def _append(self, username, record):
+        line = json.dumps({"username": username, **record}, ensure_ascii=False) + "\n"
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._read_log()
+        if self._log_entries >= self.compact_every:
+            self._compact()
+
+    def _refresh(self):
+        base_stamp = file_stamp(self.path)
+        if not self._loaded or base_stamp != self._base_stamp:
+            self._reload(base_stamp)
+            return
+        log_stamp = file_stamp(self.log_path)
+        if log_stamp != self._log_stamp:
+            if (log_stamp is None or self._log_stamp is None or log_stamp[0] != self._log_stamp[0]
+                    or log_stamp[2] < self._log_offset):
+                # Log was truncated or replaced by a compaction elsewhere
+                self._reload(base_stamp)
+            else:
+                self._read_log()
+
+    def _reload(self, base_stamp):
+        self._users = {}
+        if base_stamp is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                try:
+                    self._users = json.load(f)
+                except json.JSONDecodeError:
+                    self._users = {}
+        self._base_stamp = base_stamp
+        self._log_offset = 0
+        self._log_entries = 0
+        self._loaded = True
+        self._read_log()
+
+    def _read_log(self):
+        if not os.path.exists(self.log_path):
+            self._log_stamp = None
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Half-written line from a concurrent append; read it next time
+                    break
+                self._log_offset += len(raw)
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                self._users[entry.pop("username")] = entry
+                self._log_entries += 1
+        self._log_stamp = file_stamp(self.log_path)
+
+    def _compact(self):
+        atomic_write_json(self.path, self._users, ensure_ascii=False)
+        # Everything in the log is now in users.json; replaying it again
+        # after a crash right here would be harmless
+        open(self.log_path, "w").close()
+        self._base_stamp = file_stamp(self.path)
+        self._log_stamp = file_stamp(self.log_path)
+        self._log_offset = 0
+        self._log_entries = 0
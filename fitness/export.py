@@ -0,0 +1,235 @@
+# Exports for coaches: per-day history as CSV or JSON Lines, and a text
+# summary report (weekly averages, BMI trend, goal status). Everything is a
+# generator pipeline from the storage cursors to the output file: accounts
+# are visited one at a time and each user's days are merged from the metric
+# store's day rollups as they are read, so memory stays flat for any number
+# of users or years. A path ending in .gz is written gzip-compressed.
+#   python -m fitness.export --output all.csv.gz
+#   python -m fitness.export --output report.txt --user alice --user bob
+import csv
+import gzip
+import heapq
+import json
+import os
+import queue
+import threading
+import time
+from datetime import date, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from fitness.columnar import ADDITIVE, DAY_COLUMNS
+from fitness.core import bmi
+from fitness.goals import GoalEngine
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".txt": "report"}
+CSV_FIELDS = ("user", "day") + DAY_COLUMNS
+REPORT_WEEKS = 12
+
+# Report table: metric, heading, value format
+REPORT_COLUMNS = (
+    ("steps", "Шаги", "{:.0f}"),
+    ("water", "Вода, л", "{:.2f}"),
+    ("calories", "Ккал", "{:.0f}"),
+    ("weight", "Вес, кг", "{:.1f}"),
+    ("sleep", "Сон, ч", "{:.1f}"),
+    ("pulse", "Пульс", "{:.0f}"),
+)
+
+
+def format_for(path):
+    # "history.csv.gz" -> "csv"
+    base = path[:-3] if path.endswith(".gz") else path
+    fmt = FORMATS.get(os.path.splitext(base)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported export type: {path}")
+    return fmt
+
+
+# ---------------------------- Records ----------------------------
+def _day_values(metrics, username, metric, start, end):
+    # (day, metric, value) tuples, which heapq.merge orders by day
+    additive = metric in ADDITIVE
+    for rollup in metrics.iter_rollups(username, metric, "day", start, end):
+        yield rollup.bucket, metric, round(rollup.total if additive else rollup.mean, 3)
+
+
+def day_records(metrics, username, start="", end="9999"):
+    # One dict per day with data: user, day and the value of every metric
+    # that has one (totals for steps, water, calories; means for the rest).
+    # The per-metric cursors are merged by day, so only one day is held.
+    streams = [_day_values(metrics, username, metric, start, end) for metric in DAY_COLUMNS]
+    for day, values in groupby(heapq.merge(*streams), key=itemgetter(0)):
+        record = {"user": username, "day": day}
+        for _, metric, value in values:
+            record[metric] = value
+        yield record
+
+
+def weekly_averages(metrics, username, weeks=REPORT_WEEKS, today=None):
+    # [(monday, {metric: daily average})] for the last `weeks` weeks with
+    # data. Totals are spread over the days of the week that have passed.
+    today = today or date.today()
+    first = today - timedelta(days=today.weekday() + 7 * (weeks - 1))
+    averages = {}
+    for metric in DAY_COLUMNS:
+        for rollup in metrics.iter_rollups(username, metric, "week", first.isoformat(), today.isoformat()):
+            if metric in ADDITIVE:
+                days = min((today - date.fromisoformat(rollup.bucket)).days + 1, 7)
+                value = rollup.total / days
+            else:
+                value = rollup.mean
+            averages.setdefault(rollup.bucket, {})[metric] = value
+    return sorted(averages.items())
+
+
+def report_lines(storage, metrics, username, weeks=REPORT_WEEKS, today=None):
+    today = today or date.today()
+    yield f"{username}\n"
+    averages = weekly_averages(metrics, username, weeks, today)
+    if averages:
+        yield f"  Средние за день по неделям (последние {weeks}):\n"
+        yield "  " + f"{'Неделя':<10}" + "".join(f"{heading:>10}" for _, heading, _ in REPORT_COLUMNS) + "\n"
+        for monday, values in averages:
+            cells = (form.format(values[metric]) if metric in values else "—" for metric, _, form in REPORT_COLUMNS)
+            yield "  " + f"{monday:<10}" + "".join(f"{cell:>10}" for cell in cells) + "\n"
+    else:
+        yield "  Нет данных за последние недели\n"
+
+    weights = [values["weight"] for _, values in averages if "weight" in values]
+    height = metrics.latest(username, "height")
+    if weights and height:
+        first, last = bmi(weights[0], height), bmi(weights[-1], height)
+        yield f"  ИМТ: {first:.1f} → {last:.1f} ({last - first:+.1f}) при росте {height:g} см\n"
+    else:
+        yield "  ИМТ: нет данных о весе или росте\n"
+
+    goals = storage.goals(username)
+    if goals:
+        yield "  Цели:\n"
+        engine = GoalEngine(metrics, username)
+        engine.reset(goals)
+        for progress in engine.progress(today):
+            status = " ✔ выполнено" if progress.done else ""
+            yield f"    {progress.desc}: {progress.text}{status}\n"
+    yield "\n"
+
+
+# ---------------------------- Writing ----------------------------
+def _open(path, compress):
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def export(storage, metrics, path, fmt=None, usernames=None, start="", end="9999", weeks=REPORT_WEEKS,
+           progress=None, cancelled=None):
+    # Writes `usernames` (default: every account) to `path` and returns how
+    # many accounts were exported, or None when cancelled. Written to a temp
+    # file and renamed, so a failed export never leaves a partial file.
+    # `progress(accounts_done)` is called after each account.
+    fmt = fmt or format_for(path)
+    if fmt not in FORMATS.values():
+        raise ValueError(f"Unknown export format: {fmt}")
+    usernames = storage.usernames() if usernames is None else usernames
+    tmp_path = f"{path}.tmp"
+    count = 0
+    finished = False
+    try:
+        with _open(tmp_path, path.endswith(".gz")) as out:
+            writer = None
+            if fmt == "csv":
+                writer = csv.DictWriter(out, CSV_FIELDS, restval="")
+                writer.writeheader()
+            for username in usernames:
+                if cancelled is not None and cancelled.is_set():
+                    break
+                if fmt == "csv":
+                    writer.writerows(day_records(metrics, username, start, end))
+                elif fmt == "jsonl":
+                    for record in day_records(metrics, username, start, end):
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                else:
+                    out.writelines(report_lines(storage, metrics, username, weeks))
+                count += 1
+                if progress:
+                    progress(count)
+            else:
+                finished = True
+        if finished:
+            _fsync(tmp_path)
+            os.replace(tmp_path, path)
+            return count
+    except BaseException:
+        _remove(tmp_path)
+        raise
+    _remove(tmp_path)
+    return None
+
+
+def _fsync(path):
+    # After the gzip trailer is written, which happens on close
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ExportJob:
+    # Runs export() in a worker thread. The UI polls `messages` for
+    # ("progress", accounts_done), ("done", accounts) or ("error", exception).
+    def __init__(self, storage, metrics, path, usernames=None, **options):
+        self.messages = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(storage, metrics, path, usernames, options),
+                                        name="export", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _run(self, storage, metrics, path, usernames, options):
+        try:
+            result = export(storage, metrics, path, usernames=usernames, cancelled=self._cancelled,
+                            progress=lambda n: self.messages.put(("progress", n)), **options)
+            self.messages.put(("done", result))
+        except Exception as exc:
+            self.messages.put(("error", exc))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from fitness.storage import open_storage
+    from fitness.timeseries import METRICS_FILE, MetricStore
+
+    parser = argparse.ArgumentParser(description="Export user history as CSV, JSON Lines or a summary report")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--output", required=True, help=".csv, .jsonl or .txt (report), optionally + .gz")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="instead of the file extension")
+    parser.add_argument("--user", action="append", help="only these accounts (repeatable)")
+    parser.add_argument("--start", default="", help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", default="9999", help="last day, YYYY-MM-DD")
+    parser.add_argument("--weeks", type=int, default=REPORT_WEEKS, help="weeks in the report")
+    args = parser.parse_args()
+
+    storage = open_storage(args.data_dir)
+    metrics = MetricStore(os.path.join(args.data_dir, METRICS_FILE))
+    started = time.perf_counter()
+    try:
+        exported = export(storage, metrics, args.output, args.format, args.user, args.start, args.end, args.weeks)
+    finally:
+        storage.close()
+        metrics.close()
+    print(f"Exported {exported} accounts to {args.output} in {time.perf_counter() - started:.1f} s")
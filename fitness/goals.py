@@ -0,0 +1,274 @@
+# Goals as typed targets with live progress. A goal's free-text description
+# is matched against keyword rule tables (one Aho-Corasick automaton per
+# table, so a pass over the text costs the same for three rules or three
+# hundred) to find what it measures and which advice to show. Progress is
+# seeded once from the metric store for the goal's period and then updated
+# from each new tracker event.
+from collections import deque, namedtuple
+from datetime import date, timedelta
+
+from fitness.timeseries import samples_from_events
+
+PERIOD_DAYS = {"1 неделя": 7, "1 месяц": 30, "3 месяца": 90}
+
+
+# ---------------------------- Keyword matching ----------------------------
+class KeywordAutomaton:
+    # Aho-Corasick automaton over `keywords`; scan() returns the indexes of
+    # every keyword that occurs in the text
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        goto, fail, out = [{}], [0], [set()]
+        for i, word in enumerate(self.keywords):
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    out.append(set())
+                state = nxt
+            out[state].add(i)
+        # Breadth first, so a state's failure target is finished before it
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] |= out[fail[nxt]]
+        self._goto, self._fail = goto, fail
+        self._out = [tuple(found) for found in out]
+
+    def scan(self, text):
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class RuleTable:
+    # Ordered (keywords, result) rules; a rule matches when all of its
+    # keywords occur in the lowercased text. Text is padded with spaces so a
+    # keyword can insist on a word start (" сон").
+    def __init__(self, rules):
+        self.rules = list(rules)
+        keywords = sorted({word for words, _ in self.rules for word in words})
+        index = {word: i for i, word in enumerate(keywords)}
+        self._automaton = KeywordAutomaton(keywords)
+        self._needed = [len(set(words)) for words, _ in self.rules]
+        self._rules_by_keyword = [[] for _ in keywords]
+        for r, (words, _) in enumerate(self.rules):
+            for word in set(words):
+                self._rules_by_keyword[index[word]].append(r)
+
+    def match(self, text):
+        # Results of every matching rule, in table order
+        hits = {}
+        for keyword in self._automaton.scan(f" {text.lower()} "):
+            for r in self._rules_by_keyword[keyword]:
+                hits[r] = hits.get(r, 0) + 1
+        return [self.rules[r][1] for r in sorted(hits) if hits[r] == self._needed[r]]
+
+    def first(self, text, default=None):
+        matches = self.match(text)
+        return matches[0] if matches else default
+
+
+# What a goal measures: (metric, direction). Weight goals are a change in kg
+# over the period; the others are a daily amount to reach.
+KIND_RULES = RuleTable([
+    (("сбросить", "вес"), ("weight", -1)),
+    (("снизить", "вес"), ("weight", -1)),
+    (("похуд",), ("weight", -1)),
+    (("набрать", "вес"), ("weight", 1)),
+    (("набрать", "масс"), ("weight", 1)),
+    (("шаг",), ("steps", 1)),
+    (("вод",), ("water", 1)),
+    (("пить",), ("water", 1)),
+    ((" сон",), ("sleep", 1)),
+    ((" сна",), ("sleep", 1)),
+    (("спать",), ("sleep", 1)),
+])
+
+GENERAL_ADVICE = "💡 Общие советы: Разбейте цель на маленькие шаги и отслеживайте прогресс!"
+SLEEP_ADVICE = ("💡 Советы для сна:\n"
+                "- Ложитесь и вставайте в одно и то же время.\n"
+                "- Уберите экраны за час до сна.")
+
+ADVICE_RULES = RuleTable([
+    (("вес", "сбросить"),
+     "💡 Советы для снижения веса:\n"
+     "- Создайте дефицит калорий (ешьте меньше, чем тратите).\n"
+     "- Добавьте кардио 3–4 раза в неделю.\n"
+     "- Увеличьте потребление белка и клетчатки.\n"
+     "- Пейте достаточно воды."),
+    (("вес", "набрать"),
+     "💡 Советы для набора веса:\n"
+     "- Увеличьте калорийность рациона.\n"
+     "- Ешьте больше белков и углеводов.\n"
+     "- Занимайтесь силовыми тренировками.\n"
+     "- Ешьте чаще, но меньшими порциями."),
+    (("шаг",),
+     "💡 Советы для шагов:\n"
+     "- Ходите пешком короткие расстояния.\n"
+     "- Выбирайте лестницу вместо лифта.\n"
+     "- Делайте короткую прогулку после еды."),
+    (("вод",),
+     "💡 Советы для воды:\n"
+     "- Держите бутылку воды под рукой.\n"
+     "- Выпивайте стакан воды утром и перед едой."),
+    ((" сон",), SLEEP_ADVICE),
+    ((" сна",), SLEEP_ADVICE),
+])
+
+
+def goal_advice(desc):
+    return ADVICE_RULES.first(desc, GENERAL_ADVICE)
+
+
+# ---------------------------- Targets ----------------------------
+Target = namedtuple("Target", "metric value direction start days")
+
+# What the Goals and Dashboard tabs show for one goal; `fraction` is None for
+# goals that are not about a tracked metric
+Progress = namedtuple("Progress", "desc metric fraction text done")
+
+
+def parse_goal(goal):
+    # The goal dict -> Target, or None when the description names nothing
+    # that is tracked
+    kind = KIND_RULES.first(goal["desc"])
+    if kind is None:
+        return None
+    start = date.fromisoformat(goal["start"]) if goal.get("start") else date.today()
+    return Target(kind[0], float(goal["value"]), kind[1], start, PERIOD_DAYS.get(goal["period"], 30))
+
+
+class _DailyProgress:
+    # Steps, water, sleep: the day's amount has to reach the target; progress
+    # is the share of the period's days that did
+    def __init__(self, goal, target):
+        self.goal, self.target = goal, target
+        self.days = {}
+        self.met = 0
+
+    def seed(self, metrics, username, end):
+        for rollup in metrics.rollups(username, self.target.metric, "day", self.target.start.isoformat(), end):
+            value = rollup.total if self.target.metric != "sleep" else rollup.mean
+            self._set(rollup.bucket, value)
+
+    def add(self, day, value):
+        # Sleep is one value per night, so a later entry replaces it
+        if self.target.metric == "sleep":
+            return self._set(day, value)
+        return self._set(day, self.days.get(day, 0.0) + value)
+
+    def _set(self, day, value):
+        goal = self.target.value
+        before = self.days.get(day, 0.0)
+        self.days[day] = value
+        self.met += (value >= goal) - (before >= goal)
+        return value != before
+
+    def progress(self, today):
+        target = self.target
+        fraction = min(self.met / target.days, 1.0)
+        current = self.days.get(today.isoformat(), 0.0)
+        text = f"{self.met}/{target.days} дн. · сегодня {current:g} из {target.value:g}"
+        return Progress(self.goal["desc"], target.metric, fraction, text, fraction >= 1.0)
+
+
+class _WeightProgress:
+    # Change from the last weight before the goal started to the latest one
+    def __init__(self, goal, target):
+        self.goal, self.target = goal, target
+        self.first = self.current = None
+
+    def seed(self, metrics, username, end):
+        # Weigh-ins are sparse, so the raw samples are cheap to read
+        self.first = self.current = metrics.latest(username, "weight", before=self.target.start.isoformat())
+        for ts, value in metrics.samples(username, "weight", self.target.start.isoformat(), end + "T99"):
+            self.add(ts[:10], value)
+
+    def add(self, day, value):
+        if self.first is None:
+            self.first = value
+        changed = value != self.current
+        self.current = value
+        return changed
+
+    def progress(self, today):
+        target = self.target
+        if self.first is None:
+            return Progress(self.goal["desc"], "weight", 0.0, "Нет данных о весе", False)
+        change = self.current - self.first
+        fraction = min(max(0.0, target.direction * change / target.value), 1.0)
+        text = f"{change:+.1f} из {target.direction * target.value:+g} кг"
+        return Progress(self.goal["desc"], "weight", fraction, text, fraction >= 1.0)
+
+
+class GoalEngine:
+    # Live progress of one user's goals. observe() takes the tracker events
+    # as they are recorded and only touches the goals of the affected
+    # metric; `on_change(progress)` is called whenever some goal moved.
+    def __init__(self, metrics=None, username=None, on_change=None):
+        self.metrics = metrics
+        self.username = username
+        self.on_change = on_change
+        self._goals = []
+        self._by_metric = {}
+
+    def reset(self, goals):
+        self._goals = []
+        self._by_metric = {}
+        for goal in goals:
+            self._add(goal)
+        self._notify()
+
+    def add(self, goal):
+        self._add(goal)
+        self._notify()
+
+    def _add(self, goal):
+        target = parse_goal(goal)
+        if target is None:
+            self._goals.append((goal, None))
+            return
+        tracker = (_WeightProgress if target.metric == "weight" else _DailyProgress)(goal, target)
+        if self.metrics is not None:
+            tracker.seed(self.metrics, self.username, (target.start + timedelta(days=target.days - 1)).isoformat())
+        self._goals.append((goal, tracker))
+        self._by_metric.setdefault(target.metric, []).append(tracker)
+
+    def observe(self, events):
+        changed = False
+        for metric, ts, value in samples_from_events(events):
+            day = ts[:10]
+            for tracker in self._by_metric.get(metric, ()):
+                target = tracker.target
+                if target.start.isoformat() <= day < (target.start + timedelta(days=target.days)).isoformat():
+                    changed = tracker.add(day, value) or changed
+        if changed:
+            self._notify()
+
+    def progress(self, today=None):
+        today = today or date.today()
+        return tuple(tracker.progress(today) if tracker is not None
+                     else Progress(goal["desc"], None, None, "прогресс не отслеживается", False)
+                     for goal, tracker in self._goals)
+
+    def _notify(self):
+        if self.on_change is not None:
+            self.on_change(self.progress())
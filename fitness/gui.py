@@ -0,0 +1,1364 @@
+import math
+import os
+import time
+import tkinter as tk
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+import random
+import threading
+from tkinter import filedialog, messagebox
+import customtkinter as ctk
+
+from fitness import profiling
+from fitness.animation import AnimationEngine, StarField
+from fitness.auth import Authenticator, hash_password
+from fitness.catalog import Catalog
+from fitness.charts import Chart
+from fitness.columnar import COLUMNS_DIR, ColumnStore
+from fitness.core import STEP_GOAL, WATER_GOAL, Tracker, event_writer, pulse_advice, sleep_advice
+from fitness.export import ExportJob
+from fitness.importer import ImportJob
+from fitness.meals import MEAL_NAMES, MEALS, meal_at
+from fitness.screens import ScreenManager
+from fitness.state import app_store
+from fitness.storage import open_storage
+from fitness.timers import TimerService
+from fitness.timeseries import METRICS_FILE, MetricStore
+from fitness.watcher import ChangeWatcher
+
+# Colors
+MAIN_BG = "#150050"          # Main background
+WINDOW_BG = "#000000"        # Window background
+ACCENT = "#3F0071"           # Neon purple elements
+TEXT_COLOR = "#E0B3FF"       # Light purple text
+GLOW = "#8A2BE2"             # Soft glowing accent
+WATER_COLOR = "#87CEEB"      # Sky blue for water
+GLASS_OUTLINE = "#A9A9A9"    # Gray for glass outline
+STAR_COLORS = ["#FFFFFF", "#E0FFFF", "#ADD8E6", "#87CEEB"]
+
+
+def _set_entry(entry, text):
+    entry.delete(0, "end")
+    entry.insert(0, text)
+
+
+class _Concat:
+    # Two sequences read as one, for VirtualList items
+    def __init__(self, first, second):
+        self._first = first
+        self._second = second
+
+    def __len__(self):
+        return len(self._first) + len(self._second)
+
+    def __getitem__(self, index):
+        if index < len(self._first):
+            return self._first[index]
+        return self._second[index - len(self._first)]
+
+
+class VirtualList(ctk.CTkFrame):
+    # Scrollable list that only creates widgets for the visible rows. Rows are
+    # relabelled as the list scrolls, so a list of 100k items costs the same
+    # as a list of ten.
+    def __init__(self, master, rows=8, command=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self._command = command
+        self._items = []
+        self._format = str
+        self._offset = 0
+
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        self._rows = []
+        for i in range(rows):
+            row = ctk.CTkButton(body, text="", anchor="w", height=26, fg_color="transparent", hover_color=ACCENT,
+                                text_color=TEXT_COLOR, command=lambda i=i: self._select(i))
+            row.pack(fill="x")
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                row.bind(sequence, self._on_wheel, add="+")
+            self._rows.append(row)
+
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scroll, button_color=ACCENT, button_hover_color=GLOW)
+        self._scrollbar.pack(side="right", fill="y", pady=5)
+
+    def set_items(self, items, format_item=str):
+        # `items` only needs len() and indexing, e.g. a range over a catalog
+        self._items = items
+        self._format = format_item
+        self._offset = 0
+        self._redraw()
+
+    def _redraw(self):
+        for i, row in enumerate(self._rows):
+            index = self._offset + i
+            if index < len(self._items):
+                row.configure(text=self._format(self._items[index]), state="normal")
+            else:
+                row.configure(text="", state="disabled")
+        total = max(len(self._items), 1)
+        self._scrollbar.set(self._offset / total, min(1.0, (self._offset + len(self._rows)) / total))
+
+    def _scroll_to(self, offset):
+        offset = max(0, min(offset, len(self._items) - len(self._rows)))
+        if offset != self._offset:
+            self._offset = offset
+            self._redraw()
+
+    def _on_scroll(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(value) * len(self._items)))
+        elif action == "scroll":
+            step = len(self._rows) if unit == "pages" else 1
+            self._scroll_to(self._offset + int(value) * step)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._scroll_to(self._offset - 3)
+        else:
+            self._scroll_to(self._offset + 3)
+
+    def _select(self, row):
+        index = self._offset + row
+        if index < len(self._items) and self._command:
+            self._command(self._items[index])
+
+
+class FitnessApp(ctk.CTk):
+    def __init__(self):
+        # Theme and color settings
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("dark-blue")
+        super().__init__()
+
+        # Opt-in callback timing, loop lag and overlay (FITNESS_PROFILE=1)
+        self.profiler = profiling.enable(self)
+
+        # Main window
+        self.title("Fitness Trainer")
+        self.geometry("1100x700")
+        self.minsize(900, 600)
+        self.configure(fg_color=MAIN_BG)
+
+        self.user_data = None
+        self.water_goal = WATER_GOAL
+        self.catalog = Catalog.default("data")
+
+        # Shared state; widgets subscribe to keys and are updated once per
+        # event-loop turn when those change
+        self.store = app_store(self.water_goal, schedule=self.after_idle)
+
+        # Tabs are built when first opened; the rest are filled in while idle
+        self.prebuild_tabs = True
+        self.tabview = None
+        self._built_tabs = set()
+        self.last_login_to_interactive = None
+
+        # Screens are hidden and reused rather than destroyed on every switch
+        self.screens = ScreenManager(self, lambda: ctk.CTkFrame(self, fg_color=MAIN_BG, corner_radius=0))
+
+        # Countdowns (meditation, step simulation) share one wakeup and keep
+        # running across tab switches
+        self.timers = TimerService(self)
+        self._rollover_timer = None
+
+        # One animation loop for all star canvases; sleeps while none is visible
+        self.animations = AnimationEngine(self)
+        self.bind("<Map>", lambda e: self.animations.wake() if e.widget is self else None)
+
+        # Every change is stored as an event off the UI thread, batched per
+        # debounce window
+        self.storage = open_storage("data")
+        self.metrics = MetricStore(os.path.join("data", METRICS_FILE))
+        self.columns = ColumnStore(os.path.join("data", COLUMNS_DIR), self.metrics)
+        self._writer = event_writer(self.storage, delay=0.5, metrics=self.metrics, columns=self.columns)
+        self.tracker = None
+        self._import_job = None
+        self._export_job = None
+
+        # Another app instance may write the same user's data; its changes
+        # are noticed by a watcher thread and picked up on the UI thread
+        self._watcher = None
+        self._external = threading.Event()
+        self._external_job = None
+
+        # Password hashing runs on worker threads; a session token is kept
+        # while logged in
+        self.auth = Authenticator(self.storage)
+        self.session = None
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Start with login screen
+        self.show_login_screen()
+
+    # ---------------------------- Utility methods ----------------------------
+    def save_user(self, username, password):
+        # Hashes on the calling thread; the register screen uses self.auth
+        self.storage.save_user(username, hash_password(password))
+
+    def _run_auth(self, screen, future, buttons, spinner, on_done):
+        # Disables `buttons` and shows `spinner` until `future` completes,
+        # then calls on_done(result) on the UI thread
+        for button in buttons:
+            button.configure(state="disabled")
+        spinner.pack(pady=5)
+        spinner.start()
+
+        def poll():
+            if not future.done():
+                screen.after(50, poll)
+                return
+            spinner.stop()
+            spinner.pack_forget()
+            for button in buttons:
+                button.configure(state="normal")
+            error = future.exception()
+            if error is not None:
+                messagebox.showerror("Ошибка", f"Не удалось выполнить: {error}")
+            else:
+                on_done(future.result())
+
+        poll()
+
+    def _load_user_data(self):
+        self.tracker = Tracker(self.storage, self.user_data["username"], writer=self._writer,
+                               water_goal=self.water_goal, metrics=self.metrics, catalog=self.catalog,
+                               on_progress=lambda progress: self.store.set("goal_progress", progress))
+        data = self.tracker.load()
+        columns = self.columns.open(self.user_data["username"])
+        self._schedule_rollover()
+        self._watch_external()
+        self.store.update(day=data["day"], water_intake=data["water_intake"], total_calories=data["total_calories"],
+                          steps=data["steps"], goals=data["goals"],
+                          height=self.metrics.latest(self.user_data["username"], "height"),
+                          weight=columns.latest("weight"), sleep=columns.latest("sleep"), meals=self.tracker.meals)
+        self.store.touch("meals")
+        self.store.flush()
+        return data
+
+    def _schedule_rollover(self):
+        # Wakes up just after midnight to archive the finished day and start
+        # the totals from zero
+        if self._rollover_timer is not None:
+            self._rollover_timer.cancel()
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self._rollover_timer = self.timers.start((midnight - now).total_seconds() + 1, on_done=self._new_day,
+                                                 interval=3600)
+
+    def _new_day(self):
+        self._rollover_timer = None
+        self.tracker.rollover()
+        state = self.tracker.state
+        self.store.update(day=state["day"], water_intake=state["water_intake"],
+                          total_calories=state["total_calories"], steps=state["steps"])
+        self.store.touch("meals")
+        self._schedule_rollover()
+
+    def _after_write(self, then):
+        # Has the writer store what is pending on its own thread and calls
+        # then() on the UI thread once that is done
+        future = self._writer.flush_later()
+
+        def poll():
+            if future.done():
+                then()
+            else:
+                self.after(20, poll)
+
+        poll()
+
+    def _watch_external(self):
+        self._stop_watching()
+        self._external.clear()
+        self._watcher = ChangeWatcher(self.storage.watch_paths(self.user_data["username"]),
+                                      self._external.set).start()
+        self._external_job = self.after(250, self._poll_external)
+
+    def _poll_external(self):
+        if not self._external.is_set():
+            self._external_job = self.after(250, self._poll_external)
+            return
+        self._external.clear()
+        # Our pending events are written first, off the UI thread (see
+        # Tracker.sync); polling resumes once the sync is done
+        self._sync_external(self._writer.flush_later())
+
+    def _sync_external(self, written):
+        if not written.done():
+            self._external_job = self.after(20, self._sync_external, written)
+            return
+        self._external_job = self.after(250, self._poll_external)
+        changed = self.tracker.sync(flushed=True)
+        if changed is None:
+            return  # someone else's data (with SQLite every user shares one file)
+        # Weight, sleep and height are not in the tracker's state
+        username = self.user_data["username"]
+        columns = self.columns.open(username)
+        self.store.update(**{key: value for key, value in changed.items()
+                             if key in ("day", "water_intake", "total_calories", "steps")},
+                          height=self.metrics.latest(username, "height"),
+                          weight=columns.latest("weight"), sleep=columns.latest("sleep"))
+        # Changed in place when only the new events were applied
+        for key in ("goals", "meals"):
+            if key in changed:
+                self.store.set(key, getattr(self.tracker, key))
+                self.store.touch(key)
+
+    def _stop_watching(self):
+        if self._external_job is not None:
+            self.after_cancel(self._external_job)
+            self._external_job = None
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _watch(self, key, callback):
+        # callback(value) now and whenever `key` changes, for as long as the
+        # screen being built exists
+        self.screens.current.subscribe(self.store, key, callback)
+
+    def _history_chart(self, parent, metric, kind="bar", watch=None):
+        # Daily history of one metric, straight from the user's column file;
+        # drag to pan, wheel to zoom. Reloaded when the screen is shown again
+        # and, with `watch`, a second after that store key changes.
+        screen = self.screens.current
+        canvas = ctk.CTkCanvas(parent, width=600, height=200, bg=MAIN_BG, highlightthickness=0)
+        chart = Chart(canvas, kind, color=GLOW, text_color=TEXT_COLOR)
+        chart.bind_mouse()
+        pending = {"job": None}
+
+        def reload():
+            # The file as it is; the writer updates it after every write
+            pending["job"] = None
+            days, values = self.columns.open(self.user_data["username"]).series(metric)
+            chart.set_series(days, values, keep_view=True)
+
+        def changed(_value):
+            if pending["job"] is None:
+                pending["job"] = screen.after(1000, reload)
+
+        reload()
+        screen.on_rebind(reload)
+        if watch:
+            self._watch(watch, changed)
+        return canvas
+
+    # ---------------------------- Login screen ----------------------------
+    def show_login_screen(self):
+        self.screens.show(("login",), self._build_login_screen)
+
+    def _build_login_screen(self, screen):
+        frame = ctk.CTkFrame(screen.container, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        frame.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.4, relheight=0.5)
+
+        title = ctk.CTkLabel(frame, text="Вход", text_color=TEXT_COLOR, font=("Segoe UI", 28, "bold"))
+        title.pack(pady=20)
+
+        username_entry = ctk.CTkEntry(frame, placeholder_text="Имя пользователя", fg_color=MAIN_BG, border_color=ACCENT)
+        username_entry.pack(pady=10, padx=40, fill="x")
+
+        password_entry = ctk.CTkEntry(frame, placeholder_text="Пароль", show="•", fg_color=MAIN_BG, border_color=ACCENT)
+        password_entry.pack(pady=10, padx=40, fill="x")
+
+        spinner = ctk.CTkProgressBar(frame, mode="indeterminate", progress_color=GLOW, width=200)
+
+        def login():
+            u = username_entry.get().strip()
+            p = password_entry.get().strip()
+
+            def done(ok):
+                if ok:
+                    self._complete_login(u)
+                else:
+                    messagebox.showerror("Ошибка", "Неверное имя или пароль")
+
+            self._run_auth(screen, self.auth.login(u, p), (login_btn, reg_btn), spinner, done)
+
+        login_btn = ctk.CTkButton(frame, text="Войти", fg_color=ACCENT, hover_color=GLOW, command=login)
+        login_btn.pack(pady=15)
+
+        reg_btn = ctk.CTkButton(frame, text="Регистрация", fg_color="#222222", command=self.show_register_screen)
+        reg_btn.pack(pady=10)
+
+        screen.on_rebind(lambda: password_entry.delete(0, "end"))
+
+    def _complete_login(self, username):
+        started = time.perf_counter()
+        self.user_data = {"username": username}
+        self.session = self.auth.open_session(username)
+        self._load_user_data()
+        self._build_main_ui()
+        self.update_idletasks()
+        self.last_login_to_interactive = time.perf_counter() - started
+
+    # ---------------------------- Register screen ----------------------------
+    def show_register_screen(self):
+        self.screens.show(("register",), self._build_register_screen)
+
+    def _build_register_screen(self, screen):
+        frame = ctk.CTkFrame(screen.container, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        frame.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.4, relheight=0.6)
+
+        title = ctk.CTkLabel(frame, text="Регистрация", text_color=TEXT_COLOR, font=("Segoe UI", 28, "bold"))
+        title.pack(pady=20)
+
+        username_entry = ctk.CTkEntry(frame, placeholder_text="Имя пользователя", fg_color=MAIN_BG, border_color=ACCENT)
+        username_entry.pack(pady=10, padx=40, fill="x")
+
+        password_entry = ctk.CTkEntry(frame, placeholder_text="Пароль", show="•", fg_color=MAIN_BG, border_color=ACCENT)
+        password_entry.pack(pady=10, padx=40, fill="x")
+
+        confirm_entry = ctk.CTkEntry(frame, placeholder_text="Подтверждение пароля", show="•", fg_color=MAIN_BG, border_color=ACCENT)
+        confirm_entry.pack(pady=10, padx=40, fill="x")
+
+        def register():
+            u = username_entry.get().strip()
+            p = password_entry.get().strip()
+            c = confirm_entry.get().strip()
+            if not u or not p:
+                messagebox.showwarning("Ошибка", "Заполните все поля")
+                return
+            if p != c:
+                messagebox.showerror("Ошибка", "Пароли не совпадают")
+                return
+
+            def done(created):
+                if not created:
+                    messagebox.showerror("Ошибка", "Пользователь с таким именем уже существует")
+                    return
+                messagebox.showinfo("Успешно", "Регистрация завершена!")
+                self.show_login_screen()
+
+            self._run_auth(screen, self.auth.register(u, p), (reg_btn, back_btn), spinner, done)
+
+        reg_btn = ctk.CTkButton(frame, text="Зарегистрироваться", fg_color=ACCENT, hover_color=GLOW, command=register)
+        reg_btn.pack(pady=20)
+
+        back_btn = ctk.CTkButton(frame, text="Назад", fg_color="#222222", command=self.show_login_screen)
+        back_btn.pack()
+
+        spinner = ctk.CTkProgressBar(frame, mode="indeterminate", progress_color=GLOW, width=200)
+
+        def reset():
+            for entry in (username_entry, password_entry, confirm_entry):
+                entry.delete(0, "end")
+
+        screen.on_rebind(reset)
+
+    # ---------------------------- Logout / close ----------------------------
+    def logout(self):
+        self._stop_watching()
+        if self._rollover_timer is not None:
+            self._rollover_timer.cancel()
+            self._rollover_timer = None
+        self._writer.flush()
+        self.columns.close(self.user_data["username"])
+        self.auth.close_session(self.session)
+        self.session = None
+        self.show_login_screen()
+
+    def _on_close(self):
+        self._stop_watching()
+        self.auth.close()
+        self._writer.close()
+        self.columns.close()
+        self.storage.close()
+        self.metrics.close()
+        if self.profiler is not None:
+            self.profiler.dump()
+        self.destroy()
+
+    # ---------------------------- Main UI ----------------------------
+    def _build_main_ui(self):
+        screen = self.screens.show(("main", self.user_data["username"]), self._build_main_screen)
+        self.tabview = screen.tabview
+        self._built_tabs = screen.built_tabs
+        self.animations.wake()
+
+    def _build_main_screen(self, screen):
+        # Header
+        header = ctk.CTkFrame(screen.container, fg_color=ACCENT, corner_radius=12, border_width=2, border_color=GLOW)
+        header.place(relx=0.02, rely=0.02, relwidth=0.96, relheight=0.1)
+
+        user_label = ctk.CTkLabel(header, text=f"Welcome, {self.user_data['username']}!", text_color=TEXT_COLOR, font=("Segoe UI", 22, "bold"))
+        user_label.pack(pady=10, side="left", padx=20)
+
+        current_date = ctk.CTkLabel(header, text="", text_color=TEXT_COLOR, font=("Segoe UI", 18))
+        current_date.pack(pady=10, side="right", padx=20)
+        screen.subscribe(self.store, "day_text", lambda text: current_date.configure(text=text))
+
+        # Main tab area
+        tabview = ctk.CTkTabview(screen.container, fg_color=WINDOW_BG, segmented_button_fg_color=ACCENT,
+                                 segmented_button_selected_color=GLOW, segmented_button_unselected_color="#2A004F", corner_radius=15,
+                                 command=self._on_tab_change)
+        tabview.place(relx=0.02, rely=0.15, relwidth=0.96, relheight=0.8)
+        self.tabview = screen.tabview = tabview
+        self._built_tabs = screen.built_tabs = set()
+
+        # Add tabs; only the visible one is filled right away
+        for name in self._tab_builders():
+            tabview.add(name)
+        self._ensure_tab_built(tabview.get())
+        if self.prebuild_tabs:
+            screen.after(200, self._prebuild_next_tab, screen)
+            screen.on_rebind(lambda: screen.after(200, self._prebuild_next_tab, screen))
+
+        # Exit button
+        exit_btn = ctk.CTkButton(screen.container, text="Выход", fg_color="#222222", text_color="white",
+                                 hover_color="#550099", command=self.logout)
+        exit_btn.place(relx=0.9, rely=0.94, relwidth=0.08, relheight=0.05)
+
+    def _tab_builders(self):
+        return {
+            "Dashboard": self._build_panel_tab,
+            "Calories": self._build_calories_tab,
+            "Water": self._build_water_tab,
+            "Weight": self._build_weight_tab,
+            "Health": self._build_health_tab,
+            "Meditation": self._build_meditation_tab,
+            "Sleep": self._build_sleep_tab,
+            "Goals": self._build_goals_tab,
+        }
+
+    def _ensure_tab_built(self, name):
+        if name in self._built_tabs:
+            return
+        self._built_tabs.add(name)
+        self._tab_builders()[name](self.tabview.tab(name))
+
+    def _on_tab_change(self):
+        self._ensure_tab_built(self.tabview.get())
+        self.animations.wake()
+
+    def _prebuild_next_tab(self, screen):
+        # One tab per slot, so input is never held up for long. The chain is
+        # a screen timer, so hiding the main screen stops it.
+        pending = [name for name in self._tab_builders() if name not in self._built_tabs]
+        if pending:
+            self._ensure_tab_built(pending[0])
+            screen.after(50, self._prebuild_next_tab, screen)
+
+    # ---------------------------- Dashboard ----------------------------
+    def _build_panel_tab(self, frame):
+        frame.configure(fg_color=MAIN_BG)
+        title = ctk.CTkLabel(frame, text="Общая панель", font=("Segoe UI", 26, "bold"), text_color=TEXT_COLOR)
+        title.pack(pady=15)
+
+        blocks_frame = ctk.CTkFrame(frame, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        blocks_frame.pack(pady=10, padx=20, fill="both", expand=True)
+
+        # Calories block
+        calories_block = ctk.CTkFrame(blocks_frame, fg_color=WINDOW_BG, corner_radius=10, border_width=2, border_color=GLOW)
+        calories_block.pack(pady=5, padx=10, fill="x")
+        ctk.CTkLabel(calories_block, text="🍎 Калории", font=("Segoe UI", 20, "bold"), text_color=GLOW).pack(pady=5)
+        calories_label = ctk.CTkLabel(calories_block, text="", font=("Segoe UI", 18), text_color=TEXT_COLOR)
+        calories_label.pack()
+        self._watch("total_calories", lambda v: calories_label.configure(text=f"{v:.1f}"))
+        ctk.CTkLabel(calories_block, text="Сегодня вы потребили столько калорий.", font=("Segoe UI", 14), text_color="#CFA0FF").pack(pady=5)
+
+        # Water block
+        water_block = ctk.CTkFrame(blocks_frame, fg_color=WINDOW_BG, corner_radius=10, border_width=2, border_color=GLOW)
+        water_block.pack(pady=5, padx=10, fill="x")
+        ctk.CTkLabel(water_block, text="💧 Вода", font=("Segoe UI", 20, "bold"), text_color=GLOW).pack(pady=5)
+        water_label = ctk.CTkLabel(water_block, text="", font=("Segoe UI", 18), text_color=TEXT_COLOR)
+        water_label.pack()
+        self._watch("water_text", lambda text: water_label.configure(text=text))
+        ctk.CTkLabel(water_block, text="Гидратация важна для энергии и здоровья.", font=("Segoe UI", 14), text_color="#CFA0FF").pack(pady=5)
+
+        # Weight block
+        weight_block = ctk.CTkFrame(blocks_frame, fg_color=WINDOW_BG, corner_radius=10, border_width=2, border_color=GLOW)
+        weight_block.pack(pady=5, padx=10, fill="x")
+        ctk.CTkLabel(weight_block, text="⚖️ Вес", font=("Segoe UI", 20, "bold"), text_color=GLOW).pack(pady=5)
+        weight_label = ctk.CTkLabel(weight_block, text="", font=("Segoe UI", 18), text_color=TEXT_COLOR)
+        weight_label.pack()
+        self._watch("weight_text", lambda text: weight_label.configure(text=text))
+        ctk.CTkLabel(weight_block, text="Регулярный контроль помогает достигать целей.", font=("Segoe UI", 14), text_color="#CFA0FF").pack(pady=5)
+
+        # Steps block
+        steps_block = ctk.CTkFrame(blocks_frame, fg_color=WINDOW_BG, corner_radius=10, border_width=2, border_color=GLOW)
+        steps_block.pack(pady=5, padx=10, fill="x")
+        ctk.CTkLabel(steps_block, text="👟 Шаги", font=("Segoe UI", 20, "bold"), text_color=GLOW).pack(pady=5)
+        steps_label = ctk.CTkLabel(steps_block, text="", font=("Segoe UI", 18), text_color=TEXT_COLOR)
+        steps_label.pack()
+        self._watch("steps", lambda v: steps_label.configure(text=f"{v:.0f}"))
+        steps_history = tk.StringVar(value=self._steps_history_text())
+        ctk.CTkLabel(steps_block, textvariable=steps_history, font=("Segoe UI", 14), text_color=TEXT_COLOR).pack()
+        ctk.CTkLabel(steps_block, text="Активность улучшает самочувствие.", font=("Segoe UI", 14), text_color="#CFA0FF").pack(pady=5)
+
+        # Goals block
+        goals_block = ctk.CTkFrame(blocks_frame, fg_color=WINDOW_BG, corner_radius=10, border_width=2, border_color=GLOW)
+        goals_block.pack(pady=5, padx=10, fill="x")
+        ctk.CTkLabel(goals_block, text="🎯 Цели", font=("Segoe UI", 20, "bold"), text_color=GLOW).pack(pady=5)
+        goals_label = ctk.CTkLabel(goals_block, text="", font=("Segoe UI", 18), text_color=TEXT_COLOR)
+        goals_label.pack()
+        self._watch("goals_text", lambda text: goals_label.configure(text=text))
+        goal_lines = ctk.CTkLabel(goals_block, text="", font=("Segoe UI", 14), text_color=TEXT_COLOR, justify="left")
+        goal_lines.pack()
+        self._watch("goal_lines", lambda text: goal_lines.configure(text=text))
+        ctk.CTkLabel(goals_block, text="Установите новые цели для мотивации.", font=("Segoe UI", 14), text_color="#CFA0FF").pack(pady=5)
+
+        # Past days block
+        days_block = ctk.CTkFrame(blocks_frame, fg_color=WINDOW_BG, corner_radius=10, border_width=2, border_color=GLOW)
+        days_block.pack(pady=5, padx=10, fill="x")
+        ctk.CTkLabel(days_block, text="📅 История", font=("Segoe UI", 20, "bold"), text_color=GLOW).pack(pady=5)
+        days_label = ctk.CTkLabel(days_block, text="", font=("Segoe UI", 14), text_color=TEXT_COLOR, justify="left")
+        days_label.pack(pady=5)
+        self._watch("day", lambda day: days_label.configure(text=self._day_history_text()))
+
+        # History comes from the metric store, which the writer fills in the
+        # background; re-read it whenever the dashboard is shown again
+        def refresh_history():
+            steps_history.set(self._steps_history_text())
+            days_label.configure(text=self._day_history_text())
+
+        self.screens.current.on_rebind(refresh_history)
+
+    def _steps_history_text(self):
+        # Reads the steps column in place, without a Python object per day
+        today = date.today().toordinal()
+        days, steps = self.columns.open(self.user_data["username"]).series("steps", end=today)
+        recent = steps[bisect_left(days, today - 89):]
+        average = sum(value for value in recent if value == value) / 90
+        # Today is not over yet, so missing it does not break the streak
+        i = len(days) - 1
+        if i >= 0 and days[i] == today and not steps[i] >= STEP_GOAL:
+            i -= 1
+        expected = days[i] if i >= 0 and days[i] >= today - 1 else today - 1
+        streak = 0
+        while i >= 0 and days[i] == expected and steps[i] >= STEP_GOAL:
+            streak += 1
+            expected -= 1
+            i -= 1
+        return f"За 90 дней: {average:.0f} шагов/день · серия от {STEP_GOAL} шагов: {streak} дн."
+
+    def _day_history_text(self):
+        # Finished days only: today is still on the blocks above
+        history = self.tracker.history
+        today = date.today().isoformat()
+        week = [r for r in history.this_week() if r.day != today]
+        month = history.last_month()
+        year_ago = history.same_day_last_year()
+
+        def summary(records):
+            if not records:
+                return "нет данных"
+            n = len(records)
+            return (f"{sum(r.calories for r in records) / n:.0f} ккал, {sum(r.water for r in records) / n:.1f} л, "
+                    f"{sum(r.steps for r in records) / n:.0f} шагов в день ({n} дн.)")
+
+        return (f"Эта неделя: {summary(week)}\nПрошлый месяц: {summary(month)}\n"
+                f"Год назад: {summary([year_ago] if year_ago else [])}")
+
+    # ---------------------------- Calories ----------------------------
+    def _build_calories_tab(self, frame):
+        frame.configure(fg_color=MAIN_BG)
+        title = ctk.CTkLabel(frame, text="Подсчет калорий", font=("Segoe UI", 26, "bold"), text_color=TEXT_COLOR)
+        title.pack(pady=15)
+
+        calories_block = ctk.CTkFrame(frame, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        calories_block.pack(pady=10, padx=20, fill="x")
+
+        catalog = self.catalog
+        catalog.warm_up()
+
+        input_frame = ctk.CTkFrame(calories_block, fg_color=WINDOW_BG)
+        input_frame.pack(pady=10, fill="x")
+
+        # A selected item is a catalog index or ("recipe", name)
+        selected = {"item": 0 if len(catalog) else None}
+        food_var = tk.StringVar(value=catalog.name(0) if len(catalog) else "")
+        amount_var = tk.DoubleVar(value=100.0)
+        meal_var = tk.StringVar(value=MEAL_NAMES[meal_at()])
+        meal_of = {name: meal for meal, name in MEAL_NAMES.items()}
+
+        ctk.CTkLabel(input_frame, text="Продукт:", text_color=TEXT_COLOR, font=("Segoe UI", 16)).grid(row=0, column=0, padx=10, pady=5)
+        search_entry = ctk.CTkEntry(input_frame, placeholder_text="Начните вводить название", width=260, fg_color=MAIN_BG, border_color=ACCENT)
+        search_entry.grid(row=0, column=1, padx=10, pady=5)
+
+        ctk.CTkLabel(input_frame, text="Количество (г):", text_color=TEXT_COLOR, font=("Segoe UI", 16)).grid(row=0, column=2, padx=10, pady=5)
+        ctk.CTkEntry(input_frame, textvariable=amount_var, width=100).grid(row=0, column=3, padx=10, pady=5)
+
+        def amount():
+            try:
+                grams = amount_var.get()
+            except tk.TclError:
+                grams = 0
+            if grams <= 0:
+                messagebox.showwarning("Ошибка", "Введите количество в граммах")
+                return None
+            return grams
+
+        def add_food():
+            item, grams = selected["item"], amount()
+            if item is None:
+                messagebox.showwarning("Ошибка", "Выберите продукт из списка")
+                return
+            if grams is None:
+                return
+            meal = meal_of[meal_var.get()]
+            if isinstance(item, tuple):
+                name = item[1]
+                calories = self.tracker.add_recipe(name, grams, meal)
+            else:
+                name = catalog.name(item)
+                calories = self.tracker.add_food(catalog.get(item), grams, meal)
+            self.store.set("total_calories", self.tracker.total_calories)
+            self.store.touch("meals")
+            messagebox.showinfo("Добавлено", f"Добавлено {name}: {calories:.1f} ккал")
+
+        add_btn = ctk.CTkButton(input_frame, text="Добавить", fg_color=ACCENT, hover_color=GLOW, command=add_food)
+        add_btn.grid(row=0, column=4, padx=10, pady=5)
+
+        ctk.CTkSegmentedButton(calories_block, values=[MEAL_NAMES[meal] for meal in MEALS], variable=meal_var,
+                               selected_color=GLOW, unselected_color=ACCENT).pack(pady=5)
+
+        ctk.CTkLabel(calories_block, textvariable=food_var, font=("Segoe UI", 16, "bold"), text_color=GLOW).pack(pady=5)
+
+        def select_food(item):
+            selected["item"] = item
+            food_var.set(f"📖 {item[1]}" if isinstance(item, tuple) else catalog.name(item))
+
+        def format_food(item):
+            if isinstance(item, tuple):
+                per_100g = self.tracker.recipes.per_100g(item[1])
+                return f"📖 {item[1]} — {per_100g.kcal:.0f} ккал / 100г · Б {per_100g.protein:.1f} · Ж {per_100g.fat:.1f} · У {per_100g.carbs:.1f}"
+            food = catalog.get(item)
+            return f"{food.name} — {food.kcal:g} ккал / 100г · Б {food.protein:g} · Ж {food.fat:g} · У {food.carbs:g}"
+
+        def search(query):
+            # The user's recipes first, then the (possibly huge) catalog
+            recipes = [("recipe", name) for name in self.tracker.recipes.names(query)]
+            results.set_items(_Concat(recipes, catalog.search(query)), format_food)
+
+        results = VirtualList(calories_block, rows=8, command=select_food, fg_color=WINDOW_BG)
+        results.pack(pady=5, padx=20, fill="x")
+        search("")
+        search_entry.bind("<KeyRelease>", lambda e: search(search_entry.get()))
+
+        ctk.CTkLabel(calories_block, text="Общие калории:", font=("Segoe UI", 20, "bold"), text_color=GLOW).pack(pady=5)
+        total_label = ctk.CTkLabel(calories_block, text="", font=("Segoe UI", 18), text_color=TEXT_COLOR)
+        total_label.pack()
+        self._watch("total_calories", lambda v: total_label.configure(text=f"{v:.1f}"))
+        meal_label = ctk.CTkLabel(calories_block, text="", font=("Segoe UI", 14), text_color="#CFA0FF")
+        meal_label.pack(pady=5)
+        self._watch("meal_text", lambda text: meal_label.configure(text=text))
+
+        # Today's entries: pick one, then change it to the amount and meal
+        # chosen above, or delete it
+        chosen = {"id": None}
+        entry_var = tk.StringVar(value="")
+
+        def format_entry(entry):
+            return (f"{MEAL_NAMES[entry['meal']]} · {entry['ts'][11:16]} · {entry['food']} "
+                    f"{entry['grams']:g} г — {entry['kcal']:.0f} ккал")
+
+        def choose_entry(entry):
+            chosen["id"] = entry["id"]
+            entry_var.set(format_entry(entry))
+
+        def change_entry(delete):
+            if chosen["id"] is None:
+                messagebox.showwarning("Ошибка", "Выберите запись из списка")
+                return
+            try:
+                if delete:
+                    self.tracker.delete_entry(chosen["id"])
+                else:
+                    grams = amount()
+                    if grams is None:
+                        return
+                    self.tracker.edit_entry(chosen["id"], grams, meal_of[meal_var.get()])
+            except KeyError:
+                messagebox.showwarning("Ошибка", "Этой записи больше нет в сегодняшнем журнале")
+                return
+            if delete:
+                chosen["id"] = None
+                entry_var.set("")
+            self.store.set("total_calories", self.tracker.total_calories)
+            self.store.touch("meals")
+
+        entries = VirtualList(calories_block, rows=6, command=choose_entry, fg_color=WINDOW_BG)
+        entries.pack(pady=5, padx=20, fill="x")
+        self._watch("meals", lambda log: entries.set_items(log.entries if log is not None else [], format_entry))
+        ctk.CTkLabel(calories_block, textvariable=entry_var, font=("Segoe UI", 14), text_color=GLOW).pack()
+        entry_buttons = ctk.CTkFrame(calories_block, fg_color=WINDOW_BG)
+        entry_buttons.pack(pady=5)
+        ctk.CTkButton(entry_buttons, text="Изменить", fg_color=ACCENT, hover_color=GLOW,
+                      command=lambda: change_entry(False)).pack(side="left", padx=5)
+        ctk.CTkButton(entry_buttons, text="Удалить", fg_color=ACCENT, hover_color=GLOW,
+                      command=lambda: change_entry(True)).pack(side="left", padx=5)
+
+        self._history_chart(calories_block, "calories", watch="total_calories").pack(pady=5, padx=20, fill="x")
+
+        # Recipes are put together from the selected product (or recipe) and
+        # amount, one ingredient at a time
+        recipe_block = ctk.CTkFrame(calories_block, fg_color=WINDOW_BG, corner_radius=10, border_width=1, border_color=ACCENT)
+        recipe_block.pack(pady=10, padx=20, fill="x")
+        ctk.CTkLabel(recipe_block, text="📖 Рецепт", font=("Segoe UI", 18, "bold"), text_color=GLOW).pack(pady=5)
+        recipe_frame = ctk.CTkFrame(recipe_block, fg_color=WINDOW_BG)
+        recipe_frame.pack(pady=5)
+        recipe_name = ctk.CTkEntry(recipe_frame, placeholder_text="Название рецепта", width=220, fg_color=MAIN_BG, border_color=ACCENT)
+        recipe_name.grid(row=0, column=0, padx=5)
+        recipe_yield = ctk.CTkEntry(recipe_frame, placeholder_text="Готовый вес, г (необязательно)", width=220, fg_color=MAIN_BG, border_color=ACCENT)
+        recipe_yield.grid(row=0, column=1, padx=5)
+        ingredients = []
+        ingredients_label = ctk.CTkLabel(recipe_block, text="", font=("Segoe UI", 14), text_color=TEXT_COLOR, justify="left")
+        ingredients_label.pack(pady=5)
+
+        def show_ingredients():
+            ingredients_label.configure(text="\n".join(f"{name} — {grams:g} г" for name, grams, _ in ingredients))
+
+        def add_ingredient():
+            item, grams = selected["item"], amount()
+            if item is None or grams is None:
+                return
+            if isinstance(item, tuple):
+                ingredients.append((item[1], grams, True))
+            else:
+                ingredients.append((catalog.name(item), grams, False))
+            show_ingredients()
+
+        def save_recipe():
+            try:
+                weight = float(recipe_yield.get()) if recipe_yield.get().strip() else None
+                self.tracker.define_recipe(recipe_name.get(), ingredients, weight)
+            except ValueError:
+                messagebox.showwarning("Ошибка", "Укажите название, ингредиенты и положительный вес; "
+                                                 "рецепт не может входить сам в себя")
+                return
+            messagebox.showinfo("Рецепт сохранён", recipe_name.get().strip())
+            ingredients.clear()
+            show_ingredients()
+            for entry in (recipe_name, recipe_yield):
+                entry.delete(0, "end")
+            search(search_entry.get())
+
+        def clear_ingredients():
+            ingredients.clear()
+            show_ingredients()
+
+        recipe_buttons = ctk.CTkFrame(recipe_block, fg_color=WINDOW_BG)
+        recipe_buttons.pack(pady=5)
+        for text, command in (("Добавить ингредиент", add_ingredient), ("Сохранить рецепт", save_recipe),
+                              ("Очистить", clear_ingredients)):
+            ctk.CTkButton(recipe_buttons, text=text, fg_color=ACCENT, hover_color=GLOW, command=command).pack(side="left", padx=5)
+
+        tips = (
+            "💡 Советы по питанию:\n"
+            "- Ешьте больше белков для поддержания мышц.\n"
+            "- Уменьшите количество сахара и фастфуда.\n"
+            "- Пейте воду перед едой — это помогает контролировать аппетит.\n"
+            "- Не пропускайте завтрак — это запускает обмен веществ."
+        )
+        ctk.CTkLabel(calories_block, text=tips, font=("Segoe UI", 14), text_color="#CFA0FF", justify="left").pack(pady=10, padx=20)
+
+    # ---------------------------- Water ----------------------------
+    def _build_water_tab(self, frame):
+        frame.configure(fg_color=MAIN_BG)
+        title = ctk.CTkLabel(frame, text="Трекер воды", font=("Segoe UI", 26, "bold"), text_color=TEXT_COLOR)
+        title.pack(pady=15)
+
+        water_block = ctk.CTkFrame(frame, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        water_block.pack(pady=10, padx=20, fill="x")
+
+        glass_container = ctk.CTkFrame(water_block, fg_color=WINDOW_BG)
+        glass_container.pack(pady=10, side="left", padx=20)
+
+        glass_canvas = ctk.CTkCanvas(glass_container, width=150, height=300, bg=MAIN_BG, highlightthickness=0)
+        glass_canvas.pack(padx=10, pady=10)
+
+        # Draw glass
+        glass_canvas.create_rectangle(40, 20, 110, 280, outline=GLASS_OUTLINE, width=3)
+        glass_canvas.create_arc(40, 260, 110, 280, start=0, extent=180, style="arc", outline=GLASS_OUTLINE, width=3)
+        water_level = glass_canvas.create_rectangle(40, 280, 110, 280, fill=WATER_COLOR, outline="")
+        self._watch("water_progress", lambda p: glass_canvas.coords(water_level, 40, 280 - 260 * p, 110, 280))
+
+        slider = ctk.CTkSlider(water_block, orientation="vertical", from_=0, to=self.water_goal, number_of_steps=100, command=self.update_water_from_slider)
+        slider.pack(side="left", padx=20, pady=10, fill="y")
+        self._watch("water_intake", slider.set)
+
+        water_label = ctk.CTkLabel(water_block, text="", font=("Segoe UI", 20, "bold"), text_color=GLOW)
+        water_label.pack(side="left", padx=10, pady=5)
+        self._watch("water_intake", lambda v: water_label.configure(text=f"{v:.2f}"))
+        goal_label = ctk.CTkLabel(water_block, text=f"/ {self.water_goal:.1f} л", font=("Segoe UI", 16), text_color=TEXT_COLOR)
+        goal_label.pack(side="left", padx=5)
+        self._history_chart(water_block, "water", watch="water_intake").pack(side="left", padx=20, pady=10, fill="x", expand=True)
+
+        bottom_frame = ctk.CTkFrame(frame, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        bottom_frame.pack(pady=10, padx=20, fill="x")
+
+        btn_frame = ctk.CTkFrame(bottom_frame, fg_color=WINDOW_BG)
+        btn_frame.pack(pady=10)
+
+        for ml in [0.1, 0.25, 0.5, 1.0]:
+            btn = ctk.CTkButton(btn_frame, text=f"+{ml} л", fg_color=ACCENT, hover_color=GLOW, width=80,
+                                command=lambda m=ml: self.add_water(m))
+            btn.pack(side="left", padx=15, pady=5)
+
+        water_entry = ctk.CTkEntry(bottom_frame, width=100)
+        water_entry.pack(pady=5, padx=10)
+        self._watch("water_intake", lambda v: _set_entry(water_entry, f"{v:.2f}"))
+        water_entry.bind("<Return>", lambda e: self.update_water_from_entry(water_entry))
+
+        tips = (
+            "💧 Пейте воду равномерно в течение дня.\n"
+            "💜 Не ждите жажды, пейте заранее.\n"
+            "🌙 Стакан воды утром — полезная привычка!"
+        )
+        ctk.CTkLabel(bottom_frame, text=tips, font=("Segoe UI", 14), text_color="#CFA0FF", justify="left").pack(pady=10, padx=20)
+
+    def update_water_from_slider(self, value):
+        self.store.set("water_intake", self.tracker.set_water(float(value)))
+
+    def update_water_from_entry(self, entry):
+        try:
+            value = float(entry.get())
+            if 0 <= value <= self.water_goal:
+                self.store.set("water_intake", self.tracker.set_water(value))
+            else:
+                messagebox.showwarning("Ошибка", f"Введите значение от 0 до {self.water_goal} л")
+        except ValueError:
+            messagebox.showwarning("Ошибка", "Введите корректное число")
+
+    def add_water(self, amount):
+        self.store.set("water_intake", self.tracker.add_water(amount))
+
+    # ---------------------------- Weight ----------------------------
+    def _build_weight_tab(self, frame):
+        frame.configure(fg_color=MAIN_BG)
+        title = ctk.CTkLabel(frame, text="Контроль веса", font=("Segoe UI", 26, "bold"), text_color=TEXT_COLOR)
+        title.pack(pady=15)
+
+        weight_block = ctk.CTkFrame(frame, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        weight_block.pack(pady=10, padx=20, fill="x")
+
+        weight_var = tk.DoubleVar(value=0.0)
+        height_var = tk.DoubleVar(value=0.0)
+
+        entry_frame = ctk.CTkFrame(weight_block, fg_color=WINDOW_BG)
+        entry_frame.pack(pady=10, fill="x")
+
+        ctk.CTkLabel(entry_frame, text="Вес (кг):", text_color=TEXT_COLOR, font=("Segoe UI", 16)).grid(row=0, column=0, padx=10, pady=5)
+        ctk.CTkEntry(entry_frame, textvariable=weight_var, width=120).grid(row=0, column=1, padx=10)
+
+        ctk.CTkLabel(entry_frame, text="Рост (см):", text_color=TEXT_COLOR, font=("Segoe UI", 16)).grid(row=1, column=0, padx=10, pady=5)
+        ctk.CTkEntry(entry_frame, textvariable=height_var, width=120).grid(row=1, column=1, padx=10)
+
+        def calc_bmi():
+            try:
+                w, h = weight_var.get(), height_var.get()
+                if w <= 0 or h <= 0:
+                    raise ValueError
+            except Exception:
+                bmi_label.configure(text="Ошибка ввода")
+                return
+            self.tracker.log_weight(w)
+            if h != self.store.get("height"):
+                self.tracker.log_height(h)
+            self.store.update(weight=w, height=h)
+
+        calc_btn = ctk.CTkButton(weight_block, text="Рассчитать ИМТ", fg_color=ACCENT, hover_color=GLOW, text_color="white", width=180,
+                                 command=calc_bmi)
+        calc_btn.pack(pady=10)
+
+        bmi_label = ctk.CTkLabel(weight_block, text="", font=("Segoe UI", 20, "bold"), text_color=GLOW)
+        bmi_label.pack(pady=5)
+        self._watch("bmi_text", lambda text: bmi_label.configure(text=text))
+
+        advice_label = ctk.CTkLabel(weight_block, text="", font=("Segoe UI", 14), text_color="#CFA0FF", justify="left")
+        advice_label.pack(pady=5, padx=20)
+        self._watch("bmi_advice", lambda text: advice_label.configure(text=text))
+        self._history_chart(weight_block, "weight", kind="line", watch="weight").pack(pady=10, padx=20, fill="x")
+
+    # ---------------------------- Health ----------------------------
+    def _build_health_tab(self, frame):
+        frame.configure(fg_color=MAIN_BG)
+        title = ctk.CTkLabel(frame, text="Здоровье", font=("Segoe UI", 26, "bold"), text_color=TEXT_COLOR)
+        title.pack(pady=15)
+
+        health_block = ctk.CTkFrame(frame, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        health_block.pack(pady=10, padx=20, fill="x")
+
+        ctk.CTkLabel(health_block, text="Шагометр", font=("Segoe UI", 20, "bold"), text_color=TEXT_COLOR).pack(pady=5)
+        step_entry = ctk.CTkEntry(health_block, width=120)
+        step_entry.pack(pady=5)
+        self._watch("steps", lambda v: _set_entry(step_entry, f"{v:.0f}"))
+
+        def add_steps(amount):
+            self.store.set("steps", self.tracker.add_steps(amount))
+
+        btn_frame = ctk.CTkFrame(health_block, fg_color=WINDOW_BG)
+        btn_frame.pack(pady=10)
+
+        for steps in [100, 500, 1000]:
+            btn = ctk.CTkButton(btn_frame, text=f"+{steps}", fg_color=ACCENT, hover_color=GLOW, width=80,
+                                command=lambda s=steps: add_steps(s))
+            btn.pack(side="left", padx=15, pady=5)
+
+        screen = self.screens.current
+
+        simulation = {"timer": None}
+
+        def simulate_steps():
+            # Shows the steps coming in over five seconds and records them at the end
+            if simulation["timer"] is not None:
+                return
+            total_steps = random.randint(100, 1000)
+            tracker, base = self.tracker, self.store["steps"]
+
+            def show(remaining):
+                # One tenth per half second, from the time actually elapsed
+                tenths = int((5.0 - remaining) / 0.5 + 1e-6)
+                self.store.set("steps", base + tenths * (total_steps // 10))
+
+            def done():
+                simulation["timer"] = None
+                self.store.set("steps", tracker.add_steps(total_steps))
+                messagebox.showinfo("Симуляция", f"Добавлено {total_steps} шагов")
+
+            simulation["timer"] = self.timers.start(5.0, on_tick=show, on_done=done, interval=0.5)
+
+        def pause_simulation():
+            if simulation["timer"] is not None:
+                simulation["timer"].pause()
+
+        def resume_simulation():
+            if simulation["timer"] is not None:
+                simulation["timer"].resume()
+
+        # Logging out pauses it; logging back in carries on
+        screen.on_hide(pause_simulation)
+        screen.on_rebind(resume_simulation)
+
+        sim_btn = ctk.CTkButton(health_block, text="Симулировать шаги", fg_color=ACCENT, hover_color=GLOW, command=simulate_steps)
+        sim_btn.pack(pady=10)
+        self._history_chart(health_block, "steps", watch="steps").pack(pady=5, padx=20, fill="x")
+
+        pulse_var = tk.DoubleVar(value=0.0)
+        ctk.CTkLabel(health_block, text="Пульс (уд/мин):", font=("Segoe UI", 16), text_color=TEXT_COLOR).pack(pady=5)
+        ctk.CTkEntry(health_block, textvariable=pulse_var, width=120).pack(pady=5)
+
+        def analyze_pulse():
+            pulse = pulse_var.get()
+            self.tracker.log_pulse(pulse)
+            messagebox.showinfo("Пульс", pulse_advice(pulse))
+
+        pulse_btn = ctk.CTkButton(health_block, text="Анализ пульса", fg_color=ACCENT, hover_color=GLOW, command=analyze_pulse)
+        pulse_btn.pack(pady=5)
+
+        # Bulk import of tracker exports, run in a worker thread
+        import_btn = ctk.CTkButton(health_block, text="Импорт данных трекера", fg_color=ACCENT, hover_color=GLOW)
+        import_btn.pack(pady=(15, 5))
+        import_progress = ctk.CTkProgressBar(health_block, progress_color=GLOW, width=300)
+        import_progress.set(0)
+
+        def start_import():
+            paths = filedialog.askopenfilenames(title="Файлы трекера",
+                                                filetypes=[("Tracker exports", "*.csv *.gpx *.tcx"), ("All files", "*.*")])
+            if not paths:
+                return
+            self._import_job = ImportJob(self.storage, self.metrics, self.user_data["username"], paths,
+                                         columns=self.columns).start()
+            import_btn.configure(state="disabled")
+            import_progress.set(0)
+            import_progress.pack(pady=5)
+            poll_import()
+
+        def poll_import():
+            job = self._import_job
+            while not job.messages.empty():
+                kind, value = job.messages.get_nowait()
+                if kind == "progress":
+                    import_progress.set(value)
+                    continue
+                self._import_job = None
+                import_btn.configure(state="normal")
+                import_progress.pack_forget()
+                if kind == "error":
+                    messagebox.showerror("Импорт", f"Не удалось импортировать: {value}")
+                elif value is not None:
+                    self._after_write(lambda tracker=self.tracker, result=value: imported(tracker, result))
+                return
+            screen.after(100, poll_import)
+
+        def imported(tracker, result):
+            tracker.refresh_goals(flushed=True)
+            today = result.by_date().get(date.today())
+            if today and today["steps"]:
+                steps = tracker.add_steps(today["steps"], imported=True)
+                if tracker is self.tracker:
+                    self.store.set("steps", steps)
+            messagebox.showinfo("Импорт", f"Импортировано записей: {result.samples}\n"
+                                          f"Дней: {len(result.days)}\nПропущено повторов: {result.duplicates}")
+
+        def resume_import():
+            # Polling stops with the screen's timers; the import itself keeps going
+            if self._import_job is not None:
+                poll_import()
+
+        import_btn.configure(command=start_import)
+        screen.on_rebind(resume_import)
+
+        # History export (CSV, JSON Lines or report by extension), also run in
+        # a worker thread
+        export_btn = ctk.CTkButton(health_block, text="Экспорт истории", fg_color=ACCENT, hover_color=GLOW)
+        export_btn.pack(pady=(5, 15))
+
+        def start_export():
+            path = filedialog.asksaveasfilename(
+                title="Экспорт истории", defaultextension=".csv",
+                filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Отчёт", "*.txt"),
+                           ("Сжатый (gzip)", "*.csv.gz *.jsonl.gz *.txt.gz")])
+            if not path:
+                return
+            export_btn.configure(state="disabled")
+            # Starts once the pending events are written
+            self._after_write(lambda username=self.user_data["username"]: begin_export(path, username))
+
+        def begin_export(path, username):
+            self._export_job = ExportJob(self.storage, self.metrics, path, [username]).start()
+            poll_export()
+
+        def poll_export():
+            job = self._export_job
+            while not job.messages.empty():
+                kind, value = job.messages.get_nowait()
+                if kind == "progress":
+                    continue
+                self._export_job = None
+                export_btn.configure(state="normal")
+                if kind == "error":
+                    messagebox.showerror("Экспорт", f"Не удалось экспортировать: {value}")
+                else:
+                    messagebox.showinfo("Экспорт", "История сохранена")
+                return
+            screen.after(100, poll_export)
+
+        def resume_export():
+            if self._export_job is not None:
+                poll_export()
+
+        export_btn.configure(command=start_export)
+        screen.on_rebind(resume_export)
+
+    # ---------------------------- Star background ----------------------------
+    def _create_star_canvas(self, frame):
+        canvas = ctk.CTkCanvas(frame, bg=MAIN_BG, highlightthickness=0)
+        canvas.pack(fill="both", expand=True)
+
+        stars = []
+        for _ in range(200):
+            x, y = random.randint(0, 1100), random.randint(0, 700)
+            size = random.randint(2, 6)
+            stars.append(canvas.create_oval(x, y, x+size, y+size, fill=random.choice(STAR_COLORS), outline=""))
+
+        self.animations.add(StarField(canvas, stars, STAR_COLORS))
+        return canvas
+
+    # ---------------------------- Meditation ----------------------------
+    def _build_meditation_tab(self, frame):
+        frame.configure(fg_color=MAIN_BG)
+
+        # Full-screen star background
+        self._create_star_canvas(frame)
+
+        content = ctk.CTkFrame(frame, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        content.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.5, relheight=0.7)
+
+        title = ctk.CTkLabel(content, text="Медитация", font=("Segoe UI", 26, "bold"), text_color=GLOW)
+        title.pack(pady=10)
+
+        time_var = tk.StringVar(value="5")
+        ctk.CTkLabel(content, text="Время (мин):", text_color=TEXT_COLOR, font=("Segoe UI", 16)).pack(pady=5)
+        time_menu = ctk.CTkOptionMenu(content, variable=time_var, values=["1", "5", "10", "15", "20"], fg_color=ACCENT, button_color=GLOW)
+        time_menu.pack(pady=5)
+
+        timer_label = ctk.CTkLabel(content, text="00:00", font=("Segoe UI", 20, "bold"), text_color=TEXT_COLOR)
+        timer_label.pack(pady=10)
+
+        screen = self.screens.current
+
+        session = {"timer": None}
+
+        def show_remaining(seconds):
+            mins, secs = divmod(math.ceil(seconds), 60)
+            timer_label.configure(text=f"{mins:02d}:{secs:02d}")
+
+        def finished():
+            session["timer"] = None
+            start_btn.configure(state="normal")
+            pause_btn.configure(state="disabled", text="Пауза")
+            messagebox.showinfo("Медитация", "Медитация завершена!")
+
+        def start_meditation():
+            session["timer"] = self.timers.start(int(time_var.get()) * 60, on_tick=show_remaining, on_done=finished)
+            start_btn.configure(state="disabled")
+            pause_btn.configure(state="normal", text="Пауза")
+
+        def toggle_pause():
+            timer = session["timer"]
+            if timer is None:
+                return
+            if timer.running:
+                timer.pause()
+                pause_btn.configure(text="Продолжить")
+            else:
+                timer.resume()
+                pause_btn.configure(text="Пауза")
+
+        start_btn = ctk.CTkButton(content, text="Начать медитацию", fg_color=ACCENT, hover_color=GLOW, command=start_meditation)
+        start_btn.pack(pady=10)
+        pause_btn = ctk.CTkButton(content, text="Пауза", fg_color="#222222", state="disabled", command=toggle_pause)
+        pause_btn.pack(pady=5)
+
+        def pause_session():
+            # Logging out pauses a session; it is left paused for the user
+            # to continue
+            timer = session["timer"]
+            if timer is not None and timer.running:
+                timer.pause()
+                pause_btn.configure(text="Продолжить")
+
+        screen.on_hide(pause_session)
+
+        notes = (
+            "🧘 Медитация помогает:\n"
+            "- Снизить стресс и тревожность\n"
+            "- Улучшить концентрацию\n"
+            "- Повысить эмоциональное благополучие\n"
+            "- Улучшить сон\n"
+            "- Снизить давление\n\n"
+            "💡 Советы:\n"
+            "- Найдите тихое место.\n"
+            "- Сядьте удобно, держите спину прямо.\n"
+            "- Сосредоточьтесь на дыхании: вдох — 4 сек, выдох — 4 сек.\n"
+            "- Начните с 5 минут в день.\n"
+            "- Используйте направленные приложения, если новичок."
+        )
+        ctk.CTkLabel(content, text=notes, font=("Segoe UI", 14), text_color="#CFA0FF", justify="left").pack(pady=10, padx=20)
+
+    # ---------------------------- Sleep ----------------------------
+    def _build_sleep_tab(self, frame):
+        frame.configure(fg_color=MAIN_BG)
+
+        # Full-screen star background
+        canvas = self._create_star_canvas(frame)
+
+        canvas.create_oval(600, 60, 670, 130, fill="#CFA0FF", outline="")
+        canvas.create_oval(615, 60, 685, 130, fill=MAIN_BG, outline="")
+
+        content = ctk.CTkFrame(frame, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        content.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.5, relheight=0.7)
+
+        title = ctk.CTkLabel(content, text="Трекер сна", font=("Segoe UI", 26, "bold"), text_color=GLOW)
+        title.pack(pady=10)
+
+        sleep_hours = tk.DoubleVar(value=0.0)
+        ctk.CTkLabel(content, text="Сколько часов вы спали?", text_color=TEXT_COLOR, font=("Segoe UI", 16)).pack(pady=5)
+        ctk.CTkEntry(content, textvariable=sleep_hours, width=120).pack(pady=5)
+
+        result_label = ctk.CTkLabel(content, text="", text_color="#CFA0FF", font=("Segoe UI", 16))
+        result_label.pack(pady=10)
+
+        def analyze_sleep():
+            hours = sleep_hours.get()
+            self.tracker.log_sleep(hours)
+            self.store.set("sleep", hours)
+            result_label.configure(text=sleep_advice(hours))
+
+        analyze_btn = ctk.CTkButton(content, text="Анализ сна", fg_color=ACCENT, hover_color=GLOW, command=analyze_sleep)
+        analyze_btn.pack(pady=5)
+        self._history_chart(content, "sleep", kind="line", watch="sleep").pack(pady=5, padx=20, fill="x")
+
+        notes = (
+            "😴 Сон важен для:\n"
+            "- Восстановления организма\n"
+            "- Улучшения памяти и концентрации\n"
+            "- Поддержания иммунитета\n"
+            "- Регуляции гормонов\n"
+            "- Контроля веса\n"
+            "- Улучшения настроения\n\n"
+            "💡 Советы для хорошего сна:\n"
+            "- Ложитесь спать в одно и то же время.\n"
+            "- Избегайте экранов за час до сна.\n"
+            "- Создайте темную и прохладную обстановку.\n"
+            "- Нет кофеину вечером.\n"
+            "- Расслабьтесь с чтением или медитацией.\n"
+            "- Занимайтесь спортом днем."
+        )
+        ctk.CTkLabel(content, text=notes, font=("Segoe UI", 14), text_color="#CFA0FF", justify="left").pack(pady=10, padx=20)
+
+    # ---------------------------- Goals ----------------------------
+    def _build_goals_tab(self, frame):
+        frame.configure(fg_color=MAIN_BG)
+        title = ctk.CTkLabel(frame, text="Цели", font=("Segoe UI", 26, "bold"), text_color=TEXT_COLOR)
+        title.pack(pady=15)
+
+        goals_block = ctk.CTkFrame(frame, fg_color=WINDOW_BG, corner_radius=15, border_width=2, border_color=GLOW)
+        goals_block.pack(pady=10, padx=20, fill="x")
+
+        goal_desc = tk.StringVar()
+        goal_value = tk.DoubleVar()
+        goal_period = tk.StringVar(value="1 месяц")
+
+        ctk.CTkLabel(goals_block, text="Описание цели:", font=("Segoe UI", 16), text_color=TEXT_COLOR).pack(pady=5)
+        ctk.CTkEntry(goals_block, textvariable=goal_desc, width=300).pack(pady=5)
+
+        ctk.CTkLabel(goals_block, text="Значение (напр., 5 кг):", font=("Segoe UI", 16), text_color=TEXT_COLOR).pack(pady=5)
+        ctk.CTkEntry(goals_block, textvariable=goal_value, width=120).pack(pady=5)
+
+        ctk.CTkLabel(goals_block, text="Срок:", font=("Segoe UI", 16), text_color=TEXT_COLOR).pack(pady=5)
+        ctk.CTkOptionMenu(goals_block, variable=goal_period, values=["1 неделя", "1 месяц", "3 месяца"], fg_color=ACCENT, button_color=GLOW).pack(pady=5)
+
+        def add_goal():
+            try:
+                goal = self.tracker.add_goal(goal_desc.get(), goal_value.get(), goal_period.get(), seed=False)
+            except ValueError:
+                messagebox.showwarning("Ошибка", "Заполните все поля корректно")
+                return
+            # Progress is seeded from the metric store once the writer has
+            # caught up, so the Tk loop does not wait for the write
+            self._after_write(lambda tracker=self.tracker: tracker.seed_goal(goal))
+            self.store.touch("goals")
+            desc, advice = goal["desc"], goal["advice"]
+            messagebox.showinfo("Цель добавлена", f"Цель: {desc}\nСоветы:\n{advice}")
+
+        add_btn = ctk.CTkButton(goals_block, text="Добавить цель", fg_color=ACCENT, hover_color=GLOW, command=add_goal)
+        add_btn.pack(pady=10)
+
+        goals_label = ctk.CTkLabel(goals_block, text="", font=("Segoe UI", 14), text_color=TEXT_COLOR, justify="left")
+        goals_label.pack(pady=10, padx=20)
+
+        def show_goals(progress):
+            # `progress` lists the goals in order, so it lines up with store["goals"]
+            lines = []
+            for g, p in zip(self.store["goals"], progress):
+                line = f"{g['desc']} ({g['value']} за {g['period']})"
+                if p.fraction is not None:
+                    line += f" — {p.fraction:.0%}, {p.text}"
+                lines.append(line)
+            goals_label.configure(text="\n".join(lines) or "Нет активных целей")
+
+        self._watch("goal_progress", show_goals)
+
+        common_goals = (
+            "🎯 Общие цели фитнеса:\n"
+            "- Сбросить вес (напр., 5-10 кг за 3 месяца)\n"
+            "- Набрать мышцы\n"
+            "- Пробежать милю без остановки\n"
+            "- Заниматься 3-4 раза в неделю\n"
+            "- Улучшить гибкость с йогой\n"
+            "- Достичь 10 000 шагов ежедневно\n"
+            "- Питаться здоровее\n"
+            "- Получать лучший сон (7-9 часов)"
+        )
+        ctk.CTkLabel(goals_block, text=common_goals, font=("Segoe UI", 14), text_color="#CFA0FF", justify="left").pack(pady=10, padx=20)
+
+    # ---------------------------- Run ----------------------------
+    def run(self):
+        self.mainloop()
+
+if __name__ == "__main__":
+    app = FitnessApp()
+    app.run()
@@ -0,0 +1,108 @@
+# Finished days of one user. The tracker's running totals only cover today;
+# when the date changes they are archived as a DayRecord and start again from
+# zero. Past days are read from the metric store's day rollups (a B-tree range
+# scan) one window at a time into a date-sorted index with bisect lookups, so
+# memory holds today plus the ranges on screen rather than the whole history.
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
+from datetime import date, timedelta
+
+DayRecord = namedtuple("DayRecord", "day calories water steps")
+
+# DayRecord field -> metric in the metric store
+DAY_METRICS = {"calories": "calories", "water": "water", "steps": "steps"}
+MAX_WINDOWS = 4  # cached ranges; the dashboard shows three
+
+
+class DayIndex:
+    # DayRecords sorted by their ISO date
+    def __init__(self, records=()):
+        self.records = sorted(records)
+        self.days = [record.day for record in self.records]
+
+    def __len__(self):
+        return len(self.records)
+
+    def put(self, record):
+        i = bisect_left(self.days, record.day)
+        if i < len(self.days) and self.days[i] == record.day:
+            self.records[i] = record
+        else:
+            self.days.insert(i, record.day)
+            self.records.insert(i, record)
+
+    def get(self, day):
+        i = bisect_left(self.days, day)
+        return self.records[i] if i < len(self.days) and self.days[i] == day else None
+
+    def range(self, start, end):
+        # Records with start <= day <= end (ISO dates)
+        return self.records[bisect_left(self.days, start):bisect_right(self.days, end)]
+
+
+def week_range(today):
+    start = today - timedelta(days=today.weekday())
+    return start, today
+
+
+def last_month_range(today):
+    end = today.replace(day=1) - timedelta(days=1)
+    return end.replace(day=1), end
+
+
+def same_day_last_year(today):
+    try:
+        return today.replace(year=today.year - 1)
+    except ValueError:  # 29 February
+        return today.replace(year=today.year - 1, day=28)
+
+
+class DailyHistory:
+    # Range queries over one user's day records. The last MAX_WINDOWS
+    # windows viewed are cached by range, and a query inside one of them is
+    # answered from it. Days archived by a rollover are added to the windows
+    # they fall inside; clear() drops them all.
+    def __init__(self, metrics, username):
+        self.metrics = metrics
+        self.username = username
+        self._windows = OrderedDict()  # (start, end) -> DayIndex
+
+    def view(self, start, end):
+        start, end = start.isoformat(), end.isoformat()
+        for window, index in self._windows.items():
+            if window[0] <= start and end <= window[1]:
+                self._windows.move_to_end(window)
+                return index.range(start, end)
+        index = self._windows[(start, end)] = DayIndex(self._load(start, end))
+        if len(self._windows) > MAX_WINDOWS:
+            self._windows.popitem(last=False)
+        return index.range(start, end)
+
+    def clear(self):
+        self._windows.clear()
+
+    def _load(self, start, end):
+        if self.metrics is None:
+            return []
+        days = {}
+        for field, metric in DAY_METRICS.items():
+            for rollup in self.metrics.rollups(self.username, metric, "day", start, end):
+                days.setdefault(rollup.bucket, {})[field] = rollup.total
+        return [DayRecord(day, values.get("calories", 0.0), values.get("water", 0.0), values.get("steps", 0.0))
+                for day, values in days.items()]
+
+    def archive(self, record):
+        for (start, end), index in self._windows.items():
+            if start <= record.day <= end:
+                index.put(record)
+
+    def this_week(self, today=None):
+        return self.view(*week_range(today or date.today()))
+
+    def last_month(self, today=None):
+        return self.view(*last_month_range(today or date.today()))
+
+    def same_day_last_year(self, today=None):
+        day = same_day_last_year(today or date.today())
+        records = self.view(day, day)
+        return records[0] if records else None
@@ -0,0 +1,379 @@
+# Streaming import of tracker exports (CSV, GPX, TCX). Files are read through
+# generators and aggregated into per-day totals in fixed-size batches, so
+# memory stays flat however long the export is. NumPy is used for the batch
+# math when it is installed.
+import csv
+import io
+import os
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EPOCH = datetime(1970, 1, 1)
+DAY = 86400
+RUN_GAP = 3600  # seconds without samples that end an imported range
+
+
+def _wall_seconds(dt):
+    # Seconds since the epoch on the local wall clock, so that `// DAY`
+    # gives the local calendar day
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return (dt - EPOCH).total_seconds()
+
+
+def _parse_time(text):
+    return _wall_seconds(datetime.fromisoformat(text.strip().replace("Z", "+00:00")))
+
+
+def day_of(seconds):
+    return date(1970, 1, 1) + timedelta(days=int(seconds // DAY))
+
+
+class _CountingReader(io.RawIOBase):
+    # Wraps a binary file and counts bytes read, for progress reporting
+    def __init__(self, raw):
+        self._raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._raw.readinto(buffer)
+        self.bytes_read += n or 0
+        return n
+
+
+# ---------------------------- Readers ----------------------------
+# Each reader yields (wall_seconds, steps, heart_rate); a missing value is None.
+CSV_TIME = ("timestamp", "time", "datetime", "date", "start_time")
+CSV_STEPS = ("steps", "step_count", "stepcount")
+CSV_HR = ("heart_rate", "heartrate", "hr", "bpm", "pulse")
+
+
+def iter_csv(stream):
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = [column.strip().lower() for column in next(reader, [])]
+
+    def column(names):
+        return next((header.index(name) for name in names if name in header), None)
+
+    time_col, steps_col, hr_col = column(CSV_TIME), column(CSV_STEPS), column(CSV_HR)
+    if time_col is None:
+        raise ValueError("CSV has no timestamp column")
+    for row in reader:
+        try:
+            ts = _parse_time(row[time_col])
+        except (ValueError, IndexError):
+            continue
+        yield ts, _cell(row, steps_col), _cell(row, hr_col)
+
+
+def _cell(row, col):
+    # A number, or None for a missing column, a short row or a cell like "n/a"
+    try:
+        return float(row[col]) if col is not None and row[col].strip() else None
+    except (ValueError, IndexError):
+        return None
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _iter_points(stream, point_tag):
+    # Yields the children of every <point_tag> as {local tag name: text},
+    # clearing parsed elements so the tree never grows
+    context = ET.iterparse(stream, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event == "end" and _local(elem.tag) == point_tag:
+            yield {_local(child.tag): (child.text or "").strip() for child in elem.iter()}
+            elem.clear()
+            root.clear()
+
+
+def iter_gpx(stream):
+    for point in _iter_points(stream, "trkpt"):
+        if "time" in point:
+            hr = point.get("hr")
+            yield _parse_time(point["time"]), None, float(hr) if hr else None
+
+
+def iter_tcx(stream):
+    # Heart rate comes from track points; step counts, where the device
+    # records them, from the lap extension (<LX><Steps>) at the lap start
+    context = ET.iterparse(stream, events=("start", "end"))
+    _, root = next(context)
+    lap_start = None
+    for event, elem in context:
+        tag = _local(elem.tag)
+        if event == "start" and tag == "Lap":
+            lap_start = elem.get("StartTime")
+        elif event == "end" and tag == "Trackpoint":
+            values = {_local(child.tag): (child.text or "").strip() for child in elem.iter()}
+            if values.get("Time"):
+                hr = values.get("Value")
+                yield _parse_time(values["Time"]), None, float(hr) if hr else None
+            elem.clear()
+            root.clear()
+        elif event == "end" and tag == "Steps" and lap_start:
+            yield _parse_time(lap_start), float(elem.text or 0), None
+        elif event == "end" and tag == "Lap":
+            elem.clear()
+            root.clear()
+
+
+READERS = {".csv": iter_csv, ".gpx": iter_gpx, ".tcx": iter_tcx}
+
+
+# ---------------------------- Aggregation ----------------------------
+def merge_ranges(ranges, gap=0.0):
+    # Sorted union of [start, end] ranges; ranges at most `gap` apart are joined
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start - merged[-1][1] <= gap:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class IntervalSet:
+    # Sorted, non-overlapping [start, end] ranges of already imported samples
+    def __init__(self, ranges=()):
+        self.ranges = merge_ranges(ranges)
+
+    def add(self, start, end):
+        self.update([(start, end)])
+
+    def update(self, ranges):
+        self.ranges = merge_ranges(self.ranges + list(ranges))
+
+    def covers(self, ts):
+        i = bisect_right(self.ranges, (ts, float("inf"))) - 1
+        return i >= 0 and self.ranges[i][0] <= ts <= self.ranges[i][1]
+
+
+class DailyAggregator:
+    # Per-day step totals and heart-rate sum/min/max/count, fed in batches.
+    # Samples inside `skip` (ranges imported before, and those of earlier
+    # files of the same job) or repeating a sample of the current batch are
+    # dropped, so overlapping exports are not counted twice. `covered` gets
+    # the ranges the kept samples actually span: one per run of samples with
+    # no gap over RUN_GAP, per file, so a later export filling a gap is
+    # still imported.
+    def __init__(self, skip=None, batch_size=65536):
+        self.skip = skip or IntervalSet()
+        self.batch_size = batch_size
+        self.days = {}
+        self.covered = []
+        self.samples = 0
+        self.duplicates = 0
+        self._ts = array("d")
+        self._steps = array("d")
+        self._hr = array("d")
+        self._seen = set()
+        self._prev = None
+        self._runs = []
+
+    def add(self, ts, steps, hr):
+        sample = (ts, steps, hr)
+        if sample in self._seen:
+            self.duplicates += 1
+            return
+        self._seen.add(sample)
+        self._prev = sample
+        self._ts.append(ts)
+        self._steps.append(steps if steps is not None else 0.0)
+        self._hr.append(hr if hr is not None else float("nan"))
+        if len(self._ts) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._ts:
+            return
+        if np is not None:
+            self._flush_numpy()
+        else:
+            self._flush_python()
+        self._ts, self._steps, self._hr = array("d"), array("d"), array("d")
+        # Memory stays bounded by the batch; a repeat right across the
+        # boundary is still caught
+        self._seen = {self._prev}
+
+    def end_file(self):
+        # Closes the ranges of one file's samples; later files of the job
+        # skip them like ranges imported before
+        self.flush()
+        runs = merge_ranges(self._runs, RUN_GAP)
+        self._runs = []
+        self.covered.extend(runs)
+        self.skip.update(runs)
+
+    def _day(self, day_index):
+        # Keyed by days since the epoch; see by_date()
+        day = self.days.get(day_index)
+        if day is None:
+            day = self.days[day_index] = {"steps": 0.0, "hr_sum": 0.0, "hr_count": 0, "hr_min": None, "hr_max": None}
+        return day
+
+    def by_date(self):
+        return {day_of(index * DAY): values for index, values in sorted(self.days.items())}
+
+    def _note_runs(self, ts):
+        # `ts` sorted; adds its runs of samples to the current file's ranges
+        start = prev = ts[0]
+        for t in ts:
+            if t - prev > RUN_GAP:
+                self._runs.append((start, prev))
+                start = t
+            prev = t
+        self._runs.append((start, prev))
+
+    def _flush_numpy(self):
+        ts = np.frombuffer(self._ts, dtype=np.float64)
+        steps = np.frombuffer(self._steps, dtype=np.float64)
+        hr = np.frombuffer(self._hr, dtype=np.float64)
+        keep = np.ones(len(ts), dtype=bool)
+        if self.skip.ranges:
+            starts = np.array([s for s, _ in self.skip.ranges])
+            ends = np.array([e for _, e in self.skip.ranges])
+            i = np.searchsorted(starts, ts, side="right") - 1
+            keep = ~((i >= 0) & (ts <= ends[np.maximum(i, 0)]))
+        self.duplicates += int(len(ts) - keep.sum())
+        ts, steps, hr = ts[keep], steps[keep], hr[keep]
+        if not len(ts):
+            return
+        self.samples += len(ts)
+        ordered = np.sort(ts)
+        breaks = np.flatnonzero(np.diff(ordered) > RUN_GAP)
+        starts, ends = ordered[np.r_[0, breaks + 1]], ordered[np.r_[breaks, len(ordered) - 1]]
+        self._runs.extend(zip(starts.tolist(), ends.tolist()))
+
+        day_index = (ts // DAY).astype(np.int64)
+        base = int(day_index.min())
+        offset = day_index - base
+        size = int(offset.max()) + 1
+        step_totals = np.bincount(offset, weights=steps, minlength=size)
+        has_hr = ~np.isnan(hr)
+        hr_sum = np.bincount(offset[has_hr], weights=hr[has_hr], minlength=size)
+        hr_count = np.bincount(offset[has_hr], minlength=size)
+        hr_min = np.full(size, np.inf)
+        hr_max = np.full(size, -np.inf)
+        np.minimum.at(hr_min, offset[has_hr], hr[has_hr])
+        np.maximum.at(hr_max, offset[has_hr], hr[has_hr])
+
+        for k in np.unique(offset):
+            day = self._day(base + int(k))
+            day["steps"] += float(step_totals[k])
+            if hr_count[k]:
+                day["hr_sum"] += float(hr_sum[k])
+                day["hr_count"] += int(hr_count[k])
+                day["hr_min"] = min(float(hr_min[k]), day["hr_min"] if day["hr_min"] is not None else float("inf"))
+                day["hr_max"] = max(float(hr_max[k]), day["hr_max"] if day["hr_max"] is not None else float("-inf"))
+
+    def _flush_python(self):
+        covers = self.skip.covers if self.skip.ranges else None
+        kept = []
+        for ts, steps, hr in zip(self._ts, self._steps, self._hr):
+            if covers is not None and covers(ts):
+                self.duplicates += 1
+                continue
+            self.samples += 1
+            kept.append(ts)
+            day = self._day(int(ts // DAY))
+            day["steps"] += steps
+            if hr == hr:
+                day["hr_sum"] += hr
+                day["hr_count"] += 1
+                day["hr_min"] = hr if day["hr_min"] is None else min(day["hr_min"], hr)
+                day["hr_max"] = hr if day["hr_max"] is None else max(day["hr_max"], hr)
+        if kept:
+            kept.sort()
+            self._note_runs(kept)
+
+
+# ---------------------------- Import job ----------------------------
+def import_files(storage, metrics, username, paths, progress=None, cancelled=None):
+    # Streams every file into one aggregator and adds the per-day totals to
+    # the metric store; `storage` remembers the time ranges the imported
+    # samples cover (see DailyAggregator).
+    # `progress(fraction)` is called as bytes are consumed.
+    skip = IntervalSet(storage.imported_ranges(username))
+    aggregator = DailyAggregator(skip)
+    total = sum(os.path.getsize(path) for path in paths) or 1
+    done = 0
+    for path in paths:
+        reader = READERS.get(os.path.splitext(path)[1].lower())
+        if reader is None:
+            raise ValueError(f"Unsupported file type: {path}")
+        with open(path, "rb") as raw:
+            counting = _CountingReader(raw)
+            stream = io.BufferedReader(counting)
+            for n, (ts, steps, hr) in enumerate(reader(stream)):
+                aggregator.add(ts, steps, hr)
+                if n % 10000 == 0:
+                    if cancelled is not None and cancelled.is_set():
+                        return None
+                    if progress:
+                        progress((done + counting.bytes_read) / total)
+            done += os.path.getsize(path)
+        aggregator.end_file()
+
+    steps, pulse = {}, {}
+    for day, values in aggregator.by_date().items():
+        day = day.isoformat()
+        steps[day] = (values["steps"], values["steps"], values["steps"], 1)
+        if values["hr_count"]:
+            pulse[day] = (values["hr_sum"], values["hr_min"], values["hr_max"], values["hr_count"])
+    metrics.add_daily(username, "steps", steps)
+    metrics.add_daily(username, "pulse", pulse)
+    if aggregator.covered:
+        storage.add_imported_ranges(username, merge_ranges(aggregator.covered))
+    if progress:
+        progress(1.0)
+    return aggregator
+
+
+class ImportJob:
+    # Runs import_files() in a worker thread. The UI polls `messages` for
+    # ("progress", fraction), ("done", aggregator) or ("error", exception).
+    # The thread's database connections are closed when it ends.
+    def __init__(self, storage, metrics, username, paths, columns=None):
+        self.messages = queue.Queue()
+        self._cancelled = threading.Event()
+        self._columns = columns
+        self._thread = threading.Thread(target=self._run, args=(storage, metrics, username, list(paths)),
+                                        name="tracker-import", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _run(self, storage, metrics, username, paths):
+        try:
+            result = import_files(storage, metrics, username, paths,
+                                  progress=lambda f: self.messages.put(("progress", f)),
+                                  cancelled=self._cancelled)
+            if self._columns is not None and result is not None and result.days:
+                self._columns.sync(username, day_of(min(result.days) * DAY).isoformat())
+            self.messages.put(("done", result))
+        except Exception as exc:
+            self.messages.put(("error", exc))
+        finally:
+            storage.close_thread()
+            metrics.close_thread()
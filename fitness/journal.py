@@ -0,0 +1,251 @@
+import copy
+import json
+import os
+from datetime import date, datetime
+
+from fitness.locking import FileLock
+from fitness.persistence import atomic_write_json, file_stamp
+
+# "meals" holds today's food entries (see meal_entry), "recipes" the user's
+# recipes by name (see meals.RecipeBook)
+EMPTY_STATE = {"day": None, "water_intake": 0.0, "total_calories": 0.0, "steps": 0.0, "goals": [],
+               "meals": [], "recipes": {}}
+DAY_TOTALS = ("water_intake", "total_calories", "steps")
+MEAL_EVENTS = ("food", "food_edit", "food_delete")
+MAX_UNSEEN = 1000  # events kept for changes(); past that the state is loaded again
+
+
+def new_event(kind, **payload):
+    return {"type": kind, "ts": datetime.now().isoformat(timespec="seconds"), **payload}
+
+
+def apply_event(state, event):
+    # The totals cover one day: the first event of a later day starts them
+    # from zero. States from before daily totals have no "day" at all.
+    day = event["ts"][:10]
+    if day > (state.get("day") or ""):
+        state.update(dict.fromkeys(DAY_TOTALS, 0.0), day=day, meals=[])
+    kind = event["type"]
+    if kind == "food":
+        state["total_calories"] += event["kcal"]
+        apply_meal_event(state["meals"], event)
+    elif kind in ("food_edit", "food_delete"):
+        # `delta` is the change in kcal
+        state["total_calories"] += event["delta"]
+        apply_meal_event(state["meals"], event)
+    elif kind == "recipe":
+        state["recipes"][event["name"]] = event["recipe"]
+    elif kind == "water":
+        # Water is logged as the resulting level: the slider and the entry set it directly
+        state["water_intake"] = event["value"]
+    elif kind == "steps":
+        state["steps"] += event["delta"]
+    elif kind == "goal":
+        # Goals from before progress tracking have no start date
+        state["goals"].append({"start": event["ts"][:10], **event["goal"]})
+    return state
+
+
+def meal_entry(event, index=0):
+    # A "food" event as an entry of the day's meal log. Entries logged before
+    # the meal log have no id or meal; they get one from their position.
+    entry = {key: value for key, value in event.items() if key not in ("type", "seq")}
+    entry.setdefault("id", f"{event['ts']}#{index}")
+    entry.setdefault("meal", "snack")
+    return entry
+
+
+def apply_meal_event(meals, event):
+    # Replays one of MEAL_EVENTS onto the list of today's entries
+    kind = event["type"]
+    if kind == "food":
+        meals.append(meal_entry(event, len(meals)))
+        return
+    for i, entry in enumerate(meals):
+        if entry["id"] == event["id"]:
+            if kind == "food_delete":
+                del meals[i]
+            else:
+                entry.update((key, event[key]) for key in ("meal", "grams", "kcal", "protein", "fat", "carbs")
+                             if key in event)
+            return
+
+
+def merge_stale(state, event):
+    # A writer that had not seen the latest events logged a water level based
+    # on an older one. Its change is re-applied on top of the current level,
+    # so both writers' water counts instead of the last one winning.
+    if event["type"] != "water" or "delta" not in event:
+        return event
+    day = event["ts"][:10]
+    level = state["water_intake"] if state.get("day") == day else 0.0
+    return {**event, "value": round(max(level + event["delta"], 0.0), 2)}
+
+
+def merge_events(pending, event):
+    # Write-behind merge: keep every event, but collapse a run of water level
+    # changes (a slider drag) into the last one, keeping the summed change.
+    pending = pending or []
+    if (pending and pending[-1]["type"] == "water" == event["type"]
+            and pending[-1].get("user") == event.get("user")):
+        if "delta" in event:
+            event = {**event, "delta": pending[-1].get("delta", 0.0) + event["delta"]}
+        pending[-1] = event
+    else:
+        pending.append(event)
+    return pending
+
+
+class EventJournal:
+    # Append-only log of timestamped mutations plus a periodic state snapshot.
+    # Once `snapshot_every` events pile up after the last snapshot, the state is
+    # snapshotted and the active log segment is rotated into `archive/`, so
+    # startup replays at most `snapshot_every` events while the full history is kept.
+    # Several processes may share a journal: every read and write holds a
+    # file lock and first catches up with what the others appended (only the
+    # new part of the log is read), and `seq` is the version of the state.
+    # The events appended since the caller last loaded are kept for changes().
+    def __init__(self, directory, snapshot_every=500, legacy_file=None):
+        self.directory = directory
+        self.log_path = os.path.join(directory, "journal.jsonl")
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.archive_dir = os.path.join(directory, "archive")
+        self.snapshot_every = snapshot_every
+        self.legacy_file = legacy_file
+        self.state = copy.deepcopy(EMPTY_STATE)
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._seen = None
+        self._unseen = []  # (event, own) since `_seen`; None when not all are known
+        self._loaded = False
+        self._snapshot_stamp = None
+        self._offset = 0
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self._lock = FileLock(os.path.join(directory, "journal.lock"))
+
+    def load(self):
+        # The current state; the caller has now seen every event in it
+        with self._lock:
+            self._catch_up()
+            self._seen = self._seq
+            self._unseen = []
+            return copy.deepcopy(self.state)
+
+    def changes(self):
+        # The (event, own) pairs appended since the last load() or changes(),
+        # `own` for this process's appends (as merged onto the others'); None
+        # when another process compacted the log in between and the state
+        # must be loaded again
+        with self._lock:
+            self._catch_up()
+            changes, self._unseen = self._unseen, []
+            self._seen = self._seq
+            return changes
+
+    def stale(self):
+        # True when other processes appended events since the last load()
+        with self._lock:
+            self._catch_up()
+            return self._seen != self._seq
+
+    def append(self, events):
+        with self._lock:
+            self._catch_up()
+            stale = self._seen is not None and self._seen != self._seq
+            # _catch_up stops before a torn last line (a crash mid-append; no
+            # one else can be writing while the lock is held). Cut it off, or
+            # the first new event would be glued to it and lost on replay.
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self._offset:
+                os.truncate(self.log_path, self._offset)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                for event in events:
+                    if stale:
+                        event = merge_stale(self.state, event)
+                    self._seq += 1
+                    event = {"seq": self._seq, **event}
+                    f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                    apply_event(self.state, event)
+                    if stale:
+                        self._note_unseen(event, True)
+                f.flush()
+                os.fsync(f.fileno())
+                self._offset = f.buffer.tell()
+            if self._seen is not None and not stale:
+                self._seen = self._seq
+            if self._seq - self._snapshot_seq >= self.snapshot_every:
+                self._compact()
+
+    def _catch_up(self):
+        # Applies the events other processes appended since this one last
+        # looked. A new snapshot means
+        # another process compacted and rotated the log, so the state is
+        # read again from that snapshot.
+        if not self._loaded or file_stamp(self.snapshot_path) != self._snapshot_stamp:
+            if self._loaded:
+                self._unseen = None  # rotated away before this process read them
+            self.state, self._seq = self._read_snapshot()
+            self._snapshot_stamp = file_stamp(self.snapshot_path)
+            self._offset = 0
+            self._loaded = True
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as f:
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # being written, or torn by a crash mid-append
+                    self._offset += len(line)
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if event["seq"] > self._seq:
+                        apply_event(self.state, event)
+                        self._seq = event["seq"]
+                        if self._seen is not None:
+                            self._note_unseen(event, False)
+
+    def _note_unseen(self, event, own):
+        if self._unseen is not None:
+            self._unseen.append((event, own))
+            if len(self._unseen) > MAX_UNSEEN:
+                self._unseen = None
+
+    def _compact(self):
+        atomic_write_json(self.snapshot_path, {
+            "seq": self._seq,
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "state": self.state
+        }, ensure_ascii=False)
+        # Events up to the snapshot are no longer needed for replay
+        if os.path.exists(self.log_path):
+            segment = os.path.join(self.archive_dir, f"journal-{self._snapshot_seq + 1:010d}-{self._seq:010d}.jsonl")
+            os.replace(self.log_path, segment)
+        self._snapshot_seq = self._seq
+        self._snapshot_stamp = file_stamp(self.snapshot_path)
+        self._offset = 0
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._snapshot_seq = snapshot["seq"]
+            # Snapshots from before a state key existed
+            return {**copy.deepcopy(EMPTY_STATE), **snapshot["state"]}, snapshot["seq"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            self._snapshot_seq = 0
+        state = copy.deepcopy(EMPTY_STATE)
+        # First start on top of the old totals-only file: seed the state from it
+        if self.legacy_file and not os.path.exists(self.log_path):
+            try:
+                with open(self.legacy_file, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+                for key in state:
+                    state[key] = legacy.get(key, state[key])
+                # The old file kept no day; without one the first event of
+                # the day would start its totals from zero
+                state["day"] = state["day"] or date.today().isoformat()
+            except (FileNotFoundError, json.JSONDecodeError):
+                return state, 0
+            atomic_write_json(self.snapshot_path, {"seq": 0, "ts": None, "state": state}, ensure_ascii=False)
+        return state, 0
+
@@ -0,0 +1,232 @@
+# Meal log and recipes. Today's food entries are kept per meal with running
+# totals that add, edit and delete adjust by the entry's difference; totals
+# over a whole list of entries (a day loaded from storage) are summed in one
+# pass, with NumPy when it is installed. Recipes are made of catalog foods
+# and other recipes; their nutrition per 100 g is memoized and dropped for
+# every recipe containing an ingredient that changed.
+from collections import namedtuple
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MEALS = ("breakfast", "lunch", "dinner", "snack")
+MEAL_NAMES = {"breakfast": "Завтрак", "lunch": "Обед", "dinner": "Ужин", "snack": "Перекус"}
+NUTRIENTS = ("kcal", "protein", "fat", "carbs")
+
+
+class Nutrition(namedtuple("Nutrition", NUTRIENTS)):
+    __slots__ = ()
+
+    def plus(self, other, sign=1):
+        return Nutrition(self[0] + sign * other[0], self[1] + sign * other[1],
+                         self[2] + sign * other[2], self[3] + sign * other[3])
+
+    def scaled(self, factor):
+        return Nutrition(self[0] * factor, self[1] * factor, self[2] * factor, self[3] * factor)
+
+
+ZERO = Nutrition(0.0, 0.0, 0.0, 0.0)
+
+
+def portion(per_100g, grams):
+    # Same arithmetic as core.food_calories, for every nutrient
+    return Nutrition(*(value * grams / 100 for value in per_100g))
+
+
+def of_food(food):
+    # catalog.Food -> Nutrition per 100 g
+    return Nutrition(food.kcal, food.protein, food.fat, food.carbs)
+
+
+def of_entry(entry):
+    # Entries from before macros were logged count as calories only
+    return Nutrition(*(entry.get(key, 0.0) for key in NUTRIENTS))
+
+
+def meal_at(when=None):
+    # The meal a meal logged at `when` most likely belongs to
+    hour = (when or datetime.now()).hour
+    if 5 <= hour < 11:
+        return "breakfast"
+    if 11 <= hour < 16:
+        return "lunch"
+    if 16 <= hour < 21:
+        return "dinner"
+    return "snack"
+
+
+def meal_totals(entries):
+    # {meal: Nutrition} over any number of entries
+    entries = list(entries)
+    if np is not None and entries:
+        values = np.array([[entry.get(key, 0.0) for key in NUTRIENTS] for entry in entries], dtype=np.float64)
+        meals = np.array([MEALS.index(entry["meal"]) for entry in entries], dtype=np.intp)
+        sums = [np.bincount(meals, weights=values[:, i], minlength=len(MEALS)) for i in range(len(NUTRIENTS))]
+        return {meal: Nutrition(*(float(column[m]) for column in sums)) for m, meal in enumerate(MEALS)}
+    sums = {meal: [0.0, 0.0, 0.0, 0.0] for meal in MEALS}
+    for entry in entries:
+        row = sums[entry["meal"]]
+        row[0] += entry.get("kcal", 0.0)
+        row[1] += entry.get("protein", 0.0)
+        row[2] += entry.get("fat", 0.0)
+        row[3] += entry.get("carbs", 0.0)
+    return {meal: Nutrition(*row) for meal, row in sums.items()}
+
+
+# ---------------------------- Meal log ----------------------------
+class MealLog:
+    # Today's entries, in the order they were logged. The list given to
+    # reset() is kept and changed in place (it is the tracker state's
+    # "meals"); `by_id` finds an entry without scanning it.
+    def __init__(self, entries=None):
+        self.reset([] if entries is None else entries)
+
+    def reset(self, entries):
+        self.entries = entries
+        self.by_id = {entry["id"]: entry for entry in entries}
+        self._meals = meal_totals(entries)
+        self._total = Nutrition(*map(sum, zip(*self._meals.values())))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, entry_id):
+        return self.by_id[entry_id]
+
+    def meal(self, meal):
+        return [entry for entry in self.entries if entry["meal"] == meal]
+
+    def totals(self, meal=None):
+        return self._total if meal is None else self._meals[meal]
+
+    def add(self, entry):
+        self.entries.append(entry)
+        self.by_id[entry["id"]] = entry
+        self._shift(entry["meal"], of_entry(entry))
+
+    def update(self, entry_id, **changes):
+        # Returns the entry as it was before
+        entry = self.by_id[entry_id]
+        old = dict(entry)
+        self._shift(old["meal"], of_entry(old), -1)
+        entry.update(changes)
+        self._shift(entry["meal"], of_entry(entry))
+        return old
+
+    def remove(self, entry_id):
+        entry = self.by_id.pop(entry_id)
+        self.entries.remove(entry)
+        self._shift(entry["meal"], of_entry(entry), -1)
+        return entry
+
+    def _shift(self, meal, nutrition, sign=1):
+        self._meals[meal] = self._meals[meal].plus(nutrition, sign)
+        self._total = self._total.plus(nutrition, sign)
+
+
+# ---------------------------- Recipes ----------------------------
+class RecipeBook:
+    # A user's recipes: name -> {"ingredients": [{"name", "grams", "recipe"}],
+    # "yield": cooked weight in g, or None for the sum of the ingredients}.
+    # An ingredient is a catalog food, or another recipe when "recipe" is
+    # true. per_100g() is computed once per recipe; define() and
+    # invalidate() drop it for the recipe and everything that contains it.
+    def __init__(self, catalog, recipes=None):
+        self.catalog = catalog
+        self.reset({} if recipes is None else recipes)
+
+    def reset(self, recipes):
+        self.recipes = recipes
+        self._memo = {}
+        self._used_in = {}  # (is recipe, name) -> recipes with it as an ingredient
+        for name, recipe in recipes.items():
+            self._link(name, recipe)
+
+    def __contains__(self, name):
+        return name in self.recipes
+
+    def names(self, query=""):
+        query = query.strip().casefold()
+        return sorted(name for name in self.recipes if query in name.casefold())
+
+    def define(self, name, ingredients, yield_grams=None):
+        # `ingredients` is [(name, grams, is recipe)]; adds the recipe or
+        # replaces the one with that name and returns it
+        name = name.strip()
+        if not name or not ingredients:
+            raise ValueError("Recipe needs a name and at least one ingredient")
+        if yield_grams is not None and yield_grams <= 0:
+            raise ValueError("Recipe yield must be positive")
+        parts = []
+        for part, grams, is_recipe in ingredients:
+            if grams <= 0:
+                raise ValueError(f"{part}: amount must be positive")
+            if is_recipe:
+                if part not in self.recipes:
+                    raise ValueError(f"Unknown recipe: {part}")
+                if part == name or name in self._contained(part):
+                    raise ValueError(f"{part} already contains {name}")
+            elif self.catalog.find(part) is None:
+                raise ValueError(f"Unknown food: {part}")
+            parts.append({"name": part, "grams": grams, "recipe": bool(is_recipe)})
+        recipe = {"ingredients": parts, "yield": yield_grams}
+        old = self.recipes.get(name)
+        if old is not None:
+            self._unlink(name, old)
+        self.recipes[name] = recipe
+        self._link(name, recipe)
+        self.invalidate(name)
+        return recipe
+
+    def invalidate(self, name, recipe=True):
+        # After recipe `name` (or catalog food `name`, with recipe=False) changed
+        key = (recipe, name)
+        stack = [key]
+        while stack:
+            key = stack.pop()
+            if key[0]:
+                self._memo.pop(key[1], None)
+            stack.extend((True, parent) for parent in self._used_in.get(key, ()))
+
+    def per_100g(self, name):
+        value = self._memo.get(name)
+        if value is None:
+            recipe = self.recipes[name]
+            total = ZERO
+            for part in recipe["ingredients"]:
+                if part["recipe"]:
+                    per_100g = self.per_100g(part["name"])
+                else:
+                    index = self.catalog.find(part["name"])
+                    if index is None:
+                        continue  # dropped from the catalog since
+                    per_100g = of_food(self.catalog.get(index))
+                total = total.plus(portion(per_100g, part["grams"]))
+            weight = recipe["yield"] or sum(part["grams"] for part in recipe["ingredients"])
+            value = self._memo[name] = total.scaled(100 / weight)
+        return value
+
+    def portion(self, name, grams):
+        return portion(self.per_100g(name), grams)
+
+    def _contained(self, name):
+        # Recipes inside recipe `name`, at any depth
+        found = set()
+        stack = [name]
+        while stack:
+            for part in self.recipes[stack.pop()]["ingredients"]:
+                if part["recipe"] and part["name"] not in found:
+                    found.add(part["name"])
+                    stack.append(part["name"])
+        return found
+
+    def _link(self, name, recipe):
+        for part in recipe["ingredients"]:
+            self._used_in.setdefault((part["recipe"], part["name"]), set()).add(name)
+
+    def _unlink(self, name, recipe):
+        for part in recipe["ingredients"]:
+            self._used_in.get((part["recipe"], part["name"]), set()).discard(name)
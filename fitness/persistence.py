@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+
+def file_stamp(path):
+    # Identity, mtime and size of a file (None if it does not exist); a
+    # change means another process wrote or replaced it
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    # Write to a temp file next to the target and rename it over, so a crash
+    # mid-write never leaves a truncated file behind.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _replace(pending, item):
+    return item
+
+
+class WriteBehindWriter:
+    # Coalesces changes made on the UI thread and hands them to `write_func`
+    # from a background thread once nothing new arrived for `delay` seconds.
+    # `max_delay` caps how long a continuous stream of changes (e.g. a slider
+    # drag) can postpone the write. `merge(pending, item)` folds a new item
+    # into the pending payload; by default the newest item wins. flush()
+    # writes on the calling thread; flush_later() has the background thread
+    # write right away, for callers (the Tk loop) that must not wait.
+    def __init__(self, write_func, delay=0.5, max_delay=5.0, merge=_replace):
+        self._write_func = write_func
+        self._delay = delay
+        self._max_delay = max_delay
+        self._merge = merge
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = None
+        self._first_change = None
+        self._last_change = None
+        self._flushes = []  # Futures of flush_later() calls not written yet
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self, item):
+        with self._cond:
+            now = time.monotonic()
+            self._pending = self._merge(self._pending, item)
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._cond.notify()
+
+    def flush(self):
+        # Write whatever is pending right now, on the calling thread.
+        with self._write_lock:
+            payload = self._take()
+            if payload is not None:
+                self._write_func(payload)
+
+    def flush_later(self):
+        # Returns a concurrent.futures.Future that completes (with None, or
+        # the write's exception) once everything pending now is written
+        future = Future()
+        with self._cond:
+            self._flushes.append(future)
+            self._cond.notify()
+        return future
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._write(self._take_flushes())
+
+    def _take_flushes(self):
+        with self._cond:
+            flushes, self._flushes = self._flushes, []
+            return flushes
+
+    def _write(self, flushes):
+        # flush(), then completes the given flush_later() futures
+        try:
+            self.flush()
+        except Exception as exc:
+            for future in flushes:
+                future.set_exception(exc)
+            raise
+        for future in flushes:
+            future.set_result(None)
+
+    def _take(self):
+        with self._cond:
+            payload = self._pending
+            self._pending = None
+            self._first_change = None
+            self._last_change = None
+            return payload
+
+    def _due_in(self):
+        now = time.monotonic()
+        quiet = self._last_change + self._delay - now
+        capped = self._first_change + self._max_delay - now
+        return min(quiet, capped)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not self._flushes:
+                    if self._pending is None:
+                        self._cond.wait()
+                        continue
+                    wait = self._due_in()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._closed:
+                    return
+            try:
+                self._write(self._take_flushes())
+            except Exception:
+                traceback.print_exc()
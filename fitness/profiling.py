@@ -0,0 +1,182 @@
+# Opt-in instrumentation for the window (FITNESS_PROFILE=1). Every Python
+# callback Tk dispatches (button commands, bindings, after jobs) is timed,
+# a heartbeat measures how late the event loop runs timers, and the number
+# of live widgets and pending after jobs is sampled. Rolling percentiles are
+# shown in a small overlay (F12 toggles it) and written to a JSON profile on
+# exit or with F10.
+import functools
+import json
+import os
+import time
+import tkinter as tk
+from collections import deque
+from datetime import datetime
+
+PROFILE_ENV = "FITNESS_PROFILE"
+PROFILE_FILE_ENV = "FITNESS_PROFILE_FILE"
+LAG = "event loop lag"
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+class Profiler:
+    # Last `window` durations (seconds) per label, plus totals
+    def __init__(self, window=1000):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+        self.gauges = {}
+        self.started = time.time()
+
+    def record(self, label, seconds):
+        samples = self.samples.get(label)
+        if samples is None:
+            samples = self.samples[label] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self.counts[label] = self.counts.get(label, 0) + 1
+
+    def gauge(self, name, value):
+        self.gauges[name] = value
+
+    def stats(self, label):
+        values = self.samples[label]
+        ms = lambda seconds: round(seconds * 1000, 3)
+        return {"count": self.counts[label], "p50_ms": ms(percentile(values, 0.5)),
+                "p95_ms": ms(percentile(values, 0.95)), "p99_ms": ms(percentile(values, 0.99)),
+                "max_ms": ms(max(values))}
+
+    def snapshot(self):
+        return {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "uptime_s": round(time.time() - self.started, 1),
+            "gauges": dict(self.gauges),
+            "callbacks": {label: self.stats(label) for label in self.samples},
+        }
+
+    def slowest(self, n=8):
+        stats = [(label, self.stats(label)) for label in self.samples if label != LAG]
+        return sorted(stats, key=lambda item: item[1]["p95_ms"], reverse=True)[:n]
+
+    def dump(self, path=None):
+        path = path or os.environ.get(PROFILE_FILE_ENV) or f"profile-{datetime.now():%Y%m%d-%H%M%S}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+        return path
+
+
+# ---------------------------- Tk hooks ----------------------------
+def _label(func):
+    # Widgets with a `command` (CTkButton, CTkSlider...) dispatch it from
+    # their own click handler; name the command instead of the handler
+    owner = getattr(func, "__self__", None)
+    command = getattr(owner, "_command", None)
+    if callable(command):
+        func = command
+    return getattr(func, "__qualname__", None) or repr(func)
+
+
+def _timed(profiler, label, func):
+    @functools.wraps(func)
+    def timed(*args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            profiler.record(label, time.perf_counter() - started)
+
+    return timed
+
+
+def instrument(profiler):
+    # Patches tkinter so every callback registered from now on is timed.
+    # after() jobs are labelled by the scheduled function; the generic
+    # wrapper tkinter puts around them is left alone so they are not counted
+    # twice.
+    register, after = tk.Misc._register, tk.Misc.after
+
+    def timed_register(self, func, subst=None, needcleanup=1):
+        if not getattr(func, "__qualname__", "").endswith("after.<locals>.callit"):
+            func = _timed(profiler, _label(func), func)
+        return register(self, func, subst, needcleanup)
+
+    def timed_after(self, ms, func=None, *args):
+        if func is None:
+            return after(self, ms)
+        return after(self, ms, _timed(profiler, f"after: {_label(func)}", func), *args)
+
+    tk.Misc._register = timed_register
+    tk.Misc.after = timed_after
+    return after
+
+
+class Monitor:
+    # Heartbeat plus widget/after-job gauges and the overlay, on `root`
+    def __init__(self, root, profiler, interval=100, sample_every=10):
+        self.root = root
+        self.profiler = profiler
+        self.interval = interval
+        self.sample_every = sample_every
+        self._after = tk.Misc.after
+        self._beats = 0
+        self._expected = None
+        self.overlay = tk.Label(root, justify="left", anchor="nw", font=("Consolas", 9),
+                                bg="#000000", fg="#7CFC00", padx=6, pady=4)
+        self.visible = True
+        root.bind_all("<F12>", lambda e: self.toggle(), add="+")
+        root.bind_all("<F10>", lambda e: self.profiler.dump(), add="+")
+
+    def start(self, after=None):
+        # `after` is the unpatched Misc.after, so the heartbeat does not
+        # time itself
+        self._after = after or self._after
+        self._expected = time.perf_counter() + self.interval / 1000
+        self._after(self.root, self.interval, self._beat)
+        return self
+
+    def _beat(self):
+        now = time.perf_counter()
+        self.profiler.record(LAG, max(now - self._expected, 0.0))
+        self._beats += 1
+        if self._beats % self.sample_every == 0:
+            self.profiler.gauge("widgets", _count_widgets(self.root))
+            self.profiler.gauge("after_jobs", len(self.root.tk.splitlist(self.root.tk.call("after", "info"))))
+            if self.visible:
+                self._update_overlay()
+        self._expected = time.perf_counter() + self.interval / 1000
+        self._after(self.root, self.interval, self._beat)
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self._update_overlay()
+        else:
+            self.overlay.place_forget()
+
+    def _update_overlay(self):
+        p = self.profiler
+        lines = [f"widgets {p.gauges.get('widgets', 0)}  after jobs {p.gauges.get('after_jobs', 0)}"]
+        if LAG in p.samples:
+            lag = p.stats(LAG)
+            lines.append(f"loop lag p50 {lag['p50_ms']:.1f}  p95 {lag['p95_ms']:.1f}  max {lag['max_ms']:.1f} ms")
+        for label, stats in p.slowest():
+            lines.append(f"{stats['p95_ms']:7.1f} ms p95  x{stats['count']:<5} {label[-48:]}")
+        self.overlay.configure(text="\n".join(lines))
+        self.overlay.place(relx=1.0, rely=1.0, anchor="se")
+        self.overlay.lift()
+
+
+def _count_widgets(widget):
+    return 1 + sum(_count_widgets(child) for child in widget.winfo_children())
+
+
+def enable(root):
+    # Returns the Profiler, or None unless FITNESS_PROFILE is set
+    if not os.environ.get(PROFILE_ENV):
+        return None
+    profiler = Profiler()
+    original_after = instrument(profiler)
+    Monitor(root, profiler).start(original_after)
+    return profiler
@@ -0,0 +1,115 @@
+import functools
+
+
+class Screen:
+    # A built screen: one container widget holding everything on it, the
+    # `after` jobs it scheduled, its state subscriptions and the hooks that
+    # refresh it for new state or quiet it down when it goes away.
+    def __init__(self, root, key, container):
+        self.root = root
+        self.key = key
+        self.container = container
+        self._timers = set()
+        self._rebind_hooks = []
+        self._hide_hooks = []
+        self._subscriptions = []
+
+    def after(self, ms, func, *args):
+        @functools.wraps(func)
+        def fire():
+            self._timers.discard(job)
+            func(*args)
+
+        job = self.root.after(ms, fire)
+        self._timers.add(job)
+        return job
+
+    def after_cancel(self, job):
+        self._timers.discard(job)
+        self.root.after_cancel(job)
+
+    def cancel_timers(self):
+        for job in self._timers:
+            self.root.after_cancel(job)
+        self._timers.clear()
+
+    @property
+    def timer_count(self):
+        return len(self._timers)
+
+    def subscribe(self, store, key, callback):
+        # Dropped together with the screen's widgets
+        self._subscriptions.append(store.subscribe(key, callback))
+
+    def unsubscribe_all(self):
+        for unsubscribe in self._subscriptions:
+            unsubscribe()
+        self._subscriptions.clear()
+
+    def on_rebind(self, func):
+        self._rebind_hooks.append(func)
+
+    def rebind(self):
+        for func in self._rebind_hooks:
+            func()
+
+    def on_hide(self, func):
+        # Also run when the screen is destroyed
+        self._hide_hooks.append(func)
+
+    def hide(self):
+        for func in self._hide_hooks:
+            func()
+        self.cancel_timers()
+
+
+class ScreenManager:
+    # Switches between screens by hiding them instead of destroying them.
+    # Screens are cached by key; at most one screen per kind (key[0]) is
+    # kept, so e.g. ("main", "alice") is reused when alice logs in again and
+    # replaced when somebody else does. Hiding a screen cancels all of its
+    # `after` jobs, so repeated switching never accumulates callbacks.
+    def __init__(self, root, make_container):
+        self.root = root
+        self._make_container = make_container
+        self._screens = {}
+        self.current = None
+
+    def show(self, key, build):
+        if self.current is not None and self.current.key != key:
+            self._hide(self.current)
+
+        screen = self._screens.get(key)
+        if screen is None:
+            for other in [s for k, s in self._screens.items() if k[0] == key[0]]:
+                self._destroy(other)
+            screen = Screen(self.root, key, self._make_container())
+            self._screens[key] = screen
+            self.current = screen
+            build(screen)
+        else:
+            self.current = screen
+            screen.rebind()
+
+        screen.container.place(relx=0, rely=0, relwidth=1, relheight=1)
+        return screen
+
+    def timer_count(self):
+        return sum(screen.timer_count for screen in self._screens.values())
+
+    def clear(self):
+        for screen in list(self._screens.values()):
+            self._destroy(screen)
+        self.current = None
+
+    def _hide(self, screen):
+        screen.hide()
+        screen.container.place_forget()
+
+    def _destroy(self, screen):
+        screen.hide()
+        screen.unsubscribe_all()
+        screen.container.destroy()
+        del self._screens[screen.key]
+        if self.current is screen:
+            self.current = None
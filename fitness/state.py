@@ -0,0 +1,130 @@
+# Reactive application state. Plain values are set by the UI, derived values
+# are computed from them on demand and memoized, and subscribers are told
+# about changes in batches: set() only marks keys dirty and asks `schedule`
+# (the GUI passes after_idle) to run flush() once, so any number of changes
+# in one event-loop turn cost one widget update per affected key.
+from datetime import date
+
+from fitness.core import bmi, bmi_advice
+from fitness.meals import MEAL_NAMES, MEALS
+
+_MISSING = object()
+
+
+class Store:
+    def __init__(self, schedule=None, **values):
+        self._schedule = schedule
+        self._values = dict(values)
+        self._derived = {}
+        self._dependents = {}
+        self._cache = {}
+        self._notified = {}
+        self._subscribers = {}
+        self._dirty = set()
+        self._scheduled = False
+
+    # ---------------------------- Values ----------------------------
+    def get(self, key):
+        if key in self._derived:
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING:
+                inputs, func = self._derived[key]
+                value = self._cache[key] = func(*[self.get(name) for name in inputs])
+            return value
+        return self._values[key]
+
+    __getitem__ = get
+
+    def set(self, key, value):
+        if self._values.get(key, _MISSING) == value:
+            return
+        self._values[key] = value
+        self._changed(key)
+
+    def update(self, **values):
+        for key, value in values.items():
+            self.set(key, value)
+
+    def touch(self, key):
+        # For values changed in place, such as the goals list
+        self._changed(key)
+
+    def derive(self, key, inputs, func):
+        # `key` is func(*inputs), recomputed only after one of them changes
+        self._derived[key] = (tuple(inputs), func)
+        for name in inputs:
+            self._dependents.setdefault(name, set()).add(key)
+
+    def _changed(self, key):
+        self._dirty.add(key)
+        for name in self._dependents.get(key, ()):
+            self._cache.pop(name, None)
+            self._changed(name)
+        if self._schedule is not None and not self._scheduled:
+            self._scheduled = True
+            self._schedule(self.flush)
+
+    # ---------------------------- Notifications ----------------------------
+    def subscribe(self, key, callback):
+        # Calls callback(value) now and after every change of `key`; returns
+        # a function that removes the subscription
+        self._subscribers.setdefault(key, []).append(callback)
+        value = self.get(key)
+        if key in self._derived:
+            self._notified[key] = value
+        callback(value)
+
+        def unsubscribe():
+            callbacks = self._subscribers.get(key, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+        return unsubscribe
+
+    def flush(self):
+        self._scheduled = False
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            callbacks = self._subscribers.get(key)
+            if not callbacks:
+                continue
+            value = self.get(key)
+            if key in self._derived:
+                # Derived values often come out the same (e.g. the goal count
+                # text after an unrelated change); skip those widgets
+                if self._notified.get(key, _MISSING) == value:
+                    continue
+                self._notified[key] = value
+            for callback in list(callbacks):
+                callback(value)
+
+
+# ---------------------------- App state ----------------------------
+def _meal_text(log):
+    if log is None:
+        return ""
+    total = log.totals()
+    return (" · ".join(f"{MEAL_NAMES[meal]}: {log.totals(meal).kcal:.0f}" for meal in MEALS)
+            + f"\nБ {total.protein:.0f} г · Ж {total.fat:.0f} г · У {total.carbs:.0f} г")
+
+
+def app_store(water_goal, schedule=None):
+    # `meals` is the tracker's MealLog, changed in place (touch() it)
+    store = Store(schedule, day=None, water_goal=water_goal, water_intake=0.0, total_calories=0.0, steps=0.0,
+                  goals=[], goal_progress=(), weight=None, height=None, sleep=None, meals=None)
+    store.derive("day_text", ("day",), lambda day: date.fromisoformat(day).strftime("%d.%m.%Y") if day else "")
+    store.derive("water_text", ("water_intake", "water_goal"), lambda w, goal: f"{w:.2f} / {goal:.1f} л")
+    store.derive("water_progress", ("water_intake", "water_goal"), lambda w, goal: min(w / goal, 1.0) if goal else 0.0)
+    store.derive("meal_text", ("meals",), _meal_text)
+    store.derive("goal_count", ("goals",), len)
+    store.derive("goals_done", ("goal_progress",), lambda progress: sum(p.done for p in progress))
+    store.derive("goals_text", ("goal_count", "goals_done"), lambda n, done: f"Активных целей: {n} · выполнено: {done}")
+    store.derive("goal_lines", ("goal_progress",), lambda progress: "\n".join(
+        f"{p.desc}: {p.fraction:.0%} ({p.text})" if p.fraction is not None else f"{p.desc}: {p.text}"
+        for p in progress))
+    store.derive("weight_text", ("weight",),
+                 lambda w: f"{w} кг" if w is not None else "Введите вес во вкладке 'Weight'")
+    store.derive("bmi", ("weight", "height"), lambda w, h: bmi(w, h) if w and h else None)
+    store.derive("bmi_text", ("bmi",), lambda value: f"Ваш ИМТ: {value:.1f}" if value is not None else "")
+    store.derive("bmi_advice", ("bmi",), lambda value: bmi_advice(value) if value is not None else "")
+    return store
@@ -0,0 +1,666 @@
+import copy
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from urllib.parse import quote
+
+from fitness.auth import verify_password
+from fitness.credentials import CredentialIndex
+from fitness.journal import DAY_TOTALS, EMPTY_STATE, EventJournal, apply_meal_event, merge_stale
+from fitness.persistence import atomic_write_json
+
+USER_FILE = "users.json"
+USER_DATA_FILE = "user_data.json"
+JOURNAL_DIR = "journal"
+USERS_DIR = "users"
+DB_FILE = "fitness.db"
+USER_CACHE = 1024  # users whose id and sync position SQLiteStorage keeps
+
+
+# ---------------------------- Backend interface ----------------------------
+class Storage:
+    # Everything the app persists goes through these calls, keyed by username.
+    # `password` is what gets stored: a hash from fitness.auth, or plaintext
+    # in accounts created before hashing
+    def save_user(self, username, password):
+        raise NotImplementedError
+
+    def create_user(self, username, password):
+        # Adds a new account; False (and nothing changed) if the username is
+        # already taken
+        raise NotImplementedError
+
+    def password_record(self, username):
+        # The stored password, or None for an unknown user
+        raise NotImplementedError
+
+    def verify_user(self, username, password):
+        # Runs the key derivation on the calling thread; the UI goes through
+        # auth.Authenticator instead
+        stored = self.password_record(username)
+        return stored is not None and verify_password(password, stored)
+
+    def load_state(self, username):
+        # The user's current state; what it contains counts as seen by this
+        # process (see stale())
+        raise NotImplementedError
+
+    def stale(self, username):
+        # True when another process (a second app window, a script) changed
+        # the user's data after this one last loaded it
+        raise NotImplementedError
+
+    def changes(self, username):
+        # The user's events stored since this process last loaded the state
+        # or asked, as (event, own) pairs with `own` true for this process's
+        # events (as they were stored, i.e. merged onto the others'); [] when
+        # there are none. None when they cannot be listed, e.g. after a batch
+        # rewrote the data, and the state must be loaded again. Counts as
+        # seen, like load_state().
+        raise NotImplementedError
+
+    def watch_paths(self, username):
+        # Files that change whenever the user's data does, for watcher.ChangeWatcher
+        raise NotImplementedError
+
+    def usernames(self, after=""):
+        # Every account sorted by name (those after `after` only); iterated
+        # lazily where the backend allows
+        raise NotImplementedError
+
+    def goals(self, username):
+        # Read-only view for exports, which visit every account once
+        return self.load_state(username)["goals"]
+
+    def append_events(self, username, events):
+        # Events from a writer whose state was stale are merged onto the
+        # current one (journal.merge_stale) instead of overwriting it
+        raise NotImplementedError
+
+    def imported_ranges(self, username):
+        raise NotImplementedError
+
+    def add_imported_ranges(self, username, ranges):
+        # [(start, end)] in wall-clock seconds, see importer.DailyAggregator
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def close_thread(self):
+        # Releases what the calling thread holds, for worker threads that end
+        # while the storage stays open
+        pass
+
+
+# ---------------------------- JSON files ----------------------------
+class JsonStorage(Storage):
+    # users.json for accounts and one event journal directory per user under users/
+    def __init__(self, data_dir="data"):
+        self.data_dir = data_dir
+        self.user_file = os.path.join(data_dir, USER_FILE)
+        self.credentials = CredentialIndex(self.user_file)
+        self._journals = {}
+        self._lock = threading.Lock()
+        os.makedirs(data_dir, exist_ok=True)
+
+    def save_user(self, username, password):
+        self.credentials.put(username, {"password": password})
+
+    def create_user(self, username, password):
+        return self.credentials.add(username, {"password": password})
+
+    def password_record(self, username):
+        record = self.credentials.get(username)
+        return record["password"] if record is not None else None
+
+    def _journal(self, username):
+        with self._lock:
+            journal = self._journals.get(username)
+            if journal is None:
+                directory = os.path.join(self.data_dir, USERS_DIR, quote(username, safe=""))
+                journal = self._journals[username] = EventJournal(directory)
+                journal.load()
+            return journal
+
+    def load_state(self, username):
+        return self._journal(username).load()
+
+    def usernames(self, after=""):
+        yield from sorted(name for name in self.credentials.snapshot() if name > after)
+
+    def goals(self, username):
+        # Accounts the app has not opened are read without caching their
+        # journal, so an export of every account does not keep them all
+        if username in self._journals:
+            return self.load_state(username)["goals"]
+        directory = os.path.join(self.data_dir, USERS_DIR, quote(username, safe=""))
+        if not os.path.isdir(directory):
+            return []
+        return EventJournal(directory).load()["goals"]
+
+    def stale(self, username):
+        return self._journal(username).stale()
+
+    def changes(self, username):
+        return self._journal(username).changes()
+
+    def watch_paths(self, username):
+        journal = self._journal(username)
+        return [journal.log_path, journal.snapshot_path]
+
+    def append_events(self, username, events):
+        self._journal(username).append(events)
+
+    def _user_file(self, username, name):
+        directory = os.path.join(self.data_dir, USERS_DIR, quote(username, safe=""))
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, name)
+
+    def _read_json(self, path, default):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return default
+
+    def imported_ranges(self, username):
+        return [tuple(r) for r in self._read_json(self._user_file(username, "imports.json"), [])]
+
+    def add_imported_ranges(self, username, ranges):
+        path = self._user_file(username, "imports.json")
+        with self._lock:
+            stored = self._read_json(path, [])
+            stored.extend([start, end] for start, end in ranges)
+            atomic_write_json(path, stored)
+
+
+# ---------------------------- SQLite ----------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (user_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    description TEXT NOT NULL,
+    value REAL NOT NULL,
+    period TEXT NOT NULL,
+    advice TEXT NOT NULL,
+    start TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS goals_user ON goals(user_id);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    ts TEXT NOT NULL,
+    type TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_user_ts ON events(user_id, ts);
+CREATE TABLE IF NOT EXISTS imports (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    start REAL NOT NULL,
+    end REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS imports_user ON imports(user_id);
+CREATE TABLE IF NOT EXISTS recipes (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    name TEXT NOT NULL,
+    recipe TEXT NOT NULL,
+    PRIMARY KEY (user_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS summaries (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+    computed TEXT NOT NULL,
+    bmi REAL,
+    bmi_band TEXT,
+    goals_total INTEGER NOT NULL,
+    goals_done INTEGER NOT NULL
+);
+"""
+
+# Statements are kept as constants so sqlite3's statement cache reuses the
+# compiled form on every call
+SQL_UPSERT_USER = ("INSERT INTO users (username, password) VALUES (?, ?) "
+                   "ON CONFLICT(username) DO UPDATE SET password = excluded.password")
+SQL_ADD_USER = "INSERT INTO users (username, password) VALUES (?, ?) ON CONFLICT(username) DO NOTHING"
+SQL_USER = "SELECT id, password FROM users WHERE username = ?"
+SQL_METRICS = "SELECT name, value FROM metrics WHERE user_id = ?"
+SQL_DAY = "SELECT value FROM metrics WHERE user_id = ? AND name = 'day'"
+SQL_VERSION = "SELECT value FROM metrics WHERE user_id = ? AND name = 'version'"
+SQL_WATER = "SELECT value FROM metrics WHERE user_id = ? AND name = 'water_intake'"
+SQL_GOALS = "SELECT description, value, period, advice, start FROM goals WHERE user_id = ? ORDER BY id"
+SQL_USERNAMES = "SELECT username FROM users WHERE username > ? ORDER BY username"
+SQL_USER_GOALS = ("SELECT description, value, period, advice, start FROM goals "
+                  "JOIN users ON users.id = goals.user_id WHERE users.username = ? ORDER BY goals.id")
+SQL_ADD_METRIC = ("INSERT INTO metrics (user_id, name, value) VALUES (?, ?, ?) "
+                  "ON CONFLICT(user_id, name) DO UPDATE SET value = value + excluded.value")
+SQL_SET_METRIC = ("INSERT INTO metrics (user_id, name, value) VALUES (?, ?, ?) "
+                  "ON CONFLICT(user_id, name) DO UPDATE SET value = excluded.value")
+SQL_ADD_GOAL = ("INSERT INTO goals (user_id, description, value, period, advice, start) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+SQL_GOAL_ROWS = "SELECT id, description, value, period, advice, start FROM goals WHERE user_id = ? ORDER BY id"
+SQL_SET_ADVICE = "UPDATE goals SET advice = ? WHERE id = ?"
+SQL_SHIFT_METRIC = "UPDATE metrics SET value = value + ? WHERE user_id = ? AND name = ?"
+SQL_SET_PAYLOAD = "UPDATE events SET payload = ? WHERE id = ?"
+SQL_UPSERT_SUMMARY = ("INSERT INTO summaries (user_id, computed, bmi, bmi_band, goals_total, goals_done) "
+                      "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(user_id) DO UPDATE SET computed = excluded.computed, "
+                      "bmi = excluded.bmi, bmi_band = excluded.bmi_band, goals_total = excluded.goals_total, "
+                      "goals_done = excluded.goals_done")
+SQL_FOOD_EVENTS = ("SELECT id, payload FROM events WHERE user_id = ? AND type IN ('food', 'food_edit', 'food_delete') "
+                   "ORDER BY id")
+SQL_MEAL_EVENTS = ("SELECT payload FROM events WHERE user_id = ? AND ts >= ? "
+                   "AND type IN ('food', 'food_edit', 'food_delete') ORDER BY id")
+SQL_RECIPES = "SELECT name, recipe FROM recipes WHERE user_id = ?"
+SQL_UPSERT_RECIPE = ("INSERT INTO recipes (user_id, name, recipe) VALUES (?, ?, ?) "
+                     "ON CONFLICT(user_id, name) DO UPDATE SET recipe = excluded.recipe")
+SQL_ADD_EVENT = "INSERT INTO events (user_id, ts, type, payload) VALUES (?, ?, ?, ?)"
+SQL_LAST_EVENT = "SELECT last_insert_rowid()"
+# Walks the rowids after the last seen one; `+user_id` keeps the planner off
+# events_user_ts, which would visit every event of the user
+SQL_EVENTS_AFTER = "SELECT id, payload FROM events WHERE id > ? AND +user_id = ? ORDER BY id"
+SQL_IMPORTS = "SELECT start, end FROM imports WHERE user_id = ? ORDER BY start"
+SQL_ADD_IMPORT = "INSERT INTO imports (user_id, start, end) VALUES (?, ?, ?)"
+
+
+class SQLiteStorage(Storage):
+    # One database for all accounts. Today's totals live in `metrics`, goals in
+    # `goals` and every change is also kept in `events`. Each thread gets its
+    # own connection; WAL lets the UI thread read while the writer commits.
+    # Other processes may share the database: each user has a `version` in
+    # `metrics` that every append bumps by the number of events and a
+    # `last_event` (the id of the newest event). `_seen` and `_last_event`
+    # hold the values this process last saw, and `_own` the id ranges it
+    # appended itself since. They and the user id cache keep the USER_CACHE
+    # most recently used users; a user dropped from them is loaded again
+    # (changes() returns None) on its next sync.
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._user_ids = OrderedDict()
+        self._seen = OrderedDict()
+        self._last_event = {}
+        self._own = {}
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Databases from before goals had a start date
+            if "start" not in {row[1] for row in conn.execute("PRAGMA table_info(goals)")}:
+                conn.execute("ALTER TABLE goals ADD COLUMN start TEXT NOT NULL DEFAULT ''")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread is off only so close() can close every thread's
+            # connection; each one is otherwise used by its own thread alone
+            conn = sqlite3.connect(self.path, timeout=10, cached_statements=64, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+
+    def _user_id(self, conn, username):
+        with self._lock:
+            user_id = self._user_ids.get(username)
+            if user_id is not None:
+                self._user_ids.move_to_end(username)
+                return user_id
+        row = conn.execute(SQL_USER, (username,)).fetchone()
+        if row is None:
+            raise KeyError(username)
+        with self._lock:
+            self._user_ids[username] = row[0]
+            if len(self._user_ids) > USER_CACHE:
+                self._user_ids.popitem(last=False)
+        return row[0]
+
+    def _saw(self, username, version, last_event, keep_own=False):
+        # Records the version and last event id this process has caught up to
+        with self._lock:
+            self._seen[username] = version
+            self._seen.move_to_end(username)
+            self._last_event[username] = last_event
+            if not keep_own:
+                self._own.pop(username, None)
+            while len(self._seen) > USER_CACHE:
+                oldest, _ = self._seen.popitem(last=False)
+                self._last_event.pop(oldest, None)
+                self._own.pop(oldest, None)
+
+    def save_user(self, username, password):
+        with self._connect() as conn:
+            conn.execute(SQL_UPSERT_USER, (username, password))
+
+    def create_user(self, username, password):
+        with self._connect() as conn:
+            return conn.execute(SQL_ADD_USER, (username, password)).rowcount == 1
+
+    def password_record(self, username):
+        row = self._connect().execute(SQL_USER, (username,)).fetchone()
+        return row[1] if row is not None else None
+
+    def load_state(self, username):
+        conn = self._connect()
+        state = copy.deepcopy(EMPTY_STATE)
+        try:
+            user_id = self._user_id(conn, username)
+        except KeyError:
+            return state
+        for name, value in conn.execute(SQL_METRICS, (user_id,)):
+            state[name] = value
+        self._saw(username, state.pop("version", 0), int(state.pop("last_event", 0)))
+        if state["day"] is not None:
+            state["day"] = date.fromordinal(int(state["day"])).isoformat()
+        state["goals"] = [{"desc": d, "value": v, "period": p, "advice": a, "start": start}
+                          for d, v, p, a, start in conn.execute(SQL_GOALS, (user_id,))]
+        # Today's meal log is replayed from today's events (events_user_ts)
+        if state["day"] is not None:
+            for (payload,) in conn.execute(SQL_MEAL_EVENTS, (user_id, state["day"])):
+                apply_meal_event(state["meals"], json.loads(payload))
+        state["recipes"] = {name: json.loads(recipe) for name, recipe in conn.execute(SQL_RECIPES, (user_id,))}
+        return state
+
+    def usernames(self, after=""):
+        # Streams off the cursor (the username index), not a fetched list
+        for (username,) in self._connect().execute(SQL_USERNAMES, (after,)):
+            yield username
+
+    def goals(self, username):
+        # By name, bypassing the user id cache that would grow with every account
+        return [{"desc": d, "value": v, "period": p, "advice": a, "start": start}
+                for d, v, p, a, start in self._connect().execute(SQL_USER_GOALS, (username,))]
+
+    def stale(self, username):
+        conn = self._connect()
+        row = conn.execute(SQL_VERSION, (self._user_id(conn, username),)).fetchone()
+        seen = self._seen.get(username)
+        return seen is not None and (row[0] if row else 0) != seen
+
+    def changes(self, username):
+        conn = self._connect()
+        user_id = self._user_id(conn, username)
+        seen, after = self._seen.get(username), self._last_event.get(username, 0)
+        with conn:
+            # One read transaction, so the version matches the events read
+            conn.execute("BEGIN")
+            row = conn.execute(SQL_VERSION, (user_id,)).fetchone()
+            version = row[0] if row else 0
+            if version == seen:
+                return []
+            rows = conn.execute(SQL_EVENTS_AFTER, (after, user_id)).fetchall() if seen is not None and after else []
+        with self._lock:
+            own = self._own.pop(username, [])
+        # Anything but appended events (a batch rewrite, a database from
+        # before `last_event`) moves the version without adding events
+        if seen is None or not after or seen + len(rows) != version:
+            return None
+        self._saw(username, version, rows[-1][0])
+        return [(json.loads(payload), any(first <= event_id <= last for first, last in own))
+                for event_id, payload in rows]
+
+    def watch_paths(self, username):
+        # Commits land in the WAL file
+        return [self.path, self.path + "-wal"]
+
+    def append_events(self, username, events):
+        with self._connect() as conn:
+            # Taking the write lock up front makes the version check and the
+            # writes one atomic step across processes
+            conn.execute("BEGIN IMMEDIATE")
+            user_id = self._user_id(conn, username)
+            row = conn.execute(SQL_VERSION, (user_id,)).fetchone()
+            version = row[0] if row else 0
+            seen = self._seen.get(username)
+            stale = seen is not None and seen != version
+            self._apply_events(conn, user_id, events, stale=stale)
+            # Ids are consecutive: the write lock is held
+            last = conn.execute(SQL_LAST_EVENT).fetchone()[0]
+            conn.executemany(SQL_SET_METRIC, [(user_id, "version", version + len(events)),
+                                              (user_id, "last_event", last)])
+            if seen is None:
+                return
+            if stale:
+                with self._lock:
+                    if username in self._seen:
+                        self._own.setdefault(username, []).append((last - len(events) + 1, last))
+            else:
+                self._saw(username, version + len(events), last, keep_own=True)
+
+    def imported_ranges(self, username):
+        conn = self._connect()
+        return conn.execute(SQL_IMPORTS, (self._user_id(conn, username),)).fetchall()
+
+    def add_imported_ranges(self, username, ranges):
+        with self._connect() as conn:
+            user_id = self._user_id(conn, username)
+            conn.executemany(SQL_ADD_IMPORT, [(user_id, start, end) for start, end in ranges])
+
+    # ---------------------------- Batch recompute ----------------------------
+    # Used by fitness.batch, which keeps one SQLiteStorage per worker process
+    def day(self, username):
+        # The day the running totals belong to (ISO date), or None
+        conn = self._connect()
+        row = conn.execute(SQL_DAY, (self._user_id(conn, username),)).fetchone()
+        return date.fromordinal(int(row[0])).isoformat() if row else None
+
+    def food_events(self, username):
+        # (event id, event) of food entries with their later edits and
+        # deletions, in order
+        conn = self._connect()
+        for event_id, payload in conn.execute(SQL_FOOD_EVENTS, (self._user_id(conn, username),)):
+            yield event_id, json.loads(payload)
+
+    def goal_rows(self, username):
+        # [(goal id, goal dict)]
+        conn = self._connect()
+        return [(goal_id, {"desc": d, "value": v, "period": p, "advice": a, "start": start})
+                for goal_id, d, v, p, a, start in conn.execute(SQL_GOAL_ROWS, (self._user_id(conn, username),))]
+
+    def write_recomputed(self, results):
+        # batch.Recomputed results of many users, in one transaction. Today's
+        # calories are shifted by the difference rather than overwritten, so
+        # food logged while the batch ran is kept; the events get their
+        # recomputed calories in the same transaction, so the next run
+        # finds nothing to shift.
+        computed = datetime.now().isoformat(timespec="seconds")
+        with self._connect() as conn:
+            for r in results:
+                user_id = self._user_id(conn, r.username)
+                if r.today_delta:
+                    conn.execute(SQL_SHIFT_METRIC, (r.today_delta, user_id, "total_calories"))
+                conn.executemany(SQL_SET_PAYLOAD, r.rewrites)
+                if r.today_delta or r.advice:
+                    # Running app windows load again (see changes())
+                    conn.execute(SQL_ADD_METRIC, (user_id, "version", 1))
+                conn.executemany(SQL_SET_ADVICE, r.advice)
+                conn.execute(SQL_UPSERT_SUMMARY, (user_id, computed, r.bmi, r.bmi_band, r.goals_total, r.goals_done))
+
+    @staticmethod
+    def _apply_events(conn, user_id, events, update_totals=True, stale=False):
+        if update_totals:
+            events = SQLiteStorage._apply_totals(conn, user_id, events, stale)
+        conn.executemany(SQL_ADD_EVENT, [
+            (user_id, e["ts"], e["type"], json.dumps(e, ensure_ascii=False)) for e in events
+        ])
+
+    @staticmethod
+    def _apply_totals(conn, user_id, events, stale):
+        # Returns the events as they are to be stored: a stale writer's water
+        # levels merged onto the current one. The totals cover one day, as in
+        # journal.apply_event; the day is kept in `metrics` as a date ordinal.
+        row = conn.execute(SQL_DAY, (user_id,)).fetchone()
+        current = date.fromordinal(int(row[0])).isoformat() if row else ""
+        stored = []
+        for e in events:
+            day = e["ts"][:10]
+            if day > current:
+                current = day
+                conn.executemany(SQL_SET_METRIC, [(user_id, name, 0.0) for name in DAY_TOTALS])
+                conn.execute(SQL_SET_METRIC, (user_id, "day", date.fromisoformat(day).toordinal()))
+            kind = e["type"]
+            if kind == "food":
+                conn.execute(SQL_ADD_METRIC, (user_id, "total_calories", e["kcal"]))
+            elif kind in ("food_edit", "food_delete"):
+                conn.execute(SQL_ADD_METRIC, (user_id, "total_calories", e["delta"]))
+            elif kind == "recipe":
+                conn.execute(SQL_UPSERT_RECIPE, (user_id, e["name"], json.dumps(e["recipe"], ensure_ascii=False)))
+            elif kind == "water":
+                if stale:
+                    row = conn.execute(SQL_WATER, (user_id,)).fetchone()
+                    e = merge_stale({"day": day, "water_intake": row[0] if row else 0.0}, e)
+                conn.execute(SQL_SET_METRIC, (user_id, "water_intake", e["value"]))
+            elif kind == "steps":
+                conn.execute(SQL_ADD_METRIC, (user_id, "steps", e["delta"]))
+            elif kind == "goal":
+                g = e["goal"]
+                conn.execute(SQL_ADD_GOAL, (user_id, g["desc"], g["value"], g["period"], g["advice"],
+                                            g.get("start", e["ts"][:10])))
+            stored.append(e)
+        return stored
+
+    def close(self):
+        # Only call once no other thread is using the storage any more
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+        self._local = threading.local()
+
+    def close_thread(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            self._connections.remove(conn)
+            conn.close()
+
+
+# ---------------------------- JSON -> SQLite migration ----------------------------
+def _journal_history(journal):
+    # Every event of a journal, archived segments first
+    history = []
+    for segment in sorted(os.listdir(journal.archive_dir)) + [None]:
+        path = os.path.join(journal.archive_dir, segment) if segment else journal.log_path
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        history.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # blank, or torn by a crash
+    return history
+
+
+def _migrate_journal(storage, conn, username, journals):
+    # The events and current state of the user's journals (oldest first; the
+    # state is the last one's) into the user's rows
+    user_id = storage._user_id(conn, username)
+    for journal in journals:
+        storage._apply_events(conn, user_id, _journal_history(journal), update_totals=False)
+    state = journals[-1].load()
+    last = conn.execute(SQL_LAST_EVENT).fetchone()[0]
+    conn.executemany(SQL_SET_METRIC, [(user_id, name, state[name]) for name in DAY_TOTALS]
+                     + [(user_id, "last_event", last)])
+    if state.get("day"):
+        conn.execute(SQL_SET_METRIC, (user_id, "day", date.fromisoformat(state["day"]).toordinal()))
+    conn.executemany(SQL_ADD_GOAL, [
+        (user_id, g["desc"], g["value"], g["period"], g["advice"], g.get("start", ""))
+        for g in state["goals"]
+    ])
+    conn.executemany(SQL_UPSERT_RECIPE, [
+        (user_id, name, json.dumps(recipe, ensure_ascii=False)) for name, recipe in state["recipes"].items()
+    ])
+
+
+def _retire(path):
+    # Renames a migrated file or directory out of the way; a second
+    # migration (after switching back to JSON) must not collide with the first
+    target, n = path + ".migrated", 1
+    while os.path.exists(target):
+        target, n = f"{path}.migrated.{n}", n + 1
+    os.replace(path, target)
+
+
+def migrate_json_to_sqlite(data_dir, storage):
+    # Moves the JSON backend's data into `storage`: users.json, each user's
+    # journal and imported ranges under users/, and the shared pre-SQLite
+    # journal (or the even older user_data.json). The shared data belonged to
+    # whoever was recorded in user_data.json. Migrated files are renamed to
+    # *.migrated so this runs only once.
+    user_file = os.path.join(data_dir, USER_FILE)
+    legacy_file = os.path.join(data_dir, USER_DATA_FILE)
+    journal_dir = os.path.join(data_dir, JOURNAL_DIR)
+    users_dir = os.path.join(data_dir, USERS_DIR)
+    credentials = CredentialIndex(user_file)
+    if not os.path.exists(user_file) and not os.path.exists(credentials.log_path):
+        return 0
+    users = credentials.snapshot()
+
+    owner = None
+    if os.path.exists(legacy_file):
+        with open(legacy_file, "r", encoding="utf-8") as f:
+            try:
+                owner = json.load(f).get("username")
+            except json.JSONDecodeError:
+                pass
+
+    with storage._connect() as conn:
+        conn.executemany(SQL_UPSERT_USER, [(u, info["password"]) for u, info in users.items()])
+        for username in users:
+            journals = []
+            if username == owner:
+                journals.append(EventJournal(journal_dir, legacy_file=legacy_file))
+            directory = os.path.join(users_dir, quote(username, safe=""))
+            if os.path.isdir(directory):
+                journals.append(EventJournal(directory))
+                try:
+                    with open(os.path.join(directory, "imports.json"), "r", encoding="utf-8") as f:
+                        ranges = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    ranges = []
+                conn.executemany(SQL_ADD_IMPORT, [(storage._user_id(conn, username), start, end)
+                                                  for start, end in ranges])
+            if journals:
+                _migrate_journal(storage, conn, username, journals)
+
+    for path in (user_file, credentials.log_path, legacy_file, journal_dir, users_dir):
+        if os.path.exists(path):
+            _retire(path)
+    return len(users)
+
+
+def open_storage(data_dir="data", backend=None):
+    # FITNESS_STORAGE=json keeps the plain file backend
+    backend = backend or os.environ.get("FITNESS_STORAGE", "sqlite")
+    os.makedirs(data_dir, exist_ok=True)
+    if backend == "json":
+        return JsonStorage(data_dir)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown storage backend: {backend}")
+    storage = SQLiteStorage(os.path.join(data_dir, DB_FILE))
+    migrate_json_to_sqlite(data_dir, storage)
+    return storage
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move JSON user data into the SQLite database")
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+    storage = SQLiteStorage(os.path.join(args.data_dir, DB_FILE))
+    print(f"Migrated {migrate_json_to_sqlite(args.data_dir, storage)} accounts")
+    storage.close()
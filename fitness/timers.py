@@ -0,0 +1,144 @@
+# Countdown timers for the window. Every timer keeps a deadline on the
+# monotonic clock and reports the time that is actually left, so a busy
+# event loop delays a tick but never stretches the countdown. All running
+# timers share one Tk `after` job, set for whichever of them is due first.
+import math
+import time
+
+EPSILON = 0.001  # seconds; Tk may wake a fraction of a millisecond early
+
+
+class Timer:
+    # Calls on_tick(remaining) each time `remaining` crosses a multiple of
+    # `interval` and on_done() at the deadline. on_done runs from its own
+    # `after` callback, so one that blocks (a message box) does not hold up
+    # the other timers due at the same wakeup. Created by TimerService.start.
+    def __init__(self, service, seconds, on_tick=None, on_done=None, interval=1.0):
+        self.service = service
+        self.duration = seconds
+        self.interval = interval
+        self.on_tick = on_tick
+        self.on_done = on_done
+        self.finished = False
+        self._left = seconds
+        self._deadline = None
+        self._done_job = None
+        self.due = None
+
+    @property
+    def running(self):
+        return self._deadline is not None
+
+    @property
+    def remaining(self):
+        if self._deadline is None:
+            return self._left
+        return max(self._deadline - self.service.clock(), 0.0)
+
+    @property
+    def elapsed(self):
+        return self.duration - self.remaining
+
+    def pause(self):
+        if self.running:
+            self._left = self.remaining
+            self._deadline = None
+            self.service._remove(self)
+
+    def resume(self):
+        if not self.running and not self.finished:
+            self._deadline = self.service.clock() + self._left
+            self._plan()
+            self.service._add(self)
+
+    def cancel(self):
+        # Also stops an on_done that is due but has not run yet
+        self.pause()
+        self.finished = True
+        if self._done_job is not None:
+            self.service.root.after_cancel(self._done_job)
+            self._done_job = None
+
+    def _plan(self):
+        # Next wakeup: when `remaining` drops to the next lower multiple of
+        # the interval, or the deadline
+        left = self.remaining
+        boundary = (math.ceil(left / self.interval - 1e-9) - 1) * self.interval
+        self.due = self._deadline - max(boundary, 0.0)
+
+    def _fire(self):
+        left = self.remaining
+        if left <= EPSILON:
+            self._deadline = None
+            self._left = 0.0
+            self.finished = True
+            self.service._remove(self)
+            if self.on_tick:
+                self.on_tick(0.0)
+            if self.on_done:
+                self._done_job = self.service.root.after(0, self._done)
+            return
+        self._plan()
+        if self.on_tick:
+            self.on_tick(left)
+
+    def _done(self):
+        self._done_job = None
+        self.on_done()
+
+
+class TimerService:
+    # Runs any number of Timers on `root` (a Tk widget) with a single
+    # scheduled wakeup. Paused timers are not tracked here at all.
+    def __init__(self, root, clock=time.monotonic):
+        self.root = root
+        self.clock = clock
+        self._running = set()
+        self._job = None
+        self._wake_at = None
+        self._waking = False
+
+    def start(self, seconds, on_tick=None, on_done=None, interval=1.0):
+        timer = Timer(self, seconds, on_tick, on_done, interval)
+        if on_tick:
+            on_tick(float(seconds))
+        timer.resume()
+        return timer
+
+    @property
+    def active(self):
+        return len(self._running)
+
+    def _add(self, timer):
+        self._running.add(timer)
+        self._schedule()
+
+    def _remove(self, timer):
+        self._running.discard(timer)
+        self._schedule()
+
+    def _schedule(self):
+        if self._waking:
+            return
+        due = min((timer.due for timer in self._running), default=None)
+        if due == self._wake_at:
+            return
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        self._wake_at = due
+        if due is not None:
+            delay = max(math.ceil((due - self.clock()) * 1000), 0)
+            self._job = self.root.after(delay, self._wake)
+
+    def _wake(self):
+        self._job = self._wake_at = None
+        now = self.clock()
+        self._waking = True
+        try:
+            for timer in sorted(self._running, key=lambda t: t.due):
+                if timer.running and timer.due <= now + EPSILON:
+                    timer._fire()
+        finally:
+            self._waking = False
+            self._schedule()
@@ -0,0 +1,244 @@
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+METRICS_FILE = "metrics.db"
+PERIODS = ("day", "week", "month")
+
+# Which tracker events become samples: event type -> (metric, payload field).
+# Steps, water and calories are additive (read `total`); pulse, sleep,
+# weight and height are measurements (read `mean`, `low`, `high`). Edited
+# and deleted food entries add their change in kcal to the calories.
+EVENT_METRICS = {
+    "food": ("calories", "kcal"),
+    "food_edit": ("calories", "delta"),
+    "food_delete": ("calories", "delta"),
+    "water": ("water", "delta"),
+    "steps": ("steps", "delta"),
+    "pulse": ("pulse", "bpm"),
+    "sleep": ("sleep", "hours"),
+    "weight": ("weight", "kg"),
+    "height": ("height", "cm"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_key ON samples(username, metric, ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    username TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    total REAL NOT NULL,
+    low REAL NOT NULL,
+    high REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (username, metric, period, bucket)
+) WITHOUT ROWID;
+"""
+
+SQL_ADD_SAMPLE = "INSERT INTO samples (username, metric, ts, value) VALUES (?, ?, ?, ?)"
+SQL_MERGE_ROLLUP = ("INSERT INTO rollups (username, metric, period, bucket, total, low, high, count) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(username, metric, period, bucket) DO UPDATE SET "
+                    "total = total + excluded.total, low = min(low, excluded.low), "
+                    "high = max(high, excluded.high), count = count + excluded.count")
+SQL_SET_SAMPLE = ("UPDATE samples SET value = ? WHERE id = "
+                  "(SELECT id FROM samples WHERE username = ? AND metric = ? AND ts = ? AND value = ? LIMIT 1)")
+SQL_DELETE_ROLLUP = "DELETE FROM rollups WHERE username = ? AND metric = ? AND period = ? AND bucket = ?"
+SQL_REBUILD_ROLLUP = ("INSERT INTO rollups (username, metric, period, bucket, total, low, high, count) "
+                      "SELECT username, metric, ?, ?, sum(value), min(value), max(value), count(*) FROM samples "
+                      "WHERE username = ? AND metric = ? AND ts >= ? AND ts < ? GROUP BY username, metric")
+SQL_ROLLUPS = ("SELECT bucket, total, low, high, count FROM rollups "
+               "WHERE username = ? AND metric = ? AND period = ? AND bucket BETWEEN ? AND ? ORDER BY bucket")
+SQL_DAYS_BACK = ("SELECT bucket, total, low, high, count FROM rollups "
+                 "WHERE username = ? AND metric = ? AND period = 'day' AND bucket <= ? ORDER BY bucket DESC")
+SQL_SAMPLES = ("SELECT ts, value FROM samples WHERE username = ? AND metric = ? AND ts BETWEEN ? AND ? "
+               "ORDER BY ts")
+SQL_LATEST = ("SELECT ts, value FROM samples WHERE username = ? AND metric = ? AND ts < ? "
+              "ORDER BY ts DESC LIMIT 1")
+
+
+class Rollup(namedtuple("Rollup", "bucket total low high count")):
+    # One bucket of a metric: `bucket` is the ISO date the day, week (Monday)
+    # or month (1st) starts on
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+def buckets(day):
+    # "YYYY-MM-DD" -> the day, week and month buckets it belongs to
+    d = date.fromisoformat(day)
+    return day, (d - timedelta(days=d.weekday())).isoformat(), day[:8] + "01"
+
+
+def bucket_end(period, bucket):
+    # The ISO date the bucket after `bucket` starts on
+    d = date.fromisoformat(bucket)
+    if period == "day":
+        return (d + timedelta(days=1)).isoformat()
+    if period == "week":
+        return (d + timedelta(days=7)).isoformat()
+    return (d.replace(year=d.year + 1, month=1) if d.month == 12 else d.replace(month=d.month + 1)).isoformat()
+
+
+def samples_from_events(events):
+    # Tracker events -> (metric, ts, value); other event types are skipped
+    samples = []
+    for event in events:
+        mapping = EVENT_METRICS.get(event["type"])
+        # Imported steps reach the store from the import itself
+        if mapping and not event.get("imported") and event.get(mapping[1]) is not None:
+            samples.append((mapping[0], event["ts"], float(event[mapping[1]])))
+    return samples
+
+
+class MetricStore:
+    # Raw samples for every metric plus per-day/week/month rollups (sum, min,
+    # max, count) that are updated in the same transaction as the insert, so
+    # range views and streaks read a handful of rollup rows instead of
+    # scanning samples. One connection per thread, as in SQLiteStorage.
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Not thread-bound, for close(); see SQLiteStorage._connect
+            conn = sqlite3.connect(self.path, timeout=10, cached_statements=64, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+
+    # ---------------------------- Writes ----------------------------
+    def add(self, username, metric, value, ts=None):
+        ts = ts or datetime.now().isoformat(timespec="seconds")
+        self.add_samples(username, [(metric, ts, value)])
+
+    def add_samples(self, username, samples):
+        # `samples` is a list of (metric, iso_ts, value)
+        with self._connect() as conn:
+            self._insert(conn, username, samples)
+
+    def revalue_samples(self, batch):
+        # Changes recomputed samples in place, for any number of users in one
+        # transaction: `batch` maps (username, metric) to [(iso_ts, old value,
+        # new value)]. A sample is found by its time and old value, so doing
+        # it again changes nothing. The rollups of the buckets involved are
+        # rebuilt from the samples, which suits metrics kept only as samples
+        # (not add_daily()); samples added meanwhile are kept.
+        with self._connect() as conn:
+            for (username, metric), changes in batch.items():
+                touched = set()
+                for ts, old, new in changes:
+                    conn.execute(SQL_SET_SAMPLE, (new, username, metric, ts, old))
+                    touched.update(zip(PERIODS, buckets(ts[:10])))
+                for period, bucket in sorted(touched):
+                    conn.execute(SQL_DELETE_ROLLUP, (username, metric, period, bucket))
+                    conn.execute(SQL_REBUILD_ROLLUP, (period, bucket, username, metric, bucket,
+                                                      bucket_end(period, bucket)))
+
+    def _insert(self, conn, username, samples):
+        rollups = {}
+        for metric, ts, value in samples:
+            for period, bucket in zip(PERIODS, buckets(ts[:10])):
+                _fold(rollups, (metric, period, bucket), value, value, value, 1)
+        conn.executemany(SQL_ADD_SAMPLE, [(username, m, ts, v) for m, ts, v in samples])
+        self._merge(conn, username, rollups)
+
+    def add_daily(self, username, metric, days):
+        # Pre-aggregated values without raw samples (tracker imports):
+        # `days` maps "YYYY-MM-DD" to (total, low, high, count)
+        rollups = {}
+        for day, (total, low, high, count) in days.items():
+            for period, bucket in zip(PERIODS, buckets(day)):
+                _fold(rollups, (metric, period, bucket), total, low, high, count)
+        with self._connect() as conn:
+            self._merge(conn, username, rollups)
+
+    @staticmethod
+    def _merge(conn, username, rollups):
+        conn.executemany(SQL_MERGE_ROLLUP, [
+            (username, metric, period, bucket, *values) for (metric, period, bucket), values in rollups.items()
+        ])
+
+    # ---------------------------- Reads ----------------------------
+    def rollups(self, username, metric, period="day", start="", end="9999"):
+        return list(self.iter_rollups(username, metric, period, start, end))
+
+    def iter_rollups(self, username, metric, period="day", start="", end="9999"):
+        # Streams the rows off the cursor, for exports of long histories
+        for row in self._connect().execute(SQL_ROLLUPS, (username, metric, period, start, end)):
+            yield Rollup(*row)
+
+    def last_days(self, username, metric, days=90, today=None):
+        today = today or date.today()
+        start = today - timedelta(days=days - 1)
+        return self.rollups(username, metric, "day", start.isoformat(), today.isoformat())
+
+    def samples(self, username, metric, start="", end="9999"):
+        return self._connect().execute(SQL_SAMPLES, (username, metric, start, end)).fetchall()
+
+    def latest(self, username, metric, before="9999"):
+        row = self._connect().execute(SQL_LATEST, (username, metric, before)).fetchone()
+        return row[1] if row else None
+
+    def streak(self, username, metric, minimum, field="total", today=None):
+        # Consecutive days up to today whose `field` reaches `minimum`. Today
+        # is not over yet, so missing it does not break the streak.
+        today = today or date.today()
+        expected = today
+        count = 0
+        for row in self._connect().execute(SQL_DAYS_BACK, (username, metric, today.isoformat())):
+            rollup = Rollup(*row)
+            bucket = date.fromisoformat(rollup.bucket)
+            reached = getattr(rollup, field) >= minimum
+            if bucket == today and not reached:
+                continue
+            if expected == today and bucket < today:
+                expected = today - timedelta(days=1)
+            if bucket != expected or not reached:
+                break
+            count += 1
+            expected = bucket - timedelta(days=1)
+        return count
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+        self._local = threading.local()
+
+    def close_thread(self):
+        # Closes the calling thread's connection, for worker threads that end
+        # while the store stays open
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            self._connections.remove(conn)
+            conn.close()
+
+
+def _fold(rollups, key, total, low, high, count):
+    old = rollups.get(key)
+    if old is None:
+        rollups[key] = [total, low, high, count]
+    else:
+        old[0] += total
+        old[1] = min(old[1], low)
+        old[2] = max(old[2], high)
+        old[3] += count
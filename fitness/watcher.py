@@ -0,0 +1,116 @@
+# Notices when files are changed by another process. On Linux the kernel
+# reports changes through inotify (read via ctypes, no extra package);
+# elsewhere, or if inotify is unavailable, the files are stat()ed every
+# `interval` seconds. Directories are watched rather than the files
+# themselves, so files replaced by rename or created later are covered.
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+from fitness.persistence import file_stamp
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+def _libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch") else None
+
+
+class ChangeWatcher:
+    # Calls on_change() from a background thread after any of `paths`
+    # changed. Changes arriving within `settle` seconds of each other are
+    # reported once. The callback must not touch Tk; hand over to the UI
+    # thread (e.g. set a flag that an `after` loop checks).
+    def __init__(self, paths, on_change, interval=1.0, settle=0.05):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.on_change = on_change
+        self.interval = interval
+        self.settle = settle
+        self._stop = threading.Event()
+        self._fd = self._inotify()
+        self.mode = "inotify" if self._fd is not None else "polling"
+        self._thread = threading.Thread(target=self._run_inotify if self._fd is not None else self._run_polling,
+                                        name="change-watcher", daemon=True)
+
+    def start(self):
+        # Taken before returning, so changes made right after start() count
+        self._stamps = [file_stamp(path) for path in self.paths]
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    # ---------------------------- inotify ----------------------------
+    def _inotify(self):
+        libc = _libc()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        self._names = {}  # watch descriptor -> file names in that directory
+        for path in self.paths:
+            directory, name = os.path.split(path)
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                os.close(fd)
+                return None
+            self._names.setdefault(wd, set()).add(os.fsencode(name))
+        return fd
+
+    def _read_events(self):
+        # True if any event concerns a watched file
+        relevant = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = EVENT.unpack_from(data, offset)
+                name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0")
+                offset += EVENT.size + length
+                if name in self._names.get(wd, ()):
+                    relevant = True
+
+    def _run_inotify(self):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 0.5)
+            if ready and self._read_events():
+                # Let a burst of writes (log append, then fsync, then WAL) finish
+                self._stop.wait(self.settle)
+                self._read_events()
+                self.on_change()
+
+    # ---------------------------- Polling ----------------------------
+    def _run_polling(self):
+        while not self._stop.wait(self.interval):
+            current = [file_stamp(path) for path in self.paths]
+            if current != self._stamps:
+                self._stamps = current
+                self.on_change()
@@ -0,0 +1,6 @@
+# Tests run against the checkout; nothing needs to be installed
+#   python -m pytest -q
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+import fitness.auth
+from fitness.auth import Authenticator, hash_password, is_hashed, verify_password
+from fitness.storage import open_storage
+
+
+@pytest.fixture
+def fast_hashes(monkeypatch):
+    # The real cost parameters take a noticeable fraction of a second per hash
+    monkeypatch.setattr(fitness.auth, "SCRYPT_N", 2 ** 4)
+    monkeypatch.setattr(fitness.auth, "PBKDF2_ITERATIONS", 10)
+
+
+def test_hash_and_verify(fast_hashes):
+    stored = hash_password("secret")
+    assert is_hashed(stored)
+    assert verify_password("secret", stored)
+    assert not verify_password("wrong", stored)
+
+
+@pytest.mark.parametrize("stored", ["scrypt$", "scrypt$16$8$1$c2FsdA==", "scrypt$15$8$1$c2FsdA==$ZGlnZXN0",
+                                    "pbkdf2_sha256$x$c2FsdA==$ZGlnZXN0", "scrypt$16$8$1$not base64$ZGlnZXN0"])
+def test_malformed_hash_fails_login(stored):
+    assert not verify_password("secret", stored)
+
+
+def test_plaintext_record_is_upgraded(tmp_path, fast_hashes):
+    storage = open_storage(str(tmp_path), "sqlite")
+    storage.save_user("ann", "pw")
+    auth = Authenticator(storage)
+    assert auth.login("ann", "pw").result()
+    assert is_hashed(storage.password_record("ann"))
+    assert not auth.login("ann", "nope").result()
+    auth.close()
+
+
+def test_register_never_replaces_an_account(tmp_path, fast_hashes):
+    auth = Authenticator(open_storage(str(tmp_path), "sqlite"))
+    assert auth.register("ann", "pw").result()
+    assert not auth.register("ann", "other").result()
+    assert auth.login("ann", "pw").result()
+    auth.close()
+
+
+def test_sessions_expire_and_are_bounded(tmp_path):
+    auth = Authenticator(open_storage(str(tmp_path), "sqlite"), ttl=0.05, limit=3)
+    tokens = [auth.open_session(f"user{i}") for i in range(5)]
+    assert len(auth._sessions) == 3
+    assert auth.session_user(tokens[0]) is None
+    assert auth.session_user(tokens[-1]) == "user4"
+    time.sleep(0.1)
+    auth.open_session("late")
+    assert len(auth._sessions) == 1
+    auth.close()
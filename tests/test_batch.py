@@ -0,0 +1,61 @@
+from datetime import date
+
+from fitness.batch import recompute_user
+from fitness.storage import open_storage
+from fitness.timeseries import MetricStore, samples_from_events
+
+EVENTS = [
+    {"type": "food", "ts": "2024-03-04T10:00:00", "id": "a", "meal": "lunch", "food": "Рис", "grams": 100,
+     "kcal": 100.0},
+    {"type": "food", "ts": "2024-03-04T11:00:00", "id": "b", "meal": "lunch", "food": "Хлеб", "grams": 100,
+     "kcal": 50.0},
+    {"type": "food_edit", "ts": "2024-03-05T09:00:00", "id": "a", "meal": "lunch", "food": "Рис", "grams": 50,
+     "kcal": 50.0, "delta": -50.0},
+]
+KCAL = {"Рис": 200.0, "Хлеб": 50.0}
+
+
+def _recompute(storage, metrics):
+    result = recompute_user(storage, metrics, KCAL.get, "ann", date(2024, 3, 5))
+    metrics.revalue_samples({("ann", "calories"): result.calories})
+    storage.write_recomputed([result])
+    return result
+
+
+def test_recompute_is_idempotent_and_keeps_new_samples(tmp_path):
+    storage = open_storage(str(tmp_path), "sqlite")
+    metrics = MetricStore(str(tmp_path / "metrics.db"))
+    storage.create_user("ann", "pw")
+    storage.append_events("ann", EVENTS)
+    metrics.add_samples("ann", samples_from_events(EVENTS))
+
+    first = recompute_user(storage, metrics, KCAL.get, "ann", date(2024, 3, 5))
+    assert first.calories == [("2024-03-04T10:00:00", 100.0, 200.0), ("2024-03-05T09:00:00", -50.0, -100.0)]
+    assert first.today_delta == -50.0
+    # Logged by the app while the shard ran
+    metrics.add("ann", "calories", 30.0, "2024-03-04T12:00:00")
+    metrics.revalue_samples({("ann", "calories"): first.calories})
+    storage.write_recomputed([first])
+
+    days = {r.bucket: r.total for r in metrics.rollups("ann", "calories")}
+    assert days == {"2024-03-04": 280.0, "2024-03-05": -100.0}
+    assert metrics.rollups("ann", "calories", "month")[0].total == 180.0
+    assert storage.load_state("ann")["total_calories"] == -100.0
+
+    second = _recompute(storage, metrics)
+    assert second.calories == [] and second.rewrites == []
+    assert {r.bucket: r.total for r in metrics.rollups("ann", "calories")} == days
+
+
+def test_interrupted_run_converges(tmp_path):
+    # Samples written, events not: the resumed run must not move them twice
+    storage = open_storage(str(tmp_path), "sqlite")
+    metrics = MetricStore(str(tmp_path / "metrics.db"))
+    storage.create_user("ann", "pw")
+    storage.append_events("ann", EVENTS)
+    metrics.add_samples("ann", samples_from_events(EVENTS))
+    result = recompute_user(storage, metrics, KCAL.get, "ann", date(2024, 3, 5))
+    metrics.revalue_samples({("ann", "calories"): result.calories})
+    _recompute(storage, metrics)
+    assert {r.bucket: r.total for r in metrics.rollups("ann", "calories")} == {"2024-03-04": 250.0,
+                                                                               "2024-03-05": -100.0}
@@ -0,0 +1,23 @@
+import math
+
+from fitness.charts import bucket_means, lttb
+
+
+def test_lttb_keeps_ends_and_peak():
+    xs = list(range(1000))
+    ys = [math.sin(x / 50) for x in xs]
+    ys[500] = 10.0
+    out_x, out_y = lttb(xs, ys, 50)
+    assert len(out_x) == len(out_y) == 50
+    assert out_x[0] == 0 and out_x[-1] == 999
+    assert out_x == sorted(out_x)
+    assert 10.0 in out_y
+
+
+def test_lttb_short_series_unchanged():
+    assert lttb([1, 2, 3], [4, 5, 6], 10) == ([1, 2, 3], [4, 5, 6])
+    assert lttb([1, 2, 3, 4], [4, 5, 6, 7], 2) == ([1, 2, 3, 4], [4, 5, 6, 7])
+
+
+def test_bucket_means():
+    assert bucket_means([0, 1, 2, 3], [2, 4, 6, 8], 2) == ([0.5, 2.5], [3.0, 7.0])
@@ -0,0 +1,54 @@
+import math
+import os
+from datetime import date, timedelta
+
+from fitness.columnar import ColumnStore, DayColumns
+from fitness.timeseries import MetricStore
+
+
+def _store(tmp_path):
+    metrics = MetricStore(str(tmp_path / "metrics.db"))
+    return metrics, ColumnStore(str(tmp_path / "columns"), metrics)
+
+
+def test_days_and_gaps(tmp_path):
+    metrics, columns = _store(tmp_path)
+    metrics.add("ann", "steps", 100, "2024-01-01T10:00:00")
+    metrics.add("ann", "steps", 50, "2024-01-01T11:00:00")
+    metrics.add("ann", "steps", 70, "2024-01-03T10:00:00")
+    metrics.add("ann", "weight", 80, "2024-01-02T10:00:00")
+    metrics.add("ann", "weight", 82, "2024-01-02T20:00:00")
+    file = columns.open("ann")
+    days, values = file.series("steps")
+    assert [date.fromordinal(d).isoformat() for d in days] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert values[0] == 150 and math.isnan(values[1]) and values[2] == 70
+    assert file.latest("weight") == 81
+    columns.close()
+
+
+def test_new_generation_is_published_whole(tmp_path):
+    metrics, columns = _store(tmp_path)
+    today = date.today()
+    metrics.add("ann", "steps", 10, today.isoformat() + "T10:00:00")
+    first = columns.open("ann")
+    early = today - timedelta(days=400)
+    metrics.add("ann", "steps", 5, early.isoformat() + "T10:00:00")
+    columns.sync("ann", early.isoformat())
+    assert not first.current
+    newest = columns.open("ann")
+    assert newest.path != first.path
+    assert newest.rows == 401 and newest.column("steps")[0] == 5 and newest.latest("steps") == 10
+    assert not [name for name in os.listdir(tmp_path / "columns") if name.endswith(".tmp")]
+    # Another process opening the file by name sees the same rows
+    assert DayColumns(newest.path).rows == 401
+    columns.close()
+
+
+def test_close_and_reopen(tmp_path):
+    metrics, columns = _store(tmp_path)
+    metrics.add("ann", "water", 0.5, "2024-01-01T10:00:00")
+    columns.open("ann")
+    columns.close("ann")
+    assert "ann" not in columns._open
+    assert columns.open("ann").latest("water") == 0.5
+    columns.close()
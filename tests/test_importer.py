@@ -0,0 +1,65 @@
+import io
+from datetime import date, datetime
+
+from fitness.importer import DAY, DailyAggregator, ImportJob, IntervalSet, _wall_seconds, import_files, iter_csv
+from fitness.storage import open_storage
+from fitness.timeseries import MetricStore
+
+CSV = ("timestamp,steps,heart_rate\n"
+       "2024-01-01T10:00:00,100,70\n"
+       "2024-01-01T10:01:00,n/a,72\n"
+       "2024-01-01T10:02:00,50\n"
+       "not a time,10,60\n"
+       "2024-01-02T09:00:00,30,\n")
+
+
+def _stores(tmp_path):
+    storage = open_storage(str(tmp_path), "sqlite")
+    storage.create_user("ann", "pw")
+    return storage, MetricStore(str(tmp_path / "metrics.db"))
+
+
+def test_bad_cells_are_blank():
+    rows = list(iter_csv(io.BytesIO(CSV.encode())))
+    assert [(steps, hr) for _, steps, hr in rows] == [(100.0, 70.0), (None, 72.0), (50.0, None), (30.0, None)]
+
+
+def test_import_totals_and_no_double_count(tmp_path):
+    storage, metrics = _stores(tmp_path)
+    path = tmp_path / "export.csv"
+    path.write_text(CSV, encoding="utf-8")
+    result = import_files(storage, metrics, "ann", [str(path)])
+    assert result.samples == 4
+    assert [(r.bucket, r.total) for r in metrics.rollups("ann", "steps")] == [("2024-01-01", 150.0),
+                                                                              ("2024-01-02", 30.0)]
+    again = import_files(storage, metrics, "ann", [str(path)])
+    assert again.samples == 0
+    assert metrics.rollups("ann", "steps")[0].total == 150.0
+
+
+def test_gap_between_runs_is_still_imported():
+    start = _wall_seconds(datetime(2024, 1, 1, 8))
+    first = DailyAggregator()
+    for ts in (start, start + 60, start + 5 * 3600):
+        first.add(ts, 10.0, None)
+    first.end_file()
+    assert len(first.covered) == 2
+    second = DailyAggregator(IntervalSet(first.covered))
+    second.add(start + 2 * 3600, 5.0, None)  # inside the gap
+    second.add(start + 60, 10.0, None)  # already imported
+    second.end_file()
+    assert second.samples == 1
+    assert second.days[int(start // DAY)]["steps"] == 5.0
+
+
+def test_job_closes_its_connections(tmp_path):
+    storage, metrics = _stores(tmp_path)
+    path = tmp_path / "today.csv"
+    path.write_text(f"timestamp,steps\n{date.today().isoformat()}T08:00:00,500\n", encoding="utf-8")
+    job = ImportJob(storage, metrics, "ann", [str(path)]).start()
+    job._thread.join(10)
+    kinds = [job.messages.get_nowait()[0] for _ in range(job.messages.qsize())]
+    assert kinds[-1] == "done"
+    # Only the connections of this (the test's) thread are left
+    assert len(storage._connections) == 1
+    assert len(metrics._connections) == 1
@@ -0,0 +1,53 @@
+import json
+import os
+from datetime import date
+
+from fitness.journal import EventJournal, new_event
+
+
+def test_replay_after_restart(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    journal.load()
+    journal.append([new_event("steps", delta=100), new_event("water", value=0.5, delta=0.5)])
+    state = EventJournal(str(tmp_path)).load()
+    assert state["steps"] == 100
+    assert state["water_intake"] == 0.5
+
+
+def test_snapshot_rotates_log_and_keeps_state(tmp_path):
+    journal = EventJournal(str(tmp_path), snapshot_every=3)
+    journal.load()
+    for _ in range(5):
+        journal.append([new_event("steps", delta=10)])
+    assert os.listdir(tmp_path / "archive")
+    assert EventJournal(str(tmp_path)).load()["steps"] == 50
+
+
+def test_torn_tail_is_cut_before_append(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    journal.load()
+    journal.append([new_event("steps", delta=100)])
+    with open(journal.log_path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "type": "ste')  # crash mid-append
+    journal = EventJournal(str(tmp_path))
+    journal.load()
+    journal.append([new_event("steps", delta=5)])
+    assert EventJournal(str(tmp_path)).load()["steps"] == 105
+
+
+def test_changes_lists_other_writers_events(tmp_path):
+    ours, theirs = EventJournal(str(tmp_path)), EventJournal(str(tmp_path))
+    ours.load()
+    theirs.load()
+    theirs.append([new_event("steps", delta=7)])
+    changes = ours.changes()
+    assert [(event["delta"], own) for event, own in changes] == [(7, False)]
+    assert ours.changes() == []
+
+
+def test_legacy_totals_are_dated(tmp_path):
+    legacy = tmp_path / "user_data.json"
+    legacy.write_text(json.dumps({"username": "ann", "steps": 300, "water_intake": 1.0}), encoding="utf-8")
+    state = EventJournal(str(tmp_path / "journal"), legacy_file=str(legacy)).load()
+    assert state["steps"] == 300
+    assert state["day"] == date.today().isoformat()
@@ -0,0 +1,37 @@
+import threading
+import time
+
+import pytest
+
+from fitness.persistence import WriteBehindWriter
+
+
+def test_flush_later_writes_on_the_writer_thread():
+    written = []
+    writer = WriteBehindWriter(lambda payload: written.append((payload, threading.current_thread().name)),
+                               delay=60)
+    writer.mark_dirty(1)
+    writer.flush_later().result(timeout=5)
+    assert written == [(1, "write-behind")]
+    writer.close()
+
+
+def test_flush_later_reports_a_failed_write(capsys):
+    def fail(payload):
+        raise OSError("disk full")
+
+    writer = WriteBehindWriter(fail, delay=60)
+    writer.mark_dirty(1)
+    with pytest.raises(OSError):
+        writer.flush_later().result(timeout=5)
+    writer.close()
+
+
+def test_debounced_write():
+    written = []
+    writer = WriteBehindWriter(written.append, delay=0.05, merge=lambda pending, item: (pending or 0) + item)
+    writer.mark_dirty(1)
+    writer.mark_dirty(2)
+    time.sleep(0.3)
+    assert written == [3]
+    writer.close()
@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+from fitness.core import Tracker, event_writer
+from fitness.journal import EventJournal, new_event
+from fitness.storage import migrate_json_to_sqlite, open_storage
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request):
+    return request.param
+
+
+def test_events_survive_reopen(tmp_path, backend):
+    storage = open_storage(str(tmp_path), backend)
+    assert storage.create_user("ann", "pw")
+    assert not storage.create_user("ann", "other")
+    storage.append_events("ann", [new_event("steps", delta=100), new_event("water", value=0.3, delta=0.3)])
+    storage.close()
+    state = open_storage(str(tmp_path), backend).load_state("ann")
+    assert state["steps"] == 100
+    assert state["water_intake"] == 0.3
+
+
+def test_sync_picks_up_another_instance(tmp_path, backend):
+    ours, theirs = open_storage(str(tmp_path), backend), open_storage(str(tmp_path), backend)
+    ours.create_user("ann", "pw")
+    tracker = Tracker(ours, "ann")
+    tracker.load()
+    assert tracker.sync() is None
+    theirs.load_state("ann")
+    theirs.append_events("ann", [new_event("steps", delta=250)])
+    assert tracker.sync() == {"steps": 250}
+    assert tracker.steps == 250
+    ours.close()
+    theirs.close()
+
+
+def test_sync_merges_pending_water_onto_theirs(tmp_path, backend):
+    ours, theirs = open_storage(str(tmp_path), backend), open_storage(str(tmp_path), backend)
+    ours.create_user("ann", "pw")
+    writer = event_writer(ours, delay=60)
+    tracker = Tracker(ours, "ann", writer=writer)
+    tracker.load()
+    theirs.load_state("ann")
+    theirs.append_events("ann", [new_event("water", value=0.5, delta=0.5)])
+    tracker.add_water(0.25)  # still in the writer
+    writer.flush_later().result(timeout=5)
+    tracker.sync(flushed=True)
+    assert tracker.water_intake == 0.75
+    assert open_storage(str(tmp_path), backend).load_state("ann")["water_intake"] == 0.75
+    writer.close()
+
+
+def test_imported_ranges(tmp_path, backend):
+    storage = open_storage(str(tmp_path), backend)
+    storage.create_user("ann", "pw")
+    storage.add_imported_ranges("ann", [(10.0, 20.0), (30.0, 40.0)])
+    assert sorted(map(tuple, storage.imported_ranges("ann"))) == [(10.0, 20.0), (30.0, 40.0)]
+
+
+def test_migration_of_per_user_journals(tmp_path):
+    json_storage = open_storage(str(tmp_path), "json")
+    json_storage.create_user("ann", "pw")
+    json_storage.append_events("ann", [new_event("steps", delta=100)])
+    json_storage.add_imported_ranges("ann", [(1.0, 2.0)])
+    json_storage.close()
+
+    storage = open_storage(str(tmp_path), "sqlite")
+    assert storage.load_state("ann")["steps"] == 100
+    assert [tuple(r) for r in storage.imported_ranges("ann")] == [(1.0, 2.0)]
+    assert os.path.isdir(tmp_path / "users.migrated")
+
+    # Back on JSON and migrated again: the first .migrated is kept
+    json_storage = open_storage(str(tmp_path), "json")
+    json_storage.create_user("bob", "pw")
+    json_storage.append_events("bob", [new_event("steps", delta=7)])
+    json_storage.close()
+    migrate_json_to_sqlite(str(tmp_path), storage)
+    assert storage.load_state("bob")["steps"] == 7
+    assert os.path.isdir(tmp_path / "users.migrated.1")
+
+
+def test_user_cache_is_bounded(tmp_path, monkeypatch):
+    import fitness.storage
+
+    monkeypatch.setattr(fitness.storage, "USER_CACHE", 2)
+    storage = open_storage(str(tmp_path), "sqlite")
+    for name in "abc":
+        storage.create_user(name, "pw")
+        storage.load_state(name)
+    assert list(storage._user_ids) == ["b", "c"]
+    assert list(storage._seen) == ["b", "c"]
+    # Dropped from the cache: the next sync loads again
+    assert storage.changes("a") is None
+
+
+def test_legacy_shared_journal_is_migrated(tmp_path):
+    (tmp_path / "users.json").write_text(json.dumps({"ann": {"password": "pw"}}), encoding="utf-8")
+    (tmp_path / "user_data.json").write_text(json.dumps({"username": "ann"}), encoding="utf-8")
+    journal = EventJournal(str(tmp_path / "journal"))
+    journal.load()
+    journal.append([new_event("steps", delta=42)])
+    storage = open_storage(str(tmp_path), "sqlite")
+    assert storage.load_state("ann")["steps"] == 42
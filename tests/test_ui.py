@@ -0,0 +1,36 @@
+# Login-to-interactive of the main window. Needs customtkinter and a display
+# (xvfb-run python -m pytest tests/test_ui.py); skipped otherwise. The time is
+# only checked to be measured here: benchmarks/bench_ui.py compares it with
+# the thresholds.
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        pytest.skip("no display (run under xvfb-run)")
+    pytest.importorskip("customtkinter")
+    from fitness.gui import FitnessApp
+
+    monkeypatch.chdir(tmp_path)
+    app = FitnessApp()
+    app.prebuild_tabs = False
+    app.save_user("test", "test")
+    app.update()
+    yield app
+    app._on_close()
+
+
+def test_login_to_interactive_is_measured(app):
+    app._complete_login("test")
+    app.update_idletasks()
+    first = app.last_login_to_interactive
+    assert first is not None and first > 0
+    app.logout()
+    app.update()
+    app._complete_login("test")
+    app.update_idletasks()
+    assert app.last_login_to_interactive > 0